@@ -1,6 +1,8 @@
 import argparse
 import json
+import math
 import re
+import statistics
 import subprocess
 import sys
 from pathlib import Path
@@ -9,6 +11,7 @@ from time import time
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from pytest_pyodide import (  # noqa: E402
+    NodeRunner,
     SeleniumChromeRunner,
     SeleniumFirefoxRunner,
     spawn_web_server,
@@ -16,22 +19,66 @@ from pytest_pyodide import (  # noqa: E402
 
 SKIP = {"fft", "hyantes"}
 
+# Runs a benchmark script with top-level await natively.
+RUN_ASYNC_NATIVE = (
+    "import ast, asyncio, sys\n"
+    "flags = ast.PyCF_ALLOW_TOP_LEVEL_AWAIT\n"
+    "asyncio.run(eval(compile(sys.argv[1], '<benchmark>', 'exec', flags=flags)))\n"
+)
+
+RUNTIMES = {
+    "firefox": SeleniumFirefoxRunner,
+    "chrome": SeleniumChromeRunner,
+    "node": NodeRunner,
+}
+
+
+def summarize(samples):
+    """Return the median and the interquartile range of the repeat timings."""
+    if not samples:
+        return float("NaN"), float("NaN")
+    if len(samples) == 1:
+        return samples[0], 0.0
+    q1, median, q3 = statistics.quantiles(samples, n=4, method="inclusive")
+    return median, q3 - q1
+
+
+def make_entry(samples):
+    """Build the result of a benchmark from the timings of each runtime.
+
+    The entry maps each runtime to the median time, and ``"samples"`` to the
+    individual timings.
+    """
+    entry = {name: summarize(times)[0] for name, times in samples.items()}
+    entry["samples"] = samples
+    return entry
+
 
 def print_entry(name, res):
     print(" - ", name)
     print(" " * 4, end="")
+    samples = res.get("samples", {})
     for res_name, dt in res.items():
+        if res_name == "samples":
+            continue
         print(f"{res_name}: {dt:.6f}  ", end="")
+        iqr = summarize(samples.get(res_name, []))[1]
+        if not math.isnan(iqr):
+            print(f"(IQR {iqr:.6f})  ", end="")
     print("")
 
 
 def run_native(code):
     if "# non-native" in code:
-        return float("NaN")
+        return []
 
     root = Path(__file__).resolve().parents[1]
+    if "# async" in code:
+        args = [sys.executable, "-c", RUN_ASYNC_NATIVE, code]
+    else:
+        args = [sys.executable, "-c", code]
     output = subprocess.check_output(
-        [sys.executable, "-c", code],
+        args,
         cwd=Path(__file__).resolve().parent,
         env={
             "PYTHONPATH": str(root / "src/py/lib")
@@ -39,36 +86,64 @@ def run_native(code):
             + str(root / "packages" / ".artifacts" / "lib" / "python")
         },
     )
-    return float(output.strip().split()[-1])
+    return json.loads(output.decode().strip().split("\n")[-1])
+
+
+def print_interrupt_overhead(res):
+    """Print how much slower each run with an interrupt buffer was."""
+    overheads = []
+    for res_name, dt in res.items():
+        browser_name, sep, _ = res_name.partition("(w/ ib")
+        if sep and res.get(browser_name):
+            overhead = (dt / res[browser_name] - 1) * 100
+            overheads.append(f"{res_name}: {overhead:+.1f}%")
+    if overheads:
+        print(" " * 4 + "interrupt overhead: " + "  ".join(overheads))
 
 
-def run_wasm(code, selenium, interrupt_buffer):
+def run_wasm(code, selenium, interrupt_buffer, check_interval=None):
     if interrupt_buffer:
+        options = {"checkInterval": check_interval} if check_interval else {}
         selenium.run_js(
-            """
+            f"""
             let interrupt_buffer = new Int32Array(1);
-            pyodide.setInterruptBuffer(interrupt_buffer)
+            pyodide.setInterruptBuffer(interrupt_buffer, {json.dumps(options)})
             """
         )
+    else:
+        selenium.run_js("pyodide.setInterruptBuffer(undefined)")
 
-    selenium.run(code)
+    if "# async" in code:
+        selenium.run_async(code)
+    else:
+        selenium.run(code)
     try:
-        runtime = float(selenium.logs.split("\n")[-1])
+        samples = json.loads(selenium.logs.split("\n")[-1])
     except ValueError:
         print(selenium.logs)
         raise
-    return runtime
+    return samples
+
 
+def run_all(selenium_backends, code, check_intervals=()):
+    """Run a benchmark script natively and in each runtime.
 
-def run_all(selenium_backends, code):
+    Returns a dictionary mapping each configuration to the timings of every
+    repeat.
+    """
     result = {"native": run_native(code)}
+    configs = [(False, None), (True, None)]
+    configs += [(True, interval) for interval in check_intervals]
 
     for browser_name, selenium in selenium_backends.items():
-        for interrupt_buffer in [False, True]:
-            dt = run_wasm(code, selenium, interrupt_buffer)
-            if interrupt_buffer:
-                browser_name += "(w/ ib)"
-            result[browser_name] = dt
+        for interrupt_buffer, check_interval in configs:
+            dt = run_wasm(code, selenium, interrupt_buffer, check_interval)
+            name = browser_name
+            if check_interval:
+                name += f"(w/ ib, interval={check_interval})"
+            elif interrupt_buffer:
+                name += "(w/ ib)"
+            result[name] = dt
     return result
 
 
@@ -96,13 +171,30 @@ def get_benchmark_scripts(scripts_dir, repeat=5, number=5):
             "import numpy as np\n"
             "_ = np.empty(())\n"
             f"setup = setup + '\\nfrom __main__ import {name}'\n"
-            "from timeit import Timer\n"
-            "t = Timer(run, setup)\n"
-            f"r = t.repeat({repeat}, {number})\n"
-            "r.remove(min(r))\n"
-            "r.remove(max(r))\n"
-            "print(np.mean(r))\n"
         )
+        if "# async" in content:
+            # The run statement is an awaitable, which timeit can't time.
+            content += (
+                "from time import perf_counter\n"
+                "_run = compile(run, '<run>', 'eval')\n"
+                "async def _repeat():\n"
+                "    r = []\n"
+                f"    for _ in range({repeat}):\n"
+                "        exec(setup, globals())\n"
+                "        t0 = perf_counter()\n"
+                f"        for _ in range({number}):\n"
+                "            await eval(_run, globals())\n"
+                "        r.append(perf_counter() - t0)\n"
+                "    return r\n"
+                "r = await _repeat()\n"
+            )
+        else:
+            content += (
+                "from timeit import Timer\n"
+                "t = Timer(run, setup)\n"
+                f"r = t.repeat({repeat}, {number})\n"
+            )
+        content += "import json\nprint(json.dumps(r))\n"
 
         yield name, content
 
@@ -115,6 +207,24 @@ def get_numpy_benchmarks():
     return get_benchmark_scripts("benchmarks/numpy_benchmarks")
 
 
+def get_relaxed_call_benchmarks():
+    return get_benchmark_scripts(
+        "benchmarks/relaxed_call_benchmarks", repeat=5, number=1
+    )
+
+
+def get_stdout_benchmarks():
+    return get_benchmark_scripts("benchmarks/stdout_benchmarks", repeat=5, number=1)
+
+
+def get_ffi_benchmarks():
+    return get_benchmark_scripts("benchmarks/ffi_benchmarks", repeat=5, number=1)
+
+
+def get_webloop_benchmarks():
+    return get_benchmark_scripts("benchmarks/webloop_benchmarks", repeat=5, number=1)
+
+
 def get_benchmarks(benchmarks, targets=("all",)):
     if "all" in targets:
         for benchmark in benchmarks.values():
@@ -127,7 +237,10 @@ def get_benchmarks(benchmarks, targets=("all",)):
 def parse_args(benchmarks):
     benchmarks.append("all")
 
-    parser = argparse.ArgumentParser("Run benchmarks on Pyodide's performance")
+    parser = argparse.ArgumentParser(
+        "Run benchmarks on Pyodide's performance",
+        epilog="Run 'benchmark.py compare --help' to compare results files.",
+    )
     parser.add_argument(
         "target",
         choices=benchmarks,
@@ -151,74 +264,137 @@ def parse_args(benchmarks):
         default=str(Path(__file__).parents[1] / "dist"),
         help="Pyodide dist directory (default: %(default)s)",
     )
+    parser.add_argument(
+        "--runtime",
+        dest="runtimes",
+        choices=list(RUNTIMES),
+        action="append",
+        help=(
+            "Runtime to run the benchmarks in. Can be repeated "
+            "(default: firefox and chrome)"
+        ),
+    )
+    parser.add_argument(
+        "--interrupt-check-interval",
+        default=[],
+        type=int,
+        action="append",
+        help=(
+            "Also run each benchmark with an interrupt buffer that is checked "
+            "with this interval. Can be repeated."
+        ),
+    )
 
     return parser.parse_args()
 
 
+def start_runtime(cls, port, dist_dir, timeout):
+    runtime = cls(port, dist_dir=dist_dir)
+    runtime.set_script_timeout(timeout)
+    return runtime
+
+
+def reload_pyodide(runtime):
+    """Start a fresh Pyodide in the same browser.
+
+    Files that the previous instance downloaded stay in the HTTP cache, so
+    loading packages again measures a warm load. NodeRunner.refresh() starts a
+    new Node process instead, which makes the second load a cold one as well.
+    """
+    runtime.refresh()
+    runtime.load_pyodide()
+    runtime.initialize_pyodide()
+
+
+def time_package_load(cls, port, dist_dir, timeout, package_name):
+    """Time loading a package into a fresh runtime and, in browsers, again
+    after reloading Pyodide. Returns the cold and the warm time."""
+    runtime = start_runtime(cls, port, dist_dir, timeout)
+    try:
+        t0 = time()
+        runtime.load_package(package_name)
+        cold = time() - t0
+        if cls is NodeRunner:
+            return cold, float("NaN")
+        reload_pyodide(runtime)
+        t0 = time()
+        runtime.load_package(package_name)
+        return cold, time() - t0
+    finally:
+        runtime.quit()
+
+
 def main():
+    if sys.argv[1:2] == ["compare"]:
+        from compare_benchmark import main as compare
+
+        sys.exit(compare(sys.argv[2:]))
+
     BENCHMARKS = {
         "pystone": get_pystone_benchmarks,
         "numpy": get_numpy_benchmarks,
+        "relaxed_call": get_relaxed_call_benchmarks,
+        "stdout": get_stdout_benchmarks,
+        "ffi": get_ffi_benchmarks,
+        "webloop": get_webloop_benchmarks,
     }
 
     args = parse_args(list(BENCHMARKS.keys()))
     targets = [t.lower() for t in args.target]
     output = Path(args.output).resolve()
     timeout = args.timeout
+    runtimes = {name: RUNTIMES[name] for name in args.runtimes or ["firefox", "chrome"]}
 
     results = {}
     selenium_backends = {}
-    browser_cls = [
-        ("firefox", SeleniumFirefoxRunner),
-        ("chrome", SeleniumChromeRunner),
-    ]
 
     with spawn_web_server(args.dist_dir) as (hostname, port, log_path):
-        # selenium initialization time
+        # runtime initialization time
         result = {"native": float("NaN")}
-        for browser_name, cls in browser_cls:
-            try:
-                t0 = time()
-                selenium = cls(port)
-                selenium.set_script_timeout(timeout)
-                result[browser_name] = time() - t0
-            finally:
-                selenium.driver.quit()
+        for runtime_name, cls in runtimes.items():
+            t0 = time()
+            runtime = start_runtime(cls, port, args.dist_dir, timeout)
+            result[runtime_name] = time() - t0
+            runtime.quit()
 
-        results["selenium init"] = result
-        print_entry("selenium init", result)
+        results["runtime init"] = result
+        print_entry("runtime init", result)
 
-        # package loading time
+        # package loading time, with empty caches and, in browsers, after a
+        # previous instance loaded the package
         for package_name in ["numpy"]:
-            result = {"native": float("NaN")}
-            for browser_name, cls in browser_cls:
-                selenium = cls(port)
-                selenium.set_script_timeout(timeout)
-                try:
-                    t0 = time()
-                    selenium.load_package(package_name)
-                    result[browser_name] = time() - t0
-                finally:
-                    selenium.driver.quit()
-
-            results[f"load {package_name}"] = result
-            print_entry(f"load {package_name}", result)
+            cold = {"native": float("NaN")}
+            warm = {"native": float("NaN")}
+            for runtime_name, cls in runtimes.items():
+                cold[runtime_name], warm[runtime_name] = time_package_load(
+                    cls, port, args.dist_dir, timeout, package_name
+                )
+
+            for name, result in [("cold", cold), ("warm", warm)]:
+                results[f"load {package_name} ({name})"] = result
+                print_entry(f"load {package_name} ({name})", result)
 
         # run benchmarks
         for benchmark_name, content in get_benchmarks(BENCHMARKS, targets):
             try:
-                # instantiate browsers for each benchmark to prevent side effects
-                for browser_name, cls in browser_cls:
-                    selenium_backends[browser_name] = cls(port)
-                    selenium_backends[browser_name].set_script_timeout(timeout)
+                # start new runtimes for each benchmark to prevent side effects
+                for runtime_name, cls in runtimes.items():
+                    selenium_backends[runtime_name] = start_runtime(
+                        cls, port, args.dist_dir, timeout
+                    )
                     # pre-load packages to exclude loading time from the benchmark
-                    selenium_backends[browser_name].load_package(["numpy"])
+                    selenium_backends[runtime_name].load_package(["numpy"])
 
-                results[benchmark_name] = run_all(selenium_backends, content)
+                samples = run_all(
+                    selenium_backends, content, args.interrupt_check_interval
+                )
+                results[benchmark_name] = make_entry(samples)
                 print_entry(benchmark_name, results[benchmark_name])
+                print_interrupt_overhead(results[benchmark_name])
             finally:
                 for selenium in selenium_backends.values():
-                    selenium.driver.quit()
+                    selenium.quit()
+                selenium_backends.clear()
 
     output.parent.mkdir(exist_ok=True, parents=True)
     output.write_text(json.dumps(results))
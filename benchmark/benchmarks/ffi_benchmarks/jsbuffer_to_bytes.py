@@ -0,0 +1,13 @@
+# non-native
+# setup: N = 20
+# run: jsbuffer_to_bytes(N)
+
+# Copies a large JavaScript buffer into Python.
+
+
+def jsbuffer_to_bytes(n):
+    from pyodide.code import run_js
+
+    buffer = run_js("new Uint8Array(16 * 1024 * 1024).fill(1)")
+    for _ in range(n):
+        buffer.to_bytes()
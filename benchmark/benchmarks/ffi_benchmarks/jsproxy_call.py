@@ -0,0 +1,27 @@
+# non-native
+# setup: N = 20000
+# run: jsproxy_call(N)
+
+# Calls methods of a JavaScript object with 0 to 4 arguments.
+
+
+def jsproxy_call(n):
+    from pyodide.code import run_js
+
+    obj = run_js(
+        """
+        ({
+          f0() { return 0; },
+          f1(a) { return a; },
+          f2(a, b) { return a; },
+          f3(a, b, c) { return a; },
+          f4(a, b, c, d) { return a; },
+        })
+        """
+    )
+    for i in range(n):
+        obj.f0()
+        obj.f1(i)
+        obj.f2(i, 2)
+        obj.f3(i, 2, 3)
+        obj.f4(i, 2, 3, 4)
@@ -0,0 +1,15 @@
+# non-native
+# setup: N = 100000
+# run: jsproxy_getattr(N)
+
+# Gets and sets attributes of a JavaScript object through a JsProxy.
+
+
+def jsproxy_getattr(n):
+    from pyodide.code import run_js
+
+    obj = run_js("({ x: 1, name: 'value' })")
+    for i in range(n):
+        obj.x = i
+        obj.x  # noqa: B018
+        obj.name  # noqa: B018
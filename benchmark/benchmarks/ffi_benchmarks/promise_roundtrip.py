@@ -0,0 +1,15 @@
+# non-native
+# async
+# setup: N = 5000
+# run: promise_roundtrip(N)
+
+# Awaits JavaScript promises from Python. Every await goes through the event
+# loop and back.
+
+
+async def promise_roundtrip(n):
+    from pyodide.code import run_js
+
+    resolve = run_js("(x) => Promise.resolve(x)")
+    for i in range(n):
+        await resolve(i)
@@ -0,0 +1,21 @@
+# non-native
+# setup: N = 20000
+# run: proxy_churn(N)
+
+# Creates short-lived proxies of a Python callable, passes them to JavaScript
+# and destroys them.
+
+
+def callback(x):
+    return x
+
+
+def proxy_churn(n):
+    from pyodide.code import run_js
+    from pyodide.ffi import create_proxy
+
+    call = run_js("(f) => f(1)")
+    for _ in range(n):
+        proxy = create_proxy(callback)
+        call(proxy)
+        proxy.destroy()
@@ -0,0 +1,28 @@
+# non-native
+# setup: N = 100
+# run: pyproxy_iterate(N)
+
+# Iterates over a Python list from JavaScript through a PyProxy.
+
+
+def pyproxy_iterate(n):
+    from pyodide.code import run_js
+    from pyodide.ffi import create_proxy
+
+    count = run_js(
+        """
+        (proxy) => {
+          let count = 0;
+          for (const x of proxy) {
+            count += x;
+          }
+          return count;
+        }
+        """
+    )
+    proxy = create_proxy(list(range(10000)))
+    try:
+        for _ in range(n):
+            count(proxy)
+    finally:
+        proxy.destroy()
@@ -0,0 +1,14 @@
+# non-native
+# setup: N = 10000
+# run: strings_ascii(N)
+
+# Passes an ASCII string to JavaScript and back.
+
+
+def strings_ascii(n):
+    from pyodide.code import run_js
+
+    identity = run_js("(s) => s")
+    s = "abcd" * 100
+    for _ in range(n):
+        identity(s)
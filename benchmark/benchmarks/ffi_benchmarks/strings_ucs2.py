@@ -0,0 +1,15 @@
+# non-native
+# setup: N = 10000
+# run: strings_ucs2(N)
+
+# Passes a string with characters outside of Latin-1 (UCS-2) to JavaScript and
+# back.
+
+
+def strings_ucs2(n):
+    from pyodide.code import run_js
+
+    identity = run_js("(s) => s")
+    s = "abc" * 100 + "\u20ac" * 100
+    for _ in range(n):
+        identity(s)
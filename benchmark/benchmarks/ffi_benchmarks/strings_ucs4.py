@@ -0,0 +1,15 @@
+# non-native
+# setup: N = 10000
+# run: strings_ucs4(N)
+
+# Passes a string with characters outside of the BMP (UCS-4) to JavaScript and
+# back. JavaScript stores them as surrogate pairs.
+
+
+def strings_ucs4(n):
+    from pyodide.code import run_js
+
+    identity = run_js("(s) => s")
+    s = "abc" * 100 + "\U0001f600" * 100
+    for _ in range(n):
+        identity(s)
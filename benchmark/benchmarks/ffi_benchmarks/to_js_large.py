@@ -0,0 +1,16 @@
+# non-native
+# setup: N = 20
+# run: to_js_large(N)
+
+# Converts a large nested JSON-like structure to JavaScript.
+
+
+def to_js_large(n):
+    from pyodide.ffi import to_js
+
+    data = [
+        {"id": i, "name": f"item{i}", "tags": ["a", "b"], "pos": {"x": 1.0, "y": i}}
+        for i in range(5000)
+    ]
+    for _ in range(n):
+        to_js(data)
@@ -0,0 +1,13 @@
+# non-native
+# setup: N = 10000
+# run: to_js_small(N)
+
+# Converts a small nested JSON-like structure to JavaScript.
+
+
+def to_js_small(n):
+    from pyodide.ffi import to_js
+
+    data = {"id": 1, "name": "x", "tags": ["a", "b"], "pos": {"x": 1.0, "y": 2.0}}
+    for _ in range(n):
+        to_js(data)
@@ -0,0 +1,22 @@
+# non-native
+# setup: N = 20
+# run: to_py_large(N)
+
+# Converts a large nested JSON-like structure from JavaScript.
+
+
+def to_py_large(n):
+    from pyodide.code import run_js
+
+    data = run_js(
+        """
+        Array.from({ length: 5000 }, (_, i) => ({
+          id: i,
+          name: `item${i}`,
+          tags: ["a", "b"],
+          pos: { x: 1.0, y: i },
+        }))
+        """
+    )
+    for _ in range(n):
+        data.to_py()
@@ -0,0 +1,13 @@
+# non-native
+# setup: N = 10000
+# run: to_py_small(N)
+
+# Converts a small nested JSON-like structure from JavaScript.
+
+
+def to_py_small(n):
+    from pyodide.code import run_js
+
+    data = run_js("({ id: 1, name: 'x', tags: ['a', 'b'], pos: { x: 1.0, y: 2.0 } })")
+    for _ in range(n):
+        data.to_py()
@@ -0,0 +1,17 @@
+# non-native
+# setup: N = 100000
+# run: relaxed_call_adapter(N)
+
+# Calls through pyodide.code.relaxed_call, which uses a cached argument adapter.
+
+
+def callback(event, data=None):
+    return event
+
+
+def relaxed_call_adapter(n):
+    from pyodide.code import relaxed_call
+
+    for i in range(n):
+        relaxed_call(callback, i, None, "extra")
+        relaxed_call(callback, i, data=None, extra=True)
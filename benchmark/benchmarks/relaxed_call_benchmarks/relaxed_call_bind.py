@@ -0,0 +1,34 @@
+# setup: N = 100000
+# run: relaxed_call_bind(N)
+
+# The previous implementation of relaxed_call, which binds the arguments to a
+# relaxed signature on every call. Kept as a baseline for relaxed_call_adapter.
+
+from functools import lru_cache
+from inspect import Parameter, signature
+
+
+def callback(event, data=None):
+    return event
+
+
+@lru_cache
+def relaxed_sig(func):
+    sig = signature(func)
+    params = list(sig.parameters.values())
+    params.append(Parameter("__var_positional", Parameter.VAR_POSITIONAL))
+    params.append(Parameter("__var_keyword", Parameter.VAR_KEYWORD))
+    return sig.replace(parameters=params)
+
+
+def relaxed_call(func, *args, **kwargs):
+    bound = relaxed_sig(func).bind(*args, **kwargs)
+    bound.arguments.pop("__var_positional", None)
+    bound.arguments.pop("__var_keyword", None)
+    return func(*bound.args, **bound.kwargs)
+
+
+def relaxed_call_bind(n):
+    for i in range(n):
+        relaxed_call(callback, i, None, "extra")
+        relaxed_call(callback, i, data=None, extra=True)
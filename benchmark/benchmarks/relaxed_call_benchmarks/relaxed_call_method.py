@@ -0,0 +1,20 @@
+# non-native
+# setup: N = 100000
+# run: relaxed_call_method(N)
+
+# Calls bound methods through pyodide.code.relaxed_call. Each attribute access
+# creates a new bound method, so the adapter is cached on the function.
+
+
+class Handler:
+    def callback(self, event, data=None):
+        return event
+
+
+def relaxed_call_method(n):
+    from pyodide.code import relaxed_call
+
+    handler = Handler()
+    for i in range(n):
+        relaxed_call(handler.callback, i, None, "extra")
+        relaxed_call(handler.callback, i, data=None, extra=True)
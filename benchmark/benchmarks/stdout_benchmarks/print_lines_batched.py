@@ -0,0 +1,22 @@
+# non-native
+# setup: N = 20000
+# run: print_lines_batched(N)
+
+# Prints many short lines through a batched stdout handler, which calls into
+# JavaScript once per line. Baseline for print_lines_buffered.
+
+
+def print_lines_batched(n):
+    from pyodide.code import run_js
+
+    run_js(
+        """
+        globalThis.printedChars = 0;
+        pyodide.setStdout({ batched: (s) => { printedChars += s.length; } });
+        """
+    )
+    try:
+        for i in range(n):
+            print("progress", i)
+    finally:
+        run_js("pyodide.setStdout()")
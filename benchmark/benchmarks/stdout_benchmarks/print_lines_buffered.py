@@ -0,0 +1,23 @@
+# non-native
+# setup: N = 20000
+# run: print_lines_buffered(N)
+
+# Prints many short lines through a buffered stdout handler, which hands the
+# output to JavaScript in large chunks.
+
+
+def print_lines_buffered(n):
+    from pyodide.code import run_js
+
+    run_js(
+        """
+        globalThis.printedChars = 0;
+        pyodide.setStdout({ buffered: (s) => { printedChars += s.length; } });
+        """
+    )
+    try:
+        for i in range(n):
+            print("progress", i)
+    finally:
+        # Closes the stream, which flushes the buffer.
+        run_js("pyodide.setStdout()")
@@ -0,0 +1,15 @@
+# non-native
+# async
+# setup: N = 5000
+# run: await_js_promises(N)
+
+# Awaits many JavaScript promises at once from Python.
+
+
+async def await_js_promises(n):
+    import asyncio
+
+    from pyodide.code import run_js
+
+    resolve = run_js("(x) => Promise.resolve(x)")
+    await asyncio.gather(*(resolve(i) for i in range(n)))
@@ -0,0 +1,29 @@
+# non-native
+# async
+# setup: N = 5000
+# run: await_py_coroutines(N)
+
+# Awaits Python coroutines from JavaScript one after the other.
+
+
+async def await_py_coroutines(n):
+    from pyodide.code import run_js
+    from pyodide.ffi import create_proxy
+
+    async def coroutine(i):
+        return i
+
+    await_all = run_js(
+        """
+        async (f, n) => {
+          for (let i = 0; i < n; i++) {
+            await f(i);
+          }
+        }
+        """
+    )
+    proxy = create_proxy(coroutine)
+    try:
+        await await_all(proxy, n)
+    finally:
+        proxy.destroy()
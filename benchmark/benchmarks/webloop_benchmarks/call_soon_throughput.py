@@ -0,0 +1,23 @@
+# async
+# setup: N = 100000
+# run: call_soon_throughput(N)
+
+# Schedules many callbacks with call_soon and waits until they all ran.
+
+
+async def call_soon_throughput(n):
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+    count = 0
+
+    def callback():
+        nonlocal count
+        count += 1
+        if count == n:
+            done.set_result(None)
+
+    for _ in range(n):
+        loop.call_soon(callback)
+    await done
@@ -0,0 +1,14 @@
+# async
+# setup: N = 10000
+# run: gather_tasks(N)
+
+# Runs many trivial tasks at once with asyncio.gather.
+
+
+async def gather_tasks(n):
+    import asyncio
+
+    async def task(i):
+        return i
+
+    await asyncio.gather(*(task(i) for i in range(n)))
@@ -0,0 +1,15 @@
+# async
+# setup: N = 20000
+# run: sleep_ping_pong(N)
+
+# Two tasks take turns on the event loop with asyncio.sleep(0).
+
+
+async def sleep_ping_pong(n):
+    import asyncio
+
+    async def player():
+        for _ in range(n):
+            await asyncio.sleep(0)
+
+    await asyncio.gather(player(), player())
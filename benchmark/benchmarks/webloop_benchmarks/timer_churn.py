@@ -0,0 +1,14 @@
+# async
+# setup: N = 20000
+# run: timer_churn(N)
+
+# Creates timers with call_later and cancels them before they fire.
+
+
+async def timer_churn(n):
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    for _ in range(n):
+        loop.call_later(10, print).cancel()
+    await asyncio.sleep(0)
@@ -0,0 +1,192 @@
+"""Compare benchmark results and report regressions.
+
+The first results file is the baseline, every other file is compared to it.
+For each benchmark and runtime, the ratio of the median times is reported with
+a bootstrap confidence interval computed from the repeat samples. A change is
+significant if the confidence interval doesn't contain 1, and it is reported as
+a regression or an improvement if it is also larger than the threshold.
+"""
+
+import argparse
+import json
+import math
+import random
+import statistics
+import sys
+from pathlib import Path
+from typing import Any
+
+RESAMPLES = 2000
+
+
+def bootstrap_ratio_ci(
+    baseline: list[float],
+    samples: list[float],
+    confidence: float,
+    rng: random.Random,
+) -> tuple[float, float]:
+    """Return a confidence interval for the ratio of the medians."""
+    ratios = []
+    for _ in range(RESAMPLES):
+        base = statistics.median(rng.choices(baseline, k=len(baseline)))
+        new = statistics.median(rng.choices(samples, k=len(samples)))
+        ratios.append(new / base)
+    ratios.sort()
+    alpha = (1 - confidence) / 2
+    low = ratios[int(alpha * (RESAMPLES - 1))]
+    high = ratios[math.ceil((1 - alpha) * (RESAMPLES - 1))]
+    return low, high
+
+
+def compare_entry(
+    baseline: dict[str, Any],
+    entry: dict[str, Any],
+    runtime: str,
+    threshold: float,
+    confidence: float,
+    rng: random.Random,
+) -> dict[str, Any] | None:
+    base_value = baseline.get(runtime)
+    value = entry.get(runtime)
+    if not base_value or not value or math.isnan(base_value) or math.isnan(value):
+        return None
+
+    ratio = value / base_value
+    base_samples = baseline.get("samples", {}).get(runtime)
+    samples = entry.get("samples", {}).get(runtime)
+    ci = None
+    status = "unchanged"
+    if base_samples and samples:
+        ci = bootstrap_ratio_ci(base_samples, samples, confidence, rng)
+        if ci[0] > 1 and ratio > 1 + threshold:
+            status = "regression"
+        elif ci[1] < 1 and ratio < 1 - threshold:
+            status = "improvement"
+    return {
+        "runtime": runtime,
+        "baseline": base_value,
+        "value": value,
+        "ratio": ratio,
+        "ci": ci,
+        "status": status,
+    }
+
+
+def compare(
+    baseline: dict[str, Any],
+    results: dict[str, Any],
+    threshold: float,
+    confidence: float,
+    seed: int = 0,
+) -> list[dict[str, Any]]:
+    """Compare each benchmark in ``results`` to the same one in ``baseline``."""
+    rng = random.Random(seed)
+    comparisons = []
+    for name, entry in results.items():
+        if name not in baseline:
+            continue
+        for runtime in entry:
+            if runtime == "samples":
+                continue
+            result = compare_entry(
+                baseline[name], entry, runtime, threshold, confidence, rng
+            )
+            if result is not None:
+                comparisons.append({"benchmark": name, **result})
+    return comparisons
+
+
+def format_markdown(
+    baseline_name: str, reports: dict[str, list[dict[str, Any]]], confidence: float
+) -> str:
+    lines = []
+    for name, comparisons in reports.items():
+        regressions = sum(c["status"] == "regression" for c in comparisons)
+        improvements = sum(c["status"] == "improvement" for c in comparisons)
+        lines += [
+            f"## {name} vs. {baseline_name}",
+            "",
+            f"{regressions} regressions, {improvements} improvements",
+            "",
+            f"| benchmark | runtime | baseline | new | ratio | {confidence:.0%} CI | |",
+            "| --- | --- | ---: | ---: | ---: | --- | --- |",
+        ]
+        for c in comparisons:
+            ci = f"{c['ci'][0]:.3f} - {c['ci'][1]:.3f}" if c["ci"] else "n/a"
+            status = "" if c["status"] == "unchanged" else c["status"]
+            lines.append(
+                f"| {c['benchmark']} | {c['runtime']} | {c['baseline']:.6f} "
+                f"| {c['value']:.6f} | {c['ratio']:.3f} | {ci} | {status} |"
+            )
+        lines.append("")
+    return "\n".join(lines)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        "Compare benchmark results to a baseline",
+    )
+    parser.add_argument(
+        "baseline",
+        help="results file to compare against, for instance from the main branch",
+    )
+    parser.add_argument("results", nargs="+", help="results files to compare")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.05,
+        help=(
+            "smallest relative change reported as a regression or improvement "
+            "(default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="confidence level of the intervals (default: %(default)s)",
+    )
+    parser.add_argument("--markdown", help="path to write the markdown summary to")
+    parser.add_argument("--json", help="path to write the JSON summary to")
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="exit with status 1 if there is a regression",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    baseline = json.loads(Path(args.baseline).read_text())
+    reports = {}
+    for path in args.results:
+        results = json.loads(Path(path).read_text())
+        reports[path] = compare(baseline, results, args.threshold, args.confidence)
+
+    markdown = format_markdown(args.baseline, reports, args.confidence)
+    if args.markdown:
+        Path(args.markdown).write_text(markdown)
+    else:
+        print(markdown)
+
+    regressions = sum(
+        c["status"] == "regression"
+        for comparisons in reports.values()
+        for c in comparisons
+    )
+    if args.json:
+        summary = {
+            "baseline": args.baseline,
+            "threshold": args.threshold,
+            "confidence": args.confidence,
+            "regressions": regressions,
+            "comparisons": reports,
+        }
+        Path(args.json).write_text(json.dumps(summary, indent=2))
+
+    return 1 if args.fail_on_regression and regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""Measure how long loading packages takes in Node.js and what they install.
+
+Each package is loaded in a fresh Node.js process, first with an empty package
+cache of its own, so that all its wheels are downloaded from a web server
+serving the dist directory, and then several times with the wheels cached. The
+time is split into downloading the wheel, checking its integrity, unpacking it
+and loading its shared libraries. The wheel sizes, the number of installed
+files and how much the file system and the WebAssembly memory grew are reported
+as well.
+
+Node doesn't check the integrity of wheels, and in browsers the check is part of
+the download, so the integrity time is measured by hashing the wheel again.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pytest_pyodide import spawn_web_server  # noqa: E402
+
+DEFAULT_PACKAGES = ["numpy", "micropip", "cffi", "packaging"]
+
+STEPS = ["download", "integrity", "unpack", "dynlibs"]
+
+NODE_SCRIPT = """
+const {{ loadPyodide }} = require({dist_dir} + "/pyodide.js");
+const fs = require("node:fs");
+const path = require("node:path");
+
+function fsUsage(FS) {{
+  let files = 0;
+  let bytes = 0;
+  function walk(dir) {{
+    for (const name of FS.readdir(dir)) {{
+      const child = path.posix.join(dir, name);
+      if (name === "." || name === ".." || ["/dev", "/proc"].includes(child)) {{
+        continue;
+      }}
+      const stat = FS.lstat(child);
+      if (FS.isDir(stat.mode)) {{
+        walk(child);
+      }} else if (FS.isFile(stat.mode)) {{
+        files++;
+        bytes += stat.size;
+      }}
+    }}
+  }}
+  walk("/");
+  return {{ files, bytes }};
+}}
+
+async function main() {{
+  const pyodide = await loadPyodide({{
+    packageCacheDir: {cache_dir},
+    packageBaseUrl: {base_url},
+  }});
+  const before = fsUsage(pyodide.FS);
+  const memoryBefore = pyodide._module.HEAP8.length;
+  const packageManager = pyodide._api.packageManager;
+  packageManager.timings = [];
+
+  const start = performance.now();
+  await pyodide.loadPackage({package}, {{ messageCallback() {{}} }});
+  const total = performance.now() - start;
+
+  const after = fsUsage(pyodide.FS);
+  const wheels = Object.values(pyodide._api.lockfile_packages);
+  for (const timing of packageManager.timings) {{
+    const {{ file_name }} = wheels.find(({{ name }}) => name === timing.name);
+    const wheel = fs.readFileSync(path.join({cache_dir}, file_name));
+    const start = performance.now();
+    await crypto.subtle.digest("SHA-256", wheel);
+    timing.integrity = performance.now() - start;
+  }}
+  console.log(JSON.stringify({{
+    total,
+    packages: packageManager.timings,
+    files: after.files - before.files,
+    fsBytes: after.bytes - before.bytes,
+    wasmMemory: pyodide._module.HEAP8.length - memoryBefore,
+  }}));
+}}
+main();
+"""
+
+
+def load_package(
+    dist_dir: Path, base_url: str, cache_dir: Path, package: str
+) -> dict[str, Any]:
+    script = NODE_SCRIPT.format(
+        dist_dir=json.dumps(str(dist_dir)),
+        base_url=json.dumps(base_url),
+        cache_dir=json.dumps(str(cache_dir) + "/"),
+        package=json.dumps(package),
+    )
+    output = subprocess.check_output(["node", "-e", script], encoding="utf8")
+    return json.loads(output.strip().split("\n")[-1])
+
+
+def summarize(run: dict[str, Any]) -> dict[str, float]:
+    """Add up the steps of all wheels that were loaded in a run."""
+    summary = {"total": run["total"]}
+    for step in [*STEPS, "size"]:
+        summary[step] = sum(p[step] for p in run["packages"])
+    for key in ["files", "fsBytes", "wasmMemory"]:
+        summary[key] = run[key]
+    return summary
+
+
+def median_summary(runs: list[dict[str, Any]]) -> dict[str, float]:
+    summaries = [summarize(run) for run in runs]
+    return {key: statistics.median(s[key] for s in summaries) for key in summaries[0]}
+
+
+def print_table(results: dict[str, dict[str, Any]]) -> None:
+    header = ["package", "cache", "total", *STEPS, "wheels", "files", "fs", "memory"]
+    print("".join(f"{h:>12}" for h in header))
+    for package, result in results.items():
+        for cache in ["cold", "warm"]:
+            if not result[cache]:
+                continue
+            s = median_summary(result[cache])
+            row = [package, cache]
+            row += [f"{s[key]:.1f}" for key in ["total", *STEPS]]
+            row += [f"{s['size'] / 1e6:.2f}MB", str(int(s["files"]))]
+            row += [f"{s['fsBytes'] / 1e6:.2f}MB", f"{s['wasmMemory'] / 1e6:.2f}MB"]
+            print("".join(f"{x:>12}" for x in row))
+    print("(times in milliseconds)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        "Measure package loading time in Node.js",
+    )
+    parser.add_argument(
+        "packages",
+        nargs="*",
+        default=DEFAULT_PACKAGES,
+        help="packages to load, each in a fresh process (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--dist-dir",
+        default=str(Path(__file__).parents[1] / "dist"),
+        help="Pyodide dist directory (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=(
+            "package cache directory shared by all packages. By default, each "
+            "package gets a new empty directory, so the first load of each "
+            "package downloads all of its wheels from a web server serving "
+            "the dist directory"
+        ),
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="number of loads with a warm cache (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-o", "--output", help="path to the json file to save the results to"
+    )
+    args = parser.parse_args()
+    dist_dir = Path(args.dist_dir).resolve()
+
+    with (
+        TemporaryDirectory() as tmp,
+        spawn_web_server(dist_dir) as (hostname, port, _),
+    ):
+        # Cold loads download the wheels of the tree under test rather than
+        # the released ones from the CDN.
+        base_url = f"http://{hostname}:{port}/"
+        results = {}
+        for package in args.packages:
+            # A cache of its own, so that the dependencies another package
+            # shares with it are downloaded in its cold run as well.
+            cache_dir = Path(args.cache_dir or Path(tmp) / package).resolve()
+            cache_dir.mkdir(exist_ok=True)
+            cached = set(cache_dir.iterdir())
+            first = load_package(dist_dir, base_url, cache_dir, package)
+            # If nothing was downloaded into the cache, the first load was
+            # already warm.
+            cold = set(cache_dir.iterdir()) != cached
+            warm = [
+                load_package(dist_dir, base_url, cache_dir, package)
+                for _ in range(args.repeat)
+            ]
+            results[package] = {
+                "cold": [first] if cold else [],
+                "warm": warm if cold else [first, *warm],
+            }
+
+    print_table(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
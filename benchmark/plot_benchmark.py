@@ -10,20 +10,24 @@ fig, ax = plt.subplots(constrained_layout=True, figsize=(8, 8))
 with open(sys.argv[-2]) as fp:
     content = json.load(fp)
 
+COLORS = {"firefox": "#ff9400", "chrome": "#45a1ff", "node": "#43853d"}
+runtimes = [
+    runtime for runtime in COLORS if any(runtime in v for v in content.values())
+]
+
 results = []
 for k, v in content.items():
-    results.append((k, v["firefox"] / v["native"], v["chrome"] / v["native"]))
+    results.append((k, *(v.get(runtime, np.nan) / v["native"] for runtime in runtimes)))
 results.sort(key=lambda x: x[1], reverse=True)
 
 names = [x[0] for x in results]
-firefox = [x[1] for x in results]
-chrome = [x[2] for x in results]
 
-width = 0.35
+width = 0.7 / len(runtimes)
 y_pos = np.arange(len(results))
-ax.barh(y_pos, firefox, width, color="#ff9400", label="firefox")
-ax.barh(y_pos + width, chrome, width, color="#45a1ff", label="chrome")
-ax.set_yticks(y_pos + width / 2)
+for i, runtime in enumerate(runtimes):
+    slowdown = [x[i + 1] for x in results]
+    ax.barh(y_pos + i * width, slowdown, width, color=COLORS[runtime], label=runtime)
+ax.set_yticks(y_pos + width * (len(runtimes) - 1) / 2)
 ax.set_yticklabels(names)
 ax.invert_yaxis()
 ax.set_xlabel("Slowdown factor (WebAssembly:Native)")
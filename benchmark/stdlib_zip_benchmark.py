@@ -0,0 +1,124 @@
+"""Compare import time from a deflated and an uncompressed stdlib zip.
+
+The standard library zip from the dist directory is repacked once with
+compression and once uncompressed with aligned members. Each variant is then
+loaded in a fresh Node.js process and the time to load Pyodide and import a few
+modules is measured. Many modules, like asyncio and json, are imported while
+loading Pyodide, so timing the imports alone would miss most of the reads from
+the zip.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+from create_zipfile import make_zip_archive  # noqa: E402
+
+IMPORTS = "asyncio, json, decimal"
+
+NODE_SCRIPT = """
+const {{ loadPyodide }} = require({dist_dir} + "/pyodide.js");
+async function main() {{
+  const t0 = performance.now();
+  const py = await loadPyodide({{ stdLibURL: {stdlib} }});
+  const t1 = performance.now();
+  py.runPython({code});
+  const t2 = performance.now();
+  console.log(JSON.stringify({{ load: t1 - t0, total: t2 - t0 }}));
+}}
+main();
+"""
+
+
+def time_imports(dist_dir: Path, stdlib: Path, imports: str) -> dict[str, float]:
+    script = NODE_SCRIPT.format(
+        dist_dir=json.dumps(str(dist_dir)),
+        stdlib=json.dumps(str(stdlib)),
+        code=json.dumps(f"import {imports}"),
+    )
+    output = subprocess.check_output(["node", "-e", script], encoding="utf8")
+    return json.loads(output.strip().split("\n")[-1])
+
+
+def make_variants(stdlib: Path, out_dir: Path, alignment: int) -> dict[str, Path]:
+    src = out_dir / "src"
+    with zipfile.ZipFile(stdlib) as zf:
+        zf.extractall(src)
+
+    variants = {
+        "deflated": (out_dir / "deflated.zip", 6, 0),
+        f"stored (align={alignment})": (out_dir / "stored.zip", 0, alignment),
+    }
+    for path, level, align in variants.values():
+        make_zip_archive(path, src, compression_level=level, alignment=align)
+    return {name: path for name, (path, _, _) in variants.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser("Compare stdlib import time between zip formats")
+    parser.add_argument(
+        "--dist-dir",
+        default=str(Path(__file__).parents[1] / "dist"),
+        help="Pyodide dist directory (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--imports",
+        default=IMPORTS,
+        help="Modules to import (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--alignment",
+        type=int,
+        default=4096,
+        help="Member alignment of the uncompressed zip (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of fresh Pyodide instances per format (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="path to a json file where the results will be saved",
+    )
+    args = parser.parse_args()
+
+    dist_dir = Path(args.dist_dir).resolve()
+    results = {}
+    with TemporaryDirectory() as tmp:
+        variants = make_variants(
+            dist_dir / "python_stdlib.zip", Path(tmp), args.alignment
+        )
+        for name, path in variants.items():
+            runs = [
+                time_imports(dist_dir, path, args.imports) for _ in range(args.repeat)
+            ]
+            results[name] = {
+                "size": path.stat().st_size,
+                "load_median_ms": statistics.median(run["load"] for run in runs),
+                "median_ms": statistics.median(run["total"] for run in runs),
+                "runs_ms": runs,
+            }
+            print(
+                f"{name:>24}: {results[name]['size']:>10} bytes  "
+                f"loadPyodide: {results[name]['load_median_ms']:.2f} ms  "
+                f"loadPyodide + import {args.imports}: "
+                f"{results[name]['median_ms']:.2f} ms"
+            )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -140,6 +140,9 @@ def get_obj_mod(doclet: TopLevel) -> str:
     if filename == "canvas.":
         return "pyodide.canvas"
 
+    if filename == "profile.":
+        return "pyodide.profile"
+
     if doclet.name in FFI_FIELDS and not has_tag(doclet, "alias"):
         return "pyodide.ffi"
     doclet.is_static = False
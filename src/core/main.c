@@ -58,6 +58,10 @@ initialize_python(int argc, char** argv)
 PyObject*
 PyInit__pyodide_core(void);
 
+// Generated by tools/freeze_modules.py from PYODIDE_FROZEN_MODULES. Empty
+// unless some modules were selected for freezing.
+extern const struct _frozen _PyodideFrozenModules[];
+
 /**
  * Bootstrap steps here:
  *  1. Import _pyodide package (we depend on this in _pyodide_core)
@@ -74,6 +78,8 @@ main(int argc, char** argv)
   // This exits and prints a message to stderr on failure,
   // no status code to check.
   PyImport_AppendInittab("_pyodide_core", PyInit__pyodide_core);
+  // Frozen modules are imported without reading the stdlib zip.
+  PyImport_FrozenModules = _PyodideFrozenModules;
   initialize_python(argc, argv);
   // Normally the runtime would exit when main() returns, don't let that
   // happen.
@@ -0,0 +1,44 @@
+#include "emscripten.h"
+#include "jslib.h"
+#include <stdint.h>
+
+// openat override for lazy NativeFS mounts.
+//
+// A lazy mount (see nativefs.ts) only knows the size of its files until they
+// are opened. Before the original Emscripten openat runs, we fetch the
+// contents of a file that isn't loaded yet from its FileSystemFileHandle,
+// suspending the WASM stack with JSPI like the socket syscalls do.
+//
+// If we can't suspend, the file is left alone and the open handler of the
+// mount tries to load it synchronously.
+
+extern int
+syscall_syncify(JsVal promise);
+
+// Returns a Promise resolving to 0 or -errno if the path is a file in a lazy
+// NativeFS mount that needs to be fetched, null for everything else.
+EM_JS(JsVal, _maybe_load_lazy_file_async, (int dirfd, intptr_t path), {
+  if (!validSuspender.value) {
+    return null;
+  }
+  var NATIVEFS = Module.FS.filesystems.NATIVEFS_ASYNC;
+  return NATIVEFS.maybeLoadLazyFile(dirfd, UTF8ToString(path));
+})
+
+// clang-format off
+
+int __real___syscall_openat(int dirfd, intptr_t path, int flags, intptr_t varargs);
+
+int __wrap___syscall_openat(int dirfd, intptr_t path, int flags, intptr_t varargs)
+{
+  JsVal p = _maybe_load_lazy_file_async(dirfd, path);
+  if (!__builtin_wasm_ref_is_null_extern(p)) {
+    int result = syscall_syncify(p);
+    if (result < 0) {
+      return result;
+    }
+  }
+  return __real___syscall_openat(dirfd, path, flags, varargs);
+}
+
+// clang-format on
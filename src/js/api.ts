@@ -1,13 +1,25 @@
 import { ffi } from "./ffi";
 import { CanvasInterface, canvas } from "./canvas";
+import {
+  ProfileInterface,
+  profile,
+  setUserInterruptBuffer,
+  getUserInterruptBuffer,
+} from "./profile";
 
-import { loadPackage, loadedPackages } from "./load-package";
+import { loadPackage, loadedPackages, prefetchPackage } from "./load-package";
 import { type PyProxy, type PyDict } from "generated/pyproxy";
 import { loadBinaryFile, nodeFSMod } from "./compat";
 import { version } from "./version";
 import { setStdin, setStdout, setStderr } from "./streams";
 import { scheduleCallback } from "./scheduler";
-import { TypedArray, PackageData, FSType, Lockfile } from "./types";
+import {
+  TypedArray,
+  PackageData,
+  FSType,
+  Lockfile,
+  StartupProfile,
+} from "./types";
 import { RUNTIME_ENV } from "./environments";
 // @ts-ignore
 import LiteralMap from "./common/literal-map";
@@ -94,6 +106,35 @@ if (typeof AbortSignal !== "undefined" && AbortSignal.any) {
 
 API.LiteralMap = LiteralMap;
 
+const JS_FUNCTION_CACHE_SIZE = 256;
+const jsFunctionCache: Map<string, Function> = new Map();
+
+/**
+ * Evaluate ``code`` to a function for :py:func:`pyodide.code.run_js_function`.
+ * The function is only compiled the first time, later calls with the same
+ * ``code`` return it from the cache. The cache is kept on the JavaScript side,
+ * so every call returns a new proxy which the caller may destroy. Returns
+ * ``undefined`` if ``code`` doesn't evaluate to a function.
+ * @private
+ */
+API.getJsFunction = function (code: string): Function | undefined {
+  let func = jsFunctionCache.get(code);
+  if (func) {
+    // Move it to the end, the least recently used function is evicted first.
+    jsFunctionCache.delete(code);
+  } else {
+    func = API.config.jsglobals.eval(code);
+    if (typeof func !== "function") {
+      return undefined;
+    }
+    if (jsFunctionCache.size >= JS_FUNCTION_CACHE_SIZE) {
+      jsFunctionCache.delete(jsFunctionCache.keys().next().value!);
+    }
+  }
+  jsFunctionCache.set(code, func);
+  return func;
+};
+
 function ensureMountPathExists(path: string): void {
   Module.FS.mkdirTree(path);
   const { node } = Module.FS.lookupPath(path, {
@@ -111,6 +152,28 @@ function ensureMountPathExists(path: string): void {
   }
 }
 
+/**
+ * The names of the known packages that provide the modules imported by
+ * ``code``.
+ */
+function packagesFromImports(code: string): string[] {
+  const pyimports = API.pyodide_code.find_imports(code);
+  let imports: string[];
+  try {
+    imports = pyimports.toJs();
+  } finally {
+    pyimports.destroy();
+  }
+  const packageNames = API._import_name_to_package_name;
+  const packages: Set<string> = new Set();
+  for (const name of imports) {
+    if (packageNames.has(name)) {
+      packages.add(packageNames.get(name)!);
+    }
+  }
+  return Array.from(packages);
+}
+
 /**
  * Why is this a class rather than an object?
  * 1. It causes documentation items to be created for the entries so we can copy
@@ -182,6 +245,13 @@ export class PyodideAPI_ {
    */
   static canvas: CanvasInterface = canvas;
 
+  /**
+   * APIs to control the Python sampling profiler.
+   * @summaryLink :ref:`profile <js-api-pyodide-profile>`
+   * @omitFromAutoModule
+   */
+  static profile: ProfileInterface = profile;
+
   /**
    * A map from posix error names to error codes.
    */
@@ -228,28 +298,36 @@ export class PyodideAPI_ {
       checkIntegrity: true,
     },
   ): Promise<Array<PackageData>> {
-    let pyimports = API.pyodide_code.find_imports(code);
-    let imports;
-    try {
-      imports = pyimports.toJs();
-    } finally {
-      pyimports.destroy();
-    }
-    if (imports.length === 0) {
-      return [];
+    const packages = packagesFromImports(code);
+    if (packages.length) {
+      return await loadPackage(packages, options);
     }
+    return [];
+  }
 
-    let packageNames = API._import_name_to_package_name;
-    let packages: Set<string> = new Set();
-    for (let name of imports) {
-      if (packageNames.has(name)) {
-        packages.add(packageNames.get(name)!);
-      }
-    }
-    if (packages.size) {
-      return await loadPackage(Array.from(packages), options);
+  /**
+   * Inspect a Python code chunk like :js:func:`loadPackagesFromImports` and
+   * download the packages it imports together with all of their dependencies,
+   * but don't install them. A later :js:func:`pyodide.loadPackage` or
+   * :js:func:`loadPackagesFromImports` call only has to install the
+   * downloaded packages.
+   *
+   * This is intended for editors, which can call it while the user is still
+   * typing.
+   *
+   * @param code The code to inspect.
+   * @param options
+   * @param options.checkIntegrity If true, check the integrity of the downloaded
+   *    packages (default: true)
+   */
+  static async prefetchPackagesFromImports(
+    code: string,
+    options: { checkIntegrity?: boolean } = {},
+  ): Promise<void> {
+    const packages = packagesFromImports(code);
+    if (packages.length) {
+      await prefetchPackage(packages, options);
     }
-    return [];
   }
 
   /**
@@ -551,10 +629,19 @@ export class PyodideAPI_ {
    * @param fileSystemHandle A handle returned by
    * :js:func:`navigator.storage.getDirectory() <getDirectory>` or
    * :js:func:`window.showDirectoryPicker() <showDirectoryPicker>`.
+   * @param options
+   * @param options.lazy If ``true``, only the directory structure is read when
+   * mounting. The contents of a file are fetched when it is first opened. See
+   * :ref:`nativefs-lazy`. Defaults to ``false``.
+   * @param options.cacheSize The number of bytes of file contents a lazy mount
+   * keeps in memory. Above this, the contents of files that are closed and
+   * haven't been changed are dropped, least recently used first. Defaults to
+   * 256 MiB.
    */
   static async mountNativeFS(
     path: string,
     fileSystemHandle: FileSystemDirectoryHandle,
+    options: { lazy?: boolean; cacheSize?: number } = {},
     // TODO: support sync file system
     // sync: boolean = false
   ): Promise<NativeFS> {
@@ -563,11 +650,20 @@ export class PyodideAPI_ {
         `Expected argument 'fileSystemHandle' to be a FileSystemDirectoryHandle`,
       );
     }
+    const { lazy = false, cacheSize } = options;
+    if (
+      cacheSize !== undefined &&
+      !(Number.isInteger(cacheSize) && cacheSize >= 0)
+    ) {
+      throw new TypeError(
+        `cacheSize should be a non-negative integer, got ${cacheSize}`,
+      );
+    }
     ensureMountPathExists(path);
 
     Module.FS.mount(
       Module.FS.filesystems.NATIVEFS_ASYNC,
-      { fileSystemHandle },
+      { fileSystemHandle, lazy, cacheSize },
       path,
     );
 
@@ -652,10 +748,36 @@ export class PyodideAPI_ {
    * Even signals that normally have special meaning and can't be overridden like
    * ``SIGKILL`` and ``SIGSEGV`` are ignored by default and can be used for any
    * purpose you like.
+   *
+   * Reading the interrupt buffer requires a call into JavaScript, so Python
+   * only checks it once every ``checkInterval`` times that the interpreter
+   * checks for pending events (roughly once per loop iteration or function
+   * call). A larger interval makes interruptible code run faster at the cost
+   * of a longer delay before the interrupt is noticed. Calls to
+   * :js:func:`~pyodide.checkInterrupt` and blocking I/O always check the buffer
+   * immediately.
+   *
+   * @param interrupt_buffer The interrupt buffer, or ``undefined`` to disable
+   * interrupts.
+   * @param options
+   * @param options.checkInterval How many times the interpreter checks for
+   * pending events between reads of the interrupt buffer. Defaults to 50.
    */
-  static setInterruptBuffer(interrupt_buffer: TypedArray) {
-    Module.HEAP8[Module._Py_EMSCRIPTEN_SIGNAL_HANDLING] = +!!interrupt_buffer;
-    Module.Py_EmscriptenSignalBuffer = interrupt_buffer;
+  static setInterruptBuffer(
+    interrupt_buffer: TypedArray,
+    options: { checkInterval?: number } = {},
+  ) {
+    // The default matches PY_EMSCRIPTEN_SIGNAL_DEFAULT_INTERVAL in CPython.
+    const { checkInterval = 50 } = options;
+    if (!Number.isInteger(checkInterval) || checkInterval < 1) {
+      throw new TypeError(
+        `checkInterval should be a positive integer, got ${checkInterval}`,
+      );
+    }
+    setUserInterruptBuffer(interrupt_buffer);
+    Module.HEAP32[Module.__Py_emscripten_signal_interval >> 2] = checkInterval;
+    // Restart the countdown so the new interval applies right away.
+    Module.HEAP32[Module.__Py_emscripten_signal_clock >> 2] = checkInterval;
   }
 
   /**
@@ -677,7 +799,7 @@ export class PyodideAPI_ {
       // GIL not held. This is very likely because we're in a IO handler. If
       // buffer has a 2, throwing EINTR quits out from the IO handler and tells
       // the calling context to call `PyErr_CheckSignals`.
-      const buf = Module.Py_EmscriptenSignalBuffer;
+      const buf = getUserInterruptBuffer();
       if (buf && buf[0] === 2) {
         throw new Module.FS.ErrnoError(cDefs.EINTR);
       }
@@ -728,6 +850,14 @@ export class PyodideAPI_ {
   static get lockfileBaseUrl(): string | undefined {
     return API.config.packageCacheDir ?? API.config.packageBaseUrl;
   }
+
+  /**
+   * How long each stage of :js:func:`~exports.loadPyodide` took. Only set if
+   * the ``profileStartup`` option was passed to ``loadPyodide``.
+   */
+  static get startupProfile(): StartupProfile | undefined {
+    return API.startupProfile;
+  }
 }
 
 /**
@@ -801,6 +931,12 @@ API.finalizeBootstrap = function (
   if (snapshotConfig) {
     syncUpSnapshotLoad1();
   }
+  if (API.config.profileStartup && !snapshotConfig) {
+    // Start before _pyodide_core imports _pyodide, which does most of the
+    // bootstrap imports.
+    API.importTimeOrigin = performance.now();
+    API.rawRun("import _pyodide_importtime; _pyodide_importtime.start()");
+  }
   let [err, captured_stderr] = API.rawRun("import _pyodide_core");
   if (err) {
     API.fatal_loading_error(
@@ -842,6 +978,7 @@ API.finalizeBootstrap = function (
     importhook.register_js_module("js", jsglobals);
     importhook.register_js_module("pyodide_js", pyodide);
     importhook.register_windows_finder();
+    importhook.register_stdlib_remainder_finder();
   }
 
   // import pyodide_py. We want to ensure that as much stuff as possible is
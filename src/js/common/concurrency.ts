@@ -0,0 +1,29 @@
+/**
+ * Call ``fn`` on every item, with at most ``limit`` calls in flight at once.
+ *
+ * @param items The items to process.
+ * @param limit The maximum number of concurrent calls.
+ * @param fn The async function to call on each item.
+ * @returns The results, in the same order as ``items``.
+ * @private
+ */
+export async function mapConcurrent<T, R>(
+  items: readonly T[],
+  limit: number,
+  fn: (item: T, index: number) => Promise<R>,
+): Promise<R[]> {
+  const results: R[] = new Array(items.length);
+  let next = 0;
+  async function worker() {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index], index);
+    }
+  }
+  const workers = [];
+  for (let i = 0; i < Math.min(limit, items.length); i++) {
+    workers.push(worker());
+  }
+  await Promise.all(workers);
+  return results;
+}
@@ -1,6 +1,6 @@
 import ErrorStackParser from "./vendor/stackframe/error-stack-parser";
 import { RUNTIME_ENV } from "./environments";
-import { Lockfile } from "./types";
+import { Lockfile, WheelCompression } from "./types";
 let nodeUrlMod: typeof import("node:url");
 let nodePath: typeof import("node:path");
 let nodeVmMod: typeof import("node:vm");
@@ -8,6 +8,8 @@ let nodeVmMod: typeof import("node:vm");
 export let nodeFSMod: typeof import("node:fs");
 /** @private */
 export let nodeFsPromisesMod: typeof import("node:fs/promises");
+/** @private */
+export let nodeCryptoMod: typeof import("node:crypto");
 
 declare function read(a: string): string;
 declare function readbuffer(a: string): ArrayBuffer;
@@ -32,6 +34,7 @@ export async function initNodeModules() {
   nodeUrlMod = (await import("node:url")).default;
   nodeFSMod = await import("node:fs");
   nodeFsPromisesMod = await import("node:fs/promises");
+  nodeCryptoMod = await import("node:crypto");
 
   // @ts-ignore
   nodeVmMod = (await import("node:vm")).default;
@@ -50,7 +53,7 @@ export async function initNodeModules() {
   // list with:
   // $ grep -o 'require("[a-z]*")' pyodide.asm.mjs  | sort -u
   const fs = nodeFSMod;
-  const crypto = await import("node:crypto");
+  const crypto = nodeCryptoMod;
   const ws = await import("ws");
   const child_process = await import("node:child_process");
   const node_modules: { [mode: string]: any } = {
@@ -194,18 +197,58 @@ if (RUNTIME_ENV.IN_NODE) {
 export async function loadBinaryFile(
   path: string,
   file_sub_resource_hash?: string | undefined,
+  compression?: WheelCompression,
 ): Promise<Uint8Array> {
   const { response, binary } = getBinaryResponse(path, file_sub_resource_hash);
   if (binary) {
-    return binary;
+    if (!compression) {
+      return binary;
+    }
+    return decompress(new Blob([await binary]).stream(), compression);
   }
   const r = await response;
   if (!r.ok) {
     throw new Error(`Failed to load '${path}': request failed.`);
   }
+  if (compression && r.body) {
+    return decompress(r.body, compression);
+  }
   return new Uint8Array(await r.arrayBuffer());
 }
 
+const DECOMPRESSION_FORMATS: Record<WheelCompression, string> = {
+  br: "brotli",
+  zstd: "zstd",
+};
+
+async function decompress(
+  stream: ReadableStream<Uint8Array>,
+  compression: WheelCompression,
+): Promise<Uint8Array> {
+  const format = DECOMPRESSION_FORMATS[compression] as CompressionFormat;
+  const decompressed = stream.pipeThrough(new DecompressionStream(format));
+  return new Uint8Array(await new Response(decompressed).arrayBuffer());
+}
+
+/**
+ * The encodings of compressed wheels that ``loadBinaryFile`` can decode, most
+ * preferred first. Brotli wheels are the smallest, so they come first.
+ * @private
+ */
+export const supportedWheelCompressions: WheelCompression[] = (
+  ["br", "zstd"] as const
+).filter((compression) => {
+  try {
+    new DecompressionStream(
+      DECOMPRESSION_FORMATS[compression] as CompressionFormat,
+    );
+    return true;
+  } catch {
+    // DecompressionStream is missing or doesn't know the format.
+    return false;
+  }
+});
+
 /**
  * Load the pyodide.asm.mjs ES6 module
  * @param url
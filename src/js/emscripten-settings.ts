@@ -6,6 +6,7 @@ import { loadBinaryFile, getBinaryResponse } from "./compat";
 import { API, PreRunFunc, type PyodideModule, type FSType } from "./types";
 import { getJsvErrorImport } from "generated/jsverror";
 import { RUNTIME_ENV } from "./environments";
+import { StartupProfiler } from "./startup-profiler";
 
 /**
  * @private
@@ -43,13 +44,14 @@ export interface EmscriptenSettings {
  */
 export function createSettings(
   config: PyodideConfigWithDefaults,
+  profiler: StartupProfiler = new StartupProfiler(false),
 ): EmscriptenSettings {
   const API = { config, runtimeEnv: RUNTIME_ENV } as API;
   const settings: EmscriptenSettings = {
     noImageDecoding: true,
     noAudioDecoding: true,
     noWasmDecoding: false,
-    preRun: getFileSystemInitializationFuncs(config),
+    preRun: getFileSystemInitializationFuncs(config, profiler),
     print: config.stdout,
     printErr: config.stderr,
     onExit(code) {
@@ -70,7 +72,7 @@ export function createSettings(
     // means dependency resolution has already failed and we want to throw an
     // error anyways.
     locateFile: (path: string) => config.indexURL + path,
-    instantiateWasm: getInstantiateWasmFunc(config.indexURL),
+    instantiateWasm: getInstantiateWasmFunc(config.indexURL, config._wasmModule),
   };
   return settings;
 }
@@ -144,10 +146,14 @@ function computeVersionTuple(Module: PyodideModule): [number, number, number] {
  * - Use compiled(.pyc) or uncompiled(.py) standard library.
  * - Remove unused modules or add additional modules using bundlers like pyodide-pack.
  *
- * @param stdlibURL The URL for the Python standard library
+ * @param stdlib The URL for the Python standard library, or its contents if
+ * they have already been loaded (e.g., by a snapshot pool).
  */
-function installStdlib(stdlibURL: string): PreRunFunc {
-  const stdlibPromise: Promise<Uint8Array> = loadBinaryFile(stdlibURL);
+function installStdlib(stdlib: string | PromiseLike<Uint8Array>): PreRunFunc {
+  const stdlibPromise: Promise<Uint8Array> =
+    typeof stdlib === "string"
+      ? loadBinaryFile(stdlib)
+      : Promise.resolve(stdlib);
   return async (Module: PyodideModule) => {
     Module.API.pyVersionTuple = computeVersionTuple(Module);
     const [pymajor, pyminor] = Module.API.pyVersionTuple;
@@ -172,12 +178,51 @@ function installStdlib(stdlibURL: string): PreRunFunc {
   };
 }
 
+/**
+ * Install the part of the standard library that was pruned from the stdlib
+ * zip. Startup doesn't wait for it: the download finishes in the background
+ * and Python's StdlibRemainderFinder mounts it on the first import that misses.
+ * Until then, API.stdlibRemainderPending is the promise that imports wait for.
+ *
+ * @param remainderURL The URL for the rest of the Python standard library
+ */
+function installStdlibRemainder(
+  remainderURL: string | undefined,
+): PreRunFunc[] {
+  if (!remainderURL) {
+    return [];
+  }
+  const remainderPromise: Promise<Uint8Array> = loadBinaryFile(remainderURL);
+  return [
+    (Module: PyodideModule) => {
+      const [pymajor, pyminor] = Module.API.pyVersionTuple;
+      Module.API.stdlibRemainderPending = remainderPromise
+        .then((remainder) =>
+          Module.FS.writeFile(
+            `/lib/python${pymajor}${pyminor}_remainder.zip`,
+            remainder,
+          ),
+        )
+        .catch((e) => {
+          console.error(
+            "Error occurred while installing the standard library remainder:",
+          );
+          console.error(e);
+        })
+        .finally(() => {
+          Module.API.stdlibRemainderPending = undefined;
+        });
+    },
+  ];
+}
+
 /**
  * Initialize the virtual file system, before loading Python interpreter.
  * @private
  */
 function getFileSystemInitializationFuncs(
   config: PyodideConfigWithDefaults,
+  profiler: StartupProfiler,
 ): PreRunFunc[] {
   let stdLibURL;
   if (config.stdLibURL != undefined) {
@@ -187,16 +232,26 @@ function getFileSystemInitializationFuncs(
   }
 
   return [
-    installStdlib(stdLibURL),
-    createHomeDirectory(config.env.HOME),
-    setEnvironment(config.env),
-    initializeNativeFS,
-    ...callFsInitHook(config.fsInit),
+    profiler.wrapPreRun(
+      "installStdlib",
+      installStdlib(config._stdlib ?? stdLibURL),
+    ),
+    ...installStdlibRemainder(config.stdLibRemainderURL),
+    profiler.wrapPreRun(
+      "createHomeDirectory",
+      createHomeDirectory(config.env.HOME),
+    ),
+    profiler.wrapPreRun("setEnvironment", setEnvironment(config.env)),
+    profiler.wrapPreRun("initializeNativeFS", initializeNativeFS),
+    ...callFsInitHook(config.fsInit).map((hook) =>
+      profiler.wrapPreRun("fsInit", hook),
+    ),
   ];
 }
 
 function getInstantiateWasmFunc(
   indexURL: string,
+  wasmModule?: WebAssembly.Module | PromiseLike<WebAssembly.Module>,
 ): EmscriptenSettings["instantiateWasm"] {
   // @ts-ignore
   if (DISABLE_INSTANTIATE_WASM) {
@@ -205,6 +260,9 @@ function getInstantiateWasmFunc(
     // TODO: Fix this...
     return;
   }
+  if (wasmModule) {
+    return getInstantiateCompiledWasmFunc(wasmModule);
+  }
   const { binary, response } = getBinaryResponse(indexURL + "pyodide.asm.wasm");
   const jsvErrorImportPromise = getJsvErrorImport();
   return function (
@@ -237,3 +295,38 @@ function getInstantiateWasmFunc(
     return {}; // Compiling asynchronously, no exports.
   };
 }
+
+/**
+ * Like getInstantiateWasmFunc() but instantiates an already compiled
+ * WebAssembly.Module. This lets several Pyodide instances share one compiled
+ * module instead of each downloading and compiling pyodide.asm.wasm.
+ */
+function getInstantiateCompiledWasmFunc(
+  wasmModule: WebAssembly.Module | PromiseLike<WebAssembly.Module>,
+): EmscriptenSettings["instantiateWasm"] {
+  const jsvErrorImportPromise = getJsvErrorImport();
+  return function (
+    imports: { [key: string]: { [key: string]: any } },
+    successCallback: (
+      instance: WebAssembly.Instance,
+      module: WebAssembly.Module,
+    ) => void,
+  ) {
+    (async function () {
+      const { Jsv_GetError_import, JsvError_Check } =
+        await jsvErrorImportPromise;
+      imports.env.Jsv_GetError_import = Jsv_GetError_import;
+      imports.env.JsvError_Check = JsvError_Check;
+      try {
+        const module = await wasmModule;
+        const instance = await WebAssembly.instantiate(module, imports);
+        successCallback(instance, module);
+      } catch (e) {
+        console.warn("wasm instantiation failed!");
+        console.warn(e);
+      }
+    })();
+
+    return {}; // Compiling asynchronously, no exports.
+  };
+}
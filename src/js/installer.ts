@@ -1,6 +1,10 @@
 import { DynlibLoader } from "./dynload";
 import { uriToPackageData } from "./packaging-utils";
-import { PackageManagerAPI, PackageManagerModule } from "./types";
+import {
+  PackageLoadTiming,
+  PackageManagerAPI,
+  PackageManagerModule,
+} from "./types";
 
 /**
  * The Installer class is responsible for installing packages into the Pyodide filesystem.
@@ -25,7 +29,9 @@ export class Installer {
     filename: string,
     installDir: string,
     metadata?: ReadonlyMap<string, string>,
+    timing?: Partial<PackageLoadTiming>,
   ) {
+    let start = performance.now();
     const dynlibs: string[] = this.#api.package_loader.unpack_buffer.callKwargs(
       {
         buffer,
@@ -41,10 +47,18 @@ export class Installer {
         `Found ${dynlibs.length} dynamic libraries inside ${filename}`,
       );
 
+    if (timing) {
+      timing.unpack = performance.now() - start;
+      start = performance.now();
+    }
+
     await this.#dynlibLoader.loadDynlibsFromPackage(
       { file_name: filename },
       dynlibs,
     );
+    if (timing) {
+      timing.dynlibs = performance.now() - start;
+    }
   }
 }
 
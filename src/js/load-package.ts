@@ -3,7 +3,9 @@ import {
   Lockfile,
   PackageData,
   LockfilePackage,
+  LockfileBundle,
   PackageLoadMetadata,
+  PackageLoadTiming,
   PackageManagerAPI,
   PackageManagerModule,
   LoadedPackages,
@@ -25,8 +27,10 @@ import {
   initNodeModules,
   ensureDirNode,
   isAbsolute,
+  supportedWheelCompressions,
 } from "./compat";
 import { Installer } from "./installer";
+import { WheelCache } from "./wheel-cache";
 import { createContextWrapper } from "./common/contextManager";
 
 /**
@@ -60,6 +64,7 @@ export async function initializePackageIndex(
   API.lockfile = lockfile;
   API.lockfile_info = lockfile.info;
   API.lockfile_packages = lockfile.packages;
+  API.lockfile_bundles = lockfile.bundles ?? {};
   // Used in `pyodide venv`. Keeping for backward compatibility.
   API.lockfile_unvendored_stdlibs_and_test = [];
 
@@ -96,6 +101,10 @@ export class PackageManager {
   #api: PackageManagerAPI;
   #module: PackageManagerModule;
   #installer: Installer;
+  /**
+   * Only used in Node, if ``wheelCacheDir`` is set.
+   */
+  #wheelCache?: WheelCache;
 
   /**
    * Only used in Node. If we can't find a package in node_modules, we'll use this
@@ -118,6 +127,12 @@ export class PackageManager {
 
   public installBaseUrl?: string;
 
+  /**
+   * If set to an array, the time taken by each step of loading a package is
+   * appended to it. Used by benchmark/package_load_benchmark.py.
+   */
+  public timings?: PackageLoadTiming[];
+
   /**
    * The function to use for stdout and stderr, defaults to console.log and console.error
    */
@@ -135,6 +150,15 @@ export class PackageManager {
 
   private defaultChannel: string = DEFAULT_CHANNEL;
 
+  /**
+   * Downloads started by prefetchPackage that haven't been installed yet,
+   * keyed by normalized package name.
+   */
+  #prefetched: Map<
+    string,
+    { checkIntegrity: boolean; download: Promise<Uint8Array> }
+  > = new Map();
+
   constructor(api: PackageManagerAPI, pyodideModule: PackageManagerModule) {
     this.#api = api;
     this.#module = pyodideModule;
@@ -146,6 +170,12 @@ export class PackageManager {
       this.installBaseUrl =
         this.#api.config.packageCacheDir ?? this.#api.config.packageBaseUrl;
       this.cdnURL = this.#api.config.cdnUrl;
+      if (this.#api.config.wheelCacheDir) {
+        this.#wheelCache = new WheelCache(
+          this.#api.config.wheelCacheDir,
+          this.#api.config.wheelCacheSize,
+        );
+      }
     } else {
       // use packageBaseUrl as the base URL for the packages
       this.installBaseUrl = this.#api.config.packageBaseUrl;
@@ -235,6 +265,151 @@ export class PackageManager {
     return wrappedLoadPackage(names, options);
   }
 
+  /**
+   * Download packages and their dependencies without installing them, so that
+   * a later :js:func:`pyodide.loadPackage` only has to install them. Packages
+   * that are already loaded or being prefetched are skipped. Download errors
+   * are ignored, the package will be downloaded again when it is loaded.
+   *
+   * @param names Either a single package name or a list of them.
+   * @param options
+   * @param options.checkIntegrity If true, check the integrity of the downloaded
+   *    packages (default: true)
+   */
+  public async prefetchPackage(
+    names: string | PyProxy | Array<string>,
+    options: { checkIntegrity?: boolean } = {},
+  ): Promise<void> {
+    const checkIntegrity = options.checkIntegrity ?? true;
+    const toLoad = this.recursiveDependencies(toStringArray(names));
+    const downloads = this.downloadBundles(toLoad, checkIntegrity);
+    for (const pkg of toLoad.values()) {
+      if (
+        pkg.channel !== this.defaultChannel ||
+        this.getLoadedPackageChannel(pkg.name) ||
+        this.#prefetched.has(pkg.normalizedName)
+      ) {
+        continue;
+      }
+      const download = this.downloadPackage(pkg, checkIntegrity);
+      this.#prefetched.set(pkg.normalizedName, { checkIntegrity, download });
+      download.catch(() => {
+        if (this.#prefetched.get(pkg.normalizedName)?.download === download) {
+          this.#prefetched.delete(pkg.normalizedName);
+        }
+      });
+      downloads.push(download);
+    }
+    await Promise.allSettled(downloads);
+  }
+
+  /**
+   * Take the prefetched download of a package, if there is a usable one.
+   * @private
+   */
+  private takePrefetched(
+    pkg: PackageLoadMetadata,
+    checkIntegrity: boolean,
+  ): Promise<Uint8Array> | undefined {
+    if (pkg.channel !== this.defaultChannel) {
+      return undefined;
+    }
+    const prefetched = this.#prefetched.get(pkg.normalizedName);
+    if (!prefetched || (checkIntegrity && !prefetched.checkIntegrity)) {
+      return undefined;
+    }
+    this.#prefetched.delete(pkg.normalizedName);
+    return prefetched.download;
+  }
+
+  /**
+   * Start downloading the bundles that save requests for the packages in
+   * ``toLoad``. A bundle is used if it holds at least two of the packages and
+   * nothing else that isn't loaded yet. The wheels in it are then taken like
+   * prefetched downloads, members that are already loaded are skipped.
+   * @param toLoad The map of package names to PackageLoadMetadata
+   * @param checkIntegrity Whether to check the integrity of the bundles
+   * @returns The downloads of the bundles
+   * @private
+   */
+  private downloadBundles(
+    toLoad: Map<string, PackageLoadMetadata>,
+    checkIntegrity: boolean,
+  ): Promise<Uint8Array>[] {
+    const needed = new Set<string>();
+    for (const pkg of toLoad.values()) {
+      if (
+        pkg.channel === this.defaultChannel &&
+        !this.getLoadedPackageChannel(pkg.name) &&
+        !this.#prefetched.has(pkg.normalizedName)
+      ) {
+        needed.add(pkg.normalizedName);
+      }
+    }
+    const downloads = [];
+    for (const bundle of Object.values(this.#api.lockfile_bundles)) {
+      const members = bundle.packages.map(({ name }) => name);
+      const wanted = members.filter((name) => needed.has(name));
+      const loaded = (name: string) =>
+        this.getLoadedPackageChannel(
+          this.#api.lockfile_packages[name]?.name ?? name,
+        );
+      if (
+        wanted.length < 2 ||
+        !members.every((name) => needed.has(name) || loaded(name))
+      ) {
+        continue;
+      }
+
+      const download = this.downloadBundle(bundle, checkIntegrity);
+      let offset = 0;
+      for (const { name, size } of bundle.packages) {
+        const start = offset;
+        offset += size;
+        if (!needed.delete(name)) {
+          continue;
+        }
+        const member = download.then((buffer) =>
+          buffer.subarray(start, start + size),
+        );
+        this.#prefetched.set(name, { checkIntegrity, download: member });
+        member.catch(() => {
+          if (this.#prefetched.get(name)?.download === member) {
+            this.#prefetched.delete(name);
+          }
+        });
+      }
+      downloads.push(download);
+    }
+    return downloads;
+  }
+
+  /**
+   * Download a bundle.
+   * @param bundle The bundle to download
+   * @param checkIntegrity Whether to check the integrity of the bundle
+   * @returns The contents of the bundle
+   * @private
+   */
+  private async downloadBundle(
+    bundle: LockfileBundle,
+    checkIntegrity: boolean,
+  ): Promise<Uint8Array> {
+    const uri = resolvePath(bundle.file_name, this.installBaseUrl);
+    const fileSubResourceHash = checkIntegrity
+      ? "sha256-" + base16ToBase64(bundle.sha256)
+      : undefined;
+    DEBUG && console.debug(`Downloading bundle from ${uri}`);
+    const buffer = await loadBinaryFile(uri, fileSubResourceHash);
+    const size = bundle.packages.reduce((total, { size }) => total + size, 0);
+    if (buffer.length !== size) {
+      throw new Error(
+        `Bundle ${bundle.file_name} is ${buffer.length} bytes long, expected ${size}`,
+      );
+    }
+    return buffer;
+  }
+
   public async loadPackageInner(
     names: string | PyProxy | string[],
     options: {
@@ -280,6 +455,7 @@ export class PackageManager {
     const releaseLock = await this._lock();
     try {
       this.logStdout(`Loading ${packageNames}`);
+      this.downloadBundles(toLoad, options.checkIntegrity ?? true);
       for (const [_, pkg] of toLoad) {
         if (this.getLoadedPackageChannel(pkg.name)) {
           // Handle the race condition where the package was loaded between when
@@ -445,7 +621,7 @@ export class PackageManager {
   ): Promise<Uint8Array> {
     await ensureDirNode(this.installBaseUrl);
 
-    let fileName, uri, fileSubResourceHash;
+    let fileName, uri, fileSubResourceHash, sha256, compression;
     if (pkg.channel === this.defaultChannel) {
       if (!(pkg.normalizedName in this.#api.lockfile_packages)) {
         throw new Error(`Internal error: no entry for package named ${name}`);
@@ -460,7 +636,21 @@ export class PackageManager {
       }
 
       uri = resolvePath(fileName, this.installBaseUrl);
-      fileSubResourceHash = "sha256-" + base16ToBase64(lockfilePackage.sha256);
+      sha256 = lockfilePackage.sha256;
+      fileSubResourceHash = "sha256-" + base16ToBase64(sha256);
+      // Node reads wheels from packageCacheDir, where compressing them
+      // doesn't save anything.
+      const compressed = RUNTIME_ENV.IN_NODE
+        ? undefined
+        : supportedWheelCompressions.find(
+            (encoding) => lockfilePackage.compressed_files?.[encoding],
+          );
+      if (compressed) {
+        const file = lockfilePackage.compressed_files![compressed]!;
+        uri = resolvePath(file.file_name, this.installBaseUrl);
+        fileSubResourceHash = "sha256-" + base16ToBase64(file.sha256);
+        compression = compressed;
+      }
     } else {
       uri = pkg.channel;
       fileSubResourceHash = undefined;
@@ -469,9 +659,25 @@ export class PackageManager {
     if (!checkIntegrity) {
       fileSubResourceHash = undefined;
     }
+    if (this.#wheelCache) {
+      const cached = await this.#wheelCache.get(uri, sha256);
+      if (cached) {
+        DEBUG && console.debug(`Loaded package ${pkg.name} from wheel cache`);
+        return cached;
+      }
+    }
     try {
       DEBUG && console.debug(`Downloading package ${pkg.name} from ${uri}`);
-      return await loadBinaryFile(uri, fileSubResourceHash);
+      const binary = await loadBinaryFile(
+        uri,
+        fileSubResourceHash,
+        compression,
+      );
+      // Local files, like wheels in packageCacheDir, aren't worth copying.
+      if (uri.includes("://") && !uri.startsWith("file://")) {
+        await this.cacheWheel(uri, binary);
+      }
+      return binary;
     } catch (e) {
       if (
         !RUNTIME_ENV.IN_NODE ||
@@ -488,6 +694,10 @@ export class PackageManager {
     // If we are RUNTIME_ENV.IN_NODE, download the package from the cdn, then stash it into
     // the node_modules directory for future use.
     let binary = await loadBinaryFile(this.cdnURL + fileName);
+    if (this.#wheelCache) {
+      await this.cacheWheel(this.cdnURL + fileName, binary);
+      return binary;
+    }
     this.logStdout(
       `Package ${fileName} loaded from ${this.cdnURL}, caching the wheel in node_modules for future use.`,
     );
@@ -495,6 +705,24 @@ export class PackageManager {
     return binary;
   }
 
+  /**
+   * Store a downloaded wheel in the wheel cache, if there is one. Failing to
+   * write the cache doesn't fail loading the package.
+   * @param uri The url the wheel was downloaded from
+   * @param binary The contents of the wheel
+   * @private
+   */
+  private async cacheWheel(uri: string, binary: Uint8Array) {
+    if (!this.#wheelCache) {
+      return;
+    }
+    try {
+      await this.#wheelCache.put(uri, binary);
+    } catch (e) {
+      this.logStderr(`Failed to store ${uri} in the wheel cache: ${e}`);
+    }
+  }
+
   /**
    * Install the package into the file system.
    * @param metadata The package metadata
@@ -504,6 +732,7 @@ export class PackageManager {
   private async installPackage(
     metadata: PackageLoadMetadata,
     buffer: Uint8Array,
+    timing?: Partial<PackageLoadTiming>,
   ) {
     let pkg = this.#api.lockfile_packages[metadata.normalizedName];
     if (!pkg) {
@@ -535,6 +764,7 @@ export class PackageManager {
             : metadata.channel,
         ],
       ]),
+      timing,
     );
   }
 
@@ -561,7 +791,18 @@ export class PackageManager {
     }
 
     try {
-      const buffer = await this.downloadPackage(pkg, checkIntegrity);
+      const start = performance.now();
+      const prefetched = this.takePrefetched(pkg, checkIntegrity);
+      const buffer = prefetched
+        ? await prefetched.catch(() =>
+            this.downloadPackage(pkg, checkIntegrity),
+          )
+        : await this.downloadPackage(pkg, checkIntegrity);
+      const timing: Partial<PackageLoadTiming> | undefined = this.timings && {
+        name: pkg.name,
+        size: buffer.length,
+        download: performance.now() - start,
+      };
       const installPromiseDependencies = pkg.depends.map((dependency) => {
         return toLoad.has(dependency)
           ? toLoad.get(dependency)!.done
@@ -573,7 +814,10 @@ export class PackageManager {
       // wait until all dependencies are installed
       await Promise.all(installPromiseDependencies);
 
-      await this.installPackage(pkg, buffer);
+      await this.installPackage(pkg, buffer, timing);
+      if (timing) {
+        this.timings!.push(timing as PackageLoadTiming);
+      }
 
       loaded.add(pkg.packageData);
       loadedPackages[pkg.name] = pkg.channel;
@@ -677,6 +921,7 @@ export function toStringArray(str: string | PyProxy | string[]): string[] {
 }
 
 export let loadPackage: typeof PackageManager.prototype.loadPackage;
+export let prefetchPackage: typeof PackageManager.prototype.prefetchPackage;
 /**
  * An object whose keys are the names of the loaded packages and whose values
  * are the install sources of the packages. Use
@@ -692,6 +937,9 @@ if (typeof API !== "undefined" && typeof Module !== "undefined") {
   loadPackage = singletonPackageManager.loadPackage.bind(
     singletonPackageManager,
   );
+  prefetchPackage = singletonPackageManager.prefetchPackage.bind(
+    singletonPackageManager,
+  );
 
   /**
    * The list of packages that Pyodide has loaded.
@@ -1,4 +1,46 @@
 import { PyodideModule } from "./types";
+import { mapConcurrent } from "./common/concurrency";
+
+// How many File System Access API operations to run at once during a sync.
+const SYNC_CONCURRENCY = 16;
+
+// How many bytes of file contents a lazy mount keeps in memory by default.
+const LAZY_CACHE_SIZE = 256 * 1024 * 1024;
+
+/**
+ * A file in a lazy mount whose contents come from the remote file. They are
+ * fetched when the file is opened and may be dropped again once it's closed.
+ * @private
+ */
+type LazyFile = {
+  handle: any;
+  // The File from the last sync, to read the contents synchronously when we
+  // can't suspend.
+  file: File;
+  loaded: boolean;
+  loading?: Promise<void>;
+};
+
+/**
+ * Per-mount state used to sync only what changed since the last sync.
+ * @private
+ */
+type NativeFSState = {
+  // Paths that were created, removed or renamed. The whole subtree below them
+  // is reconciled.
+  dirtyPaths: Set<string>;
+  // Files that were written to.
+  dirtyNodes: Set<any>;
+  // False while syncfs writes to the local file system.
+  tracking: boolean;
+  // Map from paths relative to the mount point to the remote handles, kept up
+  // to date by every sync. Undefined until the first full sync.
+  handles?: Map<string, any>;
+  // For lazy mounts, the files whose contents are loaded, least recently
+  // opened first.
+  lazyFiles?: Set<any>;
+  cacheSize: number;
+};
 
 /**
  * @private
@@ -48,22 +90,333 @@ export function initializeNativeFS(module: PyodideModule) {
       }
 
       // reuse all of the core MEMFS functionality
-      return MEMFS.mount.apply(null, arguments);
+      const root = MEMFS.mount.apply(null, arguments);
+      nativeFSAsync.trackChanges(mount, root);
+      if (mount.opts.lazy) {
+        nativeFSAsync.hasLazyMounts = true;
+      }
+      return root;
+    },
+    hasLazyMounts: false,
+    // Wrap the MEMFS operations of the nodes in the mount to record which
+    // paths change, like IDBFS does with autoPersist.
+    trackChanges: (mount: any, root: any) => {
+      const state: NativeFSState = {
+        dirtyPaths: new Set(),
+        dirtyNodes: new Set(),
+        tracking: true,
+        lazyFiles: mount.opts.lazy ? new Set() : undefined,
+        cacheSize: mount.opts.cacheSize ?? LAZY_CACHE_SIZE,
+      };
+      mount.nativefs = state;
+
+      const markPath = (parent: any, name: string) => {
+        if (state.tracking) {
+          state.dirtyPaths.add(PATH.join2(FS.getPath(parent), name));
+        }
+      };
+      const markNode = (node: any) => {
+        // Once written to, the local contents are the real ones.
+        delete node.nativefsLazy;
+        if (state.tracking) {
+          state.dirtyNodes.add(node);
+        }
+      };
+
+      const memfsDirOps = root.node_ops;
+      const dirOps = { ...memfsDirOps };
+      let fileOps: any;
+      let fileStreamOps: any;
+
+      dirOps.mknod = (parent: any, name: string, mode: number, dev: number) => {
+        const node = memfsDirOps.mknod(parent, name, mode, dev);
+        markPath(parent, name);
+        if (FS.isDir(node.mode)) {
+          node.node_ops = dirOps;
+        } else if (FS.isFile(node.mode)) {
+          if (!fileOps) {
+            const memfsFileOps = node.node_ops;
+            fileOps = {
+              ...memfsFileOps,
+              setattr: (node: any, attr: any) => {
+                if (attr.size) {
+                  nativeFSAsync.loadLazyFileSync(node);
+                }
+                memfsFileOps.setattr(node, attr);
+                if (attr.size !== undefined) {
+                  markNode(node);
+                }
+              },
+            };
+            const memfsStreamOps = node.stream_ops;
+            fileStreamOps = { ...memfsStreamOps };
+            for (const op of ["write", "msync"]) {
+              if (memfsStreamOps[op]) {
+                fileStreamOps[op] = (stream: any, ...args: any[]) => {
+                  markNode(stream.node);
+                  return memfsStreamOps[op](stream, ...args);
+                };
+              }
+            }
+            if (state.lazyFiles) {
+              nativeFSAsync.addLazyStreamOps(fileStreamOps);
+            }
+          }
+          node.node_ops = fileOps;
+          node.stream_ops = fileStreamOps;
+        }
+        return node;
+      };
+      dirOps.rename = (oldNode: any, newDir: any, newName: string) => {
+        const oldParent = oldNode.parent;
+        const oldName = oldNode.name;
+        memfsDirOps.rename(oldNode, newDir, newName);
+        markPath(oldParent, oldName);
+        markPath(newDir, newName);
+      };
+      for (const op of ["unlink", "rmdir", "symlink"]) {
+        dirOps[op] = (parent: any, name: string, ...args: any[]) => {
+          const result = memfsDirOps[op](parent, name, ...args);
+          markPath(parent, name);
+          return result;
+        };
+      }
+      root.node_ops = dirOps;
+    },
+    // Make the file streams of a lazy mount load the contents of the file when
+    // it's opened and count how often it's open, so that it's never evicted
+    // while in use.
+    addLazyStreamOps: (streamOps: any) => {
+      streamOps.open = (stream: any) => {
+        const node = stream.node;
+        nativeFSAsync.loadLazyFileSync(node);
+        node.nativefsOpenCount = (node.nativefsOpenCount ?? 0) + 1;
+        const lazyFiles = node.mount.nativefs.lazyFiles;
+        if (lazyFiles.delete(node)) {
+          lazyFiles.add(node);
+        }
+      };
+      streamOps.dup = (stream: any) => {
+        stream.node.nativefsOpenCount++;
+      };
+      streamOps.close = (stream: any) => {
+        stream.node.nativefsOpenCount--;
+      };
+      for (const op of ["read", "mmap"]) {
+        const memfsOp = streamOps[op];
+        streamOps[op] = (stream: any, ...args: any[]) => {
+          nativeFSAsync.loadLazyFileSync(stream.node);
+          return memfsOp(stream, ...args);
+        };
+      }
+    },
+    // Called by openat (see nativefs_syscalls.c) when we can suspend. Returns
+    // a promise that resolves to 0 or -errno if the path is a lazy file that
+    // needs to be loaded, and null otherwise.
+    maybeLoadLazyFile: (dirfd: number, path: string) => {
+      if (!nativeFSAsync.hasLazyMounts) {
+        return null;
+      }
+      if (!PATH.isAbs(path)) {
+        const dir =
+          dirfd === cDefs.AT_FDCWD ? FS.cwd() : FS.getStream(dirfd)?.path;
+        if (dir === undefined) {
+          return null;
+        }
+        path = PATH.join2(dir, path);
+      }
+      let node;
+      try {
+        node = FS.lookupPath(path, { follow: true }).node;
+      } catch (e) {
+        return null;
+      }
+      if (!node.nativefsLazy || node.nativefsLazy.loaded) {
+        return null;
+      }
+      return nativeFSAsync.loadLazyFile(node).then(
+        () => 0,
+        () => -cDefs.EIO,
+      );
+    },
+    loadLazyFile: (node: any): Promise<void> => {
+      const lazy: LazyFile = node.nativefsLazy;
+      lazy.loading ??= (async () => {
+        try {
+          const contents = await nativeFSAsync.readLazyFile(lazy);
+          // The file may have been changed while we waited.
+          if (node.nativefsLazy === lazy) {
+            nativeFSAsync.setLazyContents(node, contents);
+          }
+        } finally {
+          lazy.loading = undefined;
+        }
+      })();
+      return lazy.loading;
+    },
+    readLazyFile: async (lazy: LazyFile) => {
+      const file = await lazy.handle.getFile();
+      return new Uint8Array(await file.arrayBuffer());
+    },
+    // Load the contents of a lazy file without suspending. This only works in
+    // a worker, where FileReaderSync is available.
+    loadLazyFileSync: (node: any) => {
+      const lazy: LazyFile | undefined = node.nativefsLazy;
+      if (!lazy || lazy.loaded) {
+        return;
+      }
+      const FileReaderSync = (globalThis as any).FileReaderSync;
+      if (!FileReaderSync) {
+        throw new FS.ErrnoError(cDefs.EIO);
+      }
+      let contents;
+      try {
+        contents = new FileReaderSync().readAsArrayBuffer(lazy.file);
+      } catch (e) {
+        // The file was changed since the last sync.
+        throw new FS.ErrnoError(cDefs.EIO);
+      }
+      nativeFSAsync.setLazyContents(node, new Uint8Array(contents));
+    },
+    setLazyContents: (node: any, contents: Uint8Array) => {
+      node.contents = contents;
+      node.usedBytes = contents.length;
+      node.nativefsLazy.loaded = true;
+      const state: NativeFSState = node.mount.nativefs;
+      state.lazyFiles!.delete(node);
+      state.lazyFiles!.add(node);
+      nativeFSAsync.evictLazyFiles(state, node);
+    },
+    // Drop the contents of the least recently opened files until the loaded
+    // files fit into the cache. Files that are open, or were written to, stay.
+    evictLazyFiles: (state: NativeFSState, keep: any) => {
+      const lazyFiles = state.lazyFiles!;
+      let total = 0;
+      for (const node of lazyFiles) {
+        const removed = node.parent.contents?.[node.name] !== node;
+        if (!node.nativefsLazy?.loaded || removed) {
+          lazyFiles.delete(node);
+        } else {
+          total += node.usedBytes;
+        }
+      }
+      for (const node of lazyFiles) {
+        if (total <= state.cacheSize) {
+          break;
+        }
+        if (node === keep || node.nativefsOpenCount) {
+          continue;
+        }
+        // Keep usedBytes so that stat still reports the size.
+        total -= node.usedBytes;
+        node.contents = null;
+        node.nativefsLazy.loaded = false;
+        lazyFiles.delete(node);
+      }
     },
     syncfs: async (mount: any, populate: Boolean, callback: Function) => {
       try {
-        const local = nativeFSAsync.getLocalSet(mount);
-        const remote = await nativeFSAsync.getRemoteSet(mount);
-        const src = populate ? remote : local;
-        const dst = populate ? local : remote;
-        await nativeFSAsync.reconcile(mount, src, dst);
+        const state: NativeFSState = mount.nativefs;
+        // Changes made while we sync are picked up by the next sync.
+        const { dirtyPaths, dirtyNodes } = state;
+        state.dirtyPaths = new Set();
+        state.dirtyNodes = new Set();
+        let synced = false;
+        if (!populate && state.handles) {
+          try {
+            await nativeFSAsync.syncChanges(mount, dirtyPaths, dirtyNodes);
+            synced = true;
+          } catch (e) {
+            // The remote directory may have been changed by someone else.
+            // Fall back to comparing everything.
+          }
+        }
+        if (!synced) {
+          await nativeFSAsync.syncAll(mount, populate);
+        }
         callback(null);
       } catch (e) {
         callback(e);
       }
     },
-    // Returns file set of emscripten's filesystem at the mountpoint.
-    getLocalSet: (mount: any) => {
+    // Reconcile the whole mount.
+    syncAll: async (mount: any, populate: Boolean) => {
+      const state: NativeFSState = mount.nativefs;
+      state.handles = undefined;
+      const local = nativeFSAsync.getLocalSet(mount);
+      const remote = await nativeFSAsync.getRemoteSet(mount);
+      const src = populate ? remote : local;
+      const dst = populate ? local : remote;
+      state.tracking = false;
+      try {
+        await nativeFSAsync.reconcile(mount, src, dst);
+      } finally {
+        state.tracking = true;
+      }
+      state.handles = remote.handles;
+    },
+    // Copy the local changes recorded since the last sync to the remote.
+    syncChanges: async (
+      mount: any,
+      dirtyPaths: Set<string>,
+      dirtyNodes: Set<any>,
+    ) => {
+      const handles = mount.nativefs.handles;
+      const dirty = new Set(dirtyPaths);
+      for (const node of dirtyNodes) {
+        // Skip files that were removed since, their parent is dirty.
+        if (node.parent.contents?.[node.name] === node) {
+          dirty.add(FS.getPath(node));
+        }
+      }
+      if (!dirty.size) {
+        return;
+      }
+
+      const isBelowDirty = (path: string) => {
+        for (let p = PATH.dirname(path); p !== "/"; p = PATH.dirname(p)) {
+          if (dirty.has(p)) {
+            return true;
+          }
+        }
+        return false;
+      };
+      const roots = [...dirty].filter((path) => !isBelowDirty(path));
+      const isInRoots = (path: string) => dirty.has(path) || isBelowDirty(path);
+
+      const localEntries = Object.create(null);
+      for (const root of roots) {
+        if (FS.analyzePath(root).exists) {
+          Object.assign(
+            localEntries,
+            nativeFSAsync.getLocalSet(mount, root).entries,
+          );
+        }
+      }
+      const remoteEntries = Object.create(null);
+      for (const [relPath, handle] of handles) {
+        if (relPath === ".") continue;
+        const path = PATH.join2(mount.mountpoint, relPath);
+        if (isInRoots(path)) {
+          remoteEntries[path] = {
+            // The local file is dirty, so it always wins.
+            timestamp: new Date(0),
+            mode:
+              handle.kind === "file"
+                ? nativeFSAsync.FILE_MODE
+                : nativeFSAsync.DIR_MODE,
+          };
+        }
+      }
+      await nativeFSAsync.reconcile(
+        mount,
+        { type: "local", entries: localEntries },
+        { type: "remote", entries: remoteEntries, handles },
+      );
+    },
+    // Returns file set of emscripten's filesystem at the mountpoint, or only
+    // the part of it at and below root.
+    getLocalSet: (mount: any, root?: string) => {
       let entries = Object.create(null);
 
       function isRealDir(p: string) {
@@ -76,9 +429,12 @@ export function initializeNativeFS(module: PyodideModule) {
         };
       }
 
-      let check = FS.readdir(mount.mountpoint)
-        .filter(isRealDir)
-        .map(toAbsolute(mount.mountpoint));
+      let check =
+        root === undefined
+          ? FS.readdir(mount.mountpoint)
+              .filter(isRealDir)
+              .map(toAbsolute(mount.mountpoint))
+          : [root];
 
       while (check.length) {
         let path = check.pop()!;
@@ -102,20 +458,21 @@ export function initializeNativeFS(module: PyodideModule) {
       const entries = Object.create(null);
 
       const handles = await getFsHandles(mount.opts.fileSystemHandle);
-      for (const [path, handle] of handles) {
-        if (path === ".") continue;
-
+      const paths = [...handles.keys()].filter((path) => path !== ".");
+      // Getting a File doesn't read its contents, so we keep them around for
+      // loadRemoteEntry.
+      const files = await mapConcurrent(paths, SYNC_CONCURRENCY, (path) => {
+        const handle = handles.get(path);
+        return handle.kind === "file" ? handle.getFile() : undefined;
+      });
+      paths.forEach((path, i) => {
+        const file = files[i];
         entries[PATH.join2(mount.mountpoint, path)] = {
-          timestamp:
-            handle.kind === "file"
-              ? new Date((await handle.getFile()).lastModified)
-              : new Date(),
-          mode:
-            handle.kind === "file"
-              ? nativeFSAsync.FILE_MODE
-              : nativeFSAsync.DIR_MODE,
+          timestamp: file ? new Date(file.lastModified) : new Date(),
+          mode: file ? nativeFSAsync.FILE_MODE : nativeFSAsync.DIR_MODE,
+          file,
         };
-      }
+      });
 
       return { type: "remote", entries, handles };
     },
@@ -127,6 +484,11 @@ export function initializeNativeFS(module: PyodideModule) {
       if (FS.isDir(stat.mode)) {
         return { timestamp: stat.mtime, mode: stat.mode };
       } else if (FS.isFile(stat.mode)) {
+        const lazy: LazyFile | undefined = node.nativefsLazy;
+        if (lazy && !lazy.loaded) {
+          // The contents are those of the remote file it was loaded from.
+          return { timestamp: stat.mtime, mode: stat.mode, lazy };
+        }
         node.contents = MEMFS.getFileDataAsTypedArray(node);
         return {
           timestamp: stat.mtime,
@@ -140,6 +502,15 @@ export function initializeNativeFS(module: PyodideModule) {
     storeLocalEntry: (path: string, entry: any) => {
       if (FS.isDir(entry["mode"])) {
         FS.mkdirTree(path, entry["mode"]);
+      } else if (FS.isFile(entry["mode"]) && entry.lazy) {
+        const old = FS.analyzePath(path).object;
+        if (old) {
+          delete old.nativefsLazy;
+        }
+        FS.writeFile(path, new Uint8Array(0));
+        const node = FS.lookupPath(path, {}).node;
+        node.usedBytes = entry.lazy.file.size;
+        node.nativefsLazy = entry.lazy;
       } else if (FS.isFile(entry["mode"])) {
         FS.writeFile(path, entry["contents"], { canOwn: true });
       } else {
@@ -158,9 +529,16 @@ export function initializeNativeFS(module: PyodideModule) {
         FS.unlink(path);
       }
     },
-    loadRemoteEntry: async (handle: any) => {
+    loadRemoteEntry: async (handle: any, file?: File, lazy?: boolean) => {
       if (handle.kind === "file") {
-        const file = await handle.getFile();
+        file ??= (await handle.getFile()) as File;
+        if (lazy) {
+          return {
+            mode: nativeFSAsync.FILE_MODE,
+            timestamp: new Date(file.lastModified),
+            lazy: { handle, file, loaded: false },
+          };
+        }
         return {
           contents: new Uint8Array(await file.arrayBuffer()),
           mode: nativeFSAsync.FILE_MODE,
@@ -232,30 +610,58 @@ export function initializeNativeFS(module: PyodideModule) {
       }
 
       const handles = src.type === "remote" ? src.handles : dst.handles;
+      const toRelPath = (path: string) =>
+        PATH.normalize(path.replace(mount.mountpoint, "/")).substring(1);
 
-      for (const path of create) {
-        const relPath = PATH.normalize(
-          path.replace(mount.mountpoint, "/"),
-        ).substring(1);
-        if (dst.type === "local") {
-          const handle = handles.get(relPath);
-          const entry = await nativeFSAsync.loadRemoteEntry(handle);
-          nativeFSAsync.storeLocalEntry(path, entry);
-        } else {
-          const entry = nativeFSAsync.loadLocalEntry(path);
-          await nativeFSAsync.storeRemoteEntry(handles, relPath, entry);
+      if (dst.type === "local") {
+        // Fetch the remote entries in parallel, then write them in order so
+        // directories are created before the files inside them.
+        const entries = await mapConcurrent(create, SYNC_CONCURRENCY, (path) =>
+          nativeFSAsync.loadRemoteEntry(
+            handles.get(toRelPath(path)),
+            src.entries[path].file,
+            mount.opts.lazy,
+          ),
+        );
+        create.forEach((path, i) => {
+          nativeFSAsync.storeLocalEntry(path, entries[i]);
+        });
+        for (const path of remove) {
+          nativeFSAsync.removeLocalEntry(path);
         }
+        return;
       }
 
-      for (const path of remove) {
-        if (dst.type === "local") {
-          nativeFSAsync.removeLocalEntry(path);
-        } else {
-          const relPath = PATH.normalize(
-            path.replace(mount.mountpoint, "/"),
-          ).substring(1);
-          await nativeFSAsync.removeRemoteEntry(handles, relPath);
-        }
+      // Entries at the same depth don't depend on each other, so each level
+      // is written in parallel, parents before children.
+      for (const level of groupByDepth(create)) {
+        await mapConcurrent(level, SYNC_CONCURRENCY, async (path) => {
+          const entry: any = nativeFSAsync.loadLocalEntry(path);
+          if (entry.lazy) {
+            entry.contents = await nativeFSAsync.readLazyFile(entry.lazy);
+          }
+          const relPath = toRelPath(path);
+          await nativeFSAsync.storeRemoteEntry(handles, relPath, entry);
+          if (entry.lazy) {
+            // The file was renamed or moved, and the remote file it was loaded
+            // from is about to be removed. Load it from the new one instead.
+            const node = FS.lookupPath(path, {}).node;
+            if (node.nativefsLazy === entry.lazy) {
+              const handle = handles.get(relPath);
+              node.nativefsLazy = {
+                handle,
+                file: await handle.getFile(),
+                loaded: false,
+              };
+            }
+          }
+        });
+      }
+      // Remove children before their parents.
+      for (const level of groupByDepth(remove).reverse()) {
+        await mapConcurrent(level, SYNC_CONCURRENCY, (path) =>
+          nativeFSAsync.removeRemoteEntry(handles, toRelPath(path)),
+        );
       }
     },
   };
@@ -263,25 +669,35 @@ export function initializeNativeFS(module: PyodideModule) {
   module.FS.filesystems.NATIVEFS_ASYNC = nativeFSAsync;
 }
 
-const getFsHandles = async (dirHandle: any) => {
-  const handles: any = [];
-
-  async function collect(curDirHandle: any) {
-    for await (const entry of curDirHandle.values()) {
-      handles.push(entry);
-      if (entry.kind === "directory") {
-        await collect(entry);
-      }
-    }
+// Split paths into lists of paths with the same depth, in increasing depth.
+function groupByDepth(paths: string[]): string[][] {
+  const levels: string[][] = [];
+  for (const path of paths) {
+    const depth = path.split("/").length;
+    (levels[depth] ??= []).push(path);
   }
+  return levels.filter((level) => level);
+}
 
-  await collect(dirHandle);
-
+const getFsHandles = async (dirHandle: any) => {
   const result = new Map();
   result.set(".", dirHandle);
-  for (const handle of handles) {
-    const relativePath = (await dirHandle.resolve(handle)).join("/");
-    result.set(relativePath, handle);
+
+  // Walk the tree one depth at a time, so that at most SYNC_CONCURRENCY
+  // directories are enumerated at once however deep the tree is.
+  let level: [any, string][] = [[dirHandle, ""]];
+  while (level.length > 0) {
+    const next: [any, string][] = [];
+    await mapConcurrent(level, SYNC_CONCURRENCY, async ([handle, prefix]) => {
+      for await (const entry of handle.values()) {
+        const relativePath = prefix + entry.name;
+        result.set(relativePath, entry);
+        if (entry.kind === "directory") {
+          next.push([entry, relativePath + "/"]);
+        }
+      }
+    });
+    level = next;
   }
   return result;
 };
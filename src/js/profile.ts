@@ -0,0 +1,156 @@
+import { TypedArray, PythonProfile } from "./types";
+
+/**
+ * This interface contains the functions to control the Python sampling
+ * profiler.
+ * @hidden
+ */
+export interface ProfileInterface {
+  start(options?: { interval?: number }): void;
+  stop(): PythonProfile;
+  isRunning(): boolean;
+}
+
+/**
+ * Stands in for the interrupt buffer while the profiler is running. The
+ * interpreter reads index 0 every time it polls for signals. This reports
+ * signals from the user's interrupt buffer first, and otherwise reports the
+ * sampling signal once the sampling interval has passed.
+ */
+class SamplingSignalBuffer {
+  interval: number;
+  signum: number;
+  next: number;
+  fromUserBuffer: boolean = false;
+
+  constructor(interval: number, signum: number) {
+    this.interval = interval;
+    this.signum = signum;
+    this.next = performance.now() + interval;
+  }
+
+  get 0(): number {
+    const signal = userInterruptBuffer?.[0];
+    this.fromUserBuffer = !!signal;
+    if (signal) {
+      return signal;
+    }
+    const now = performance.now();
+    if (now < this.next) {
+      return 0;
+    }
+    this.next = now + this.interval;
+    return this.signum;
+  }
+
+  set 0(value: number) {
+    // The interpreter clears the signal it read. Only pass that on if it came
+    // from the user's buffer, or we could drop an interrupt that was written
+    // in the meantime.
+    if (this.fromUserBuffer) {
+      userInterruptBuffer![0] = value;
+    }
+  }
+}
+
+let userInterruptBuffer: TypedArray | undefined;
+let sampler: SamplingSignalBuffer | undefined;
+
+function updateSignalBuffer() {
+  const buffer = sampler ?? userInterruptBuffer;
+  Module.HEAP8[Module._Py_EMSCRIPTEN_SIGNAL_HANDLING] = +!!buffer;
+  Module.Py_EmscriptenSignalBuffer = buffer as TypedArray;
+}
+
+/**
+ * Set the interrupt buffer. Used by :js:func:`pyodide.setInterruptBuffer`.
+ * @private
+ */
+export function setUserInterruptBuffer(buffer: TypedArray | undefined) {
+  userInterruptBuffer = buffer;
+  updateSignalBuffer();
+}
+
+/**
+ * The interrupt buffer passed to :js:func:`pyodide.setInterruptBuffer`.
+ * @private
+ */
+export function getUserInterruptBuffer(): TypedArray | undefined {
+  return userInterruptBuffer;
+}
+
+// Used by pyodide.profile
+/** @private */
+API.startSampling = function (interval: number, signum: number) {
+  sampler = new SamplingSignalBuffer(interval, signum);
+  updateSignalBuffer();
+};
+
+/** @private */
+API.stopSampling = function () {
+  sampler = undefined;
+  updateSignalBuffer();
+};
+
+function profileModule() {
+  return (API.pyodide_profile ??=
+    API.pyodide_base.pyimport_impl("pyodide.profile"));
+}
+
+function toObject(proxy: any): any {
+  try {
+    return proxy.toJs({ dict_converter: Object.fromEntries });
+  } finally {
+    proxy.destroy();
+  }
+}
+
+// We define methods here to make sphinx-js generate documentation for them.
+
+/**
+ * Start the Python sampling profiler. See :py:mod:`pyodide.profile`.
+ *
+ * @param options
+ * @param options.interval The time between samples in milliseconds. Defaults
+ * to 10.
+ */
+export function start(options: { interval?: number } = {}): void {
+  profileModule().start(options.interval ?? 10);
+}
+
+/**
+ * Stop the Python sampling profiler.
+ *
+ * @returns The samples taken since :js:func:`pyodide.profile.start` was called.
+ */
+export function stop(): PythonProfile {
+  const result = profileModule().stop();
+  try {
+    const speedscope = toObject(result.to_speedscope());
+    const chromeTrace = toObject(result.to_chrome_trace());
+    return {
+      sampleCount: speedscope.profiles[0].samples.length,
+      duration: result.duration,
+      toSpeedscope: () => speedscope,
+      toChromeTrace: () => chromeTrace,
+    };
+  } finally {
+    result.destroy();
+  }
+}
+
+/**
+ * Whether the Python sampling profiler is running.
+ */
+export function isRunning(): boolean {
+  return profileModule().is_running();
+}
+
+/**
+ * @private
+ */
+export const profile: ProfileInterface = {
+  start,
+  stop,
+  isRunning,
+};
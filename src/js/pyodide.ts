@@ -8,9 +8,12 @@ import {
   resolvePath,
   loadLockFile,
   calculateInstallBaseUrl,
+  loadBinaryFile,
+  getBinaryResponse,
 } from "./compat";
 
 import { createSettings } from "./emscripten-settings";
+import { StartupProfiler } from "./startup-profiler";
 import { version as version_ } from "./version";
 
 import type { PyodideAPI } from "./api.js";
@@ -25,7 +28,14 @@ import type { EmscriptenSettings } from "./emscripten-settings";
 import type { SnapshotConfig } from "./snapshot";
 import { withTrailingSlash } from "./common/path";
 export type { PyodideAPI, TypedArray, PyodideAPI as PyodideInterface };
-export type { LockfileInfo, LockfilePackage, Lockfile } from "./types";
+export type {
+  LockfileInfo,
+  LockfilePackage,
+  LockfileBundle,
+  Lockfile,
+} from "./types";
+export type { StartupProfile, StartupProfileEvent } from "./types";
+export type { PythonProfile } from "./types";
 
 export { type PackageData };
 
@@ -73,6 +83,25 @@ export interface PyodideConfig {
    */
   packageCacheDir?: string;
 
+  /**
+   * A directory in which to keep a cache of the wheels that Pyodide downloads,
+   * including wheels from custom lock files and from urls passed to
+   * :js:func:`pyodide.loadPackage`. Wheels are stored by their sha256, so the
+   * same directory can be shared by any number of Pyodide instances and
+   * processes. Only applies when running in node; ignored in browsers.
+   *
+   * Default: no cache
+   */
+  wheelCacheDir?: string;
+
+  /**
+   * The maximum size of ``wheelCacheDir`` in bytes. When it is exceeded, the
+   * least recently used wheels are removed.
+   *
+   * Default: 1 GiB
+   */
+  wheelCacheSize?: number;
+
   /**
    * The URL from which Pyodide will load the Pyodide ``pyodide-lock.json`` lock
    * file. You can produce custom lock files with :py:func:`micropip.freeze`.
@@ -109,6 +138,14 @@ export interface PyodideConfig {
    * Default: ```${indexURL}/python_stdlib.zip```
    */
   stdLibURL?: string;
+  /**
+   * The URL of the part of the standard library that was pruned from
+   * ``stdLibURL`` by ``tools/create_zipfile.py --import-trace``. It is
+   * downloaded in the background after startup and mounted the first time an
+   * import can't be found in ``stdLibURL``.
+   * @experimental
+   */
+  stdLibRemainderURL?: string;
   /**
    * Override the standard input callback. Should ask the user for one line of
    * input. The :js:func:`pyodide.setStdin` function is more flexible and
@@ -183,6 +220,17 @@ export interface PyodideConfig {
    */
   fsInit?: (FS: FSType, info: { sitePackages: string }) => Promise<void>;
 
+  /**
+   * Record how long each stage of loading Pyodide takes, including the file
+   * system setup and the Python imports done while bootstrapping. The result
+   * is available as :js:attr:`pyodide.startupProfile`. Default: ``false``.
+   *
+   * Imports are recorded from the start of the bootstrap, after the
+   * interpreter itself has been initialized. When restoring a snapshot, the
+   * bootstrap modules are already imported, so no imports are recorded.
+   */
+  profileStartup?: boolean;
+
   /**
    * Opt into the old behavior where :js:func:`PyProxy.toString() <pyodide.ffi.PyProxy.toString>`
    * calls :py:func:`repr` and not :py:class:`str() <str>`. Deprecated.
@@ -222,6 +270,26 @@ export interface PyodideConfig {
   /** @ignore */
   _snapshotDeserializer?: (obj: any) => any;
 
+  /**
+   * The parsed config of ``_loadSnapshot``, if it is already known.
+   * @ignore
+   */
+  _snapshotConfig?: SnapshotConfig;
+
+  /**
+   * A compiled ``pyodide.asm.wasm`` to instantiate instead of downloading and
+   * compiling it again.
+   * @ignore
+   */
+  _wasmModule?: WebAssembly.Module | PromiseLike<WebAssembly.Module>;
+
+  /**
+   * The contents of ``python_stdlib.zip`` to use instead of loading
+   * ``stdLibURL``.
+   * @ignore
+   */
+  _stdlib?: Uint8Array | PromiseLike<Uint8Array>;
+
   /**
    * @experimental
    * The constructor function to use to create the Pyodide module.
@@ -285,6 +353,11 @@ async function initializeConfiguration(
       resolvePath(options.packageCacheDir),
     );
   }
+  if (options.wheelCacheDir) {
+    options.wheelCacheDir = withTrailingSlash(
+      resolvePath(options.wheelCacheDir),
+    );
+  }
 
   const defaultConfig: PyodideConfig = {
     jsglobals: globalThis,
@@ -321,8 +394,9 @@ async function initializeConfiguration(
  */
 function createEmscriptenSettings(
   config: PyodideConfigWithDefaults,
+  profiler: StartupProfiler,
 ): EmscriptenSettings {
-  const emscriptenSettings = createSettings(config);
+  const emscriptenSettings = createSettings(config, profiler);
   const API = emscriptenSettings.API;
   API.lockFilePromise = Promise.resolve(config.lockFileContents);
 
@@ -428,7 +502,8 @@ function bootstrapPyodide(
 
   let snapshotConfig: SnapshotConfig | undefined = undefined;
   if (snapshot) {
-    snapshotConfig = API.restoreSnapshot(snapshot);
+    snapshotConfig = API.restoreSnapshot(snapshot, config._snapshotConfig);
+    config._snapshotConfig = snapshotConfig;
   }
 
   // runPython works starting after the call to finalizeBootstrap.
@@ -477,30 +552,271 @@ async function finalizeSetup(
 export async function loadPyodide(
   options: PyodideConfig = {},
 ): Promise<PyodideAPI> {
+  const { pyodide } = await loadPyodideWithConfig(options);
+  return pyodide;
+}
+
+/**
+ * Load Pyodide and also return the configuration it was loaded with, which
+ * holds the parsed snapshot config when a snapshot was restored.
+ * @private
+ */
+async function loadPyodideWithConfig(
+  options: PyodideConfig,
+): Promise<{ pyodide: PyodideAPI; config: PyodideConfigWithDefaults }> {
+  const profiler = new StartupProfiler(!!options.profileStartup);
+
   // Stage 1: Initialize configuration
-  const config = await initializeConfiguration(options);
+  const config = await profiler.stage("initializeConfiguration", () =>
+    initializeConfiguration(options),
+  );
 
   // Stage 2: Create Emscripten settings
-  const emscriptenSettings = createEmscriptenSettings(config);
+  const emscriptenSettings = profiler.stage("createEmscriptenSettings", () =>
+    createEmscriptenSettings(config, profiler),
+  );
 
   // Stage 3: Load WASM script
-  const createPyodideModuleFn = await loadWasmScript(config);
+  const createPyodideModuleFn = await profiler.stage("loadWasmScript", () =>
+    loadWasmScript(config),
+  );
 
   // Stage 4: Prepare snapshot
-  const snapshot = await prepareSnapshot(config, emscriptenSettings);
+  const snapshot = await profiler.stage("prepareSnapshot", () =>
+    prepareSnapshot(config, emscriptenSettings),
+  );
 
   // Stage 5: Create and initialize the Emscripten module
-  const pyodideModule = await instantiatePyodideModule(
-    createPyodideModuleFn,
-    emscriptenSettings,
+  const pyodideModule = await profiler.stage("instantiatePyodideModule", () =>
+    instantiatePyodideModule(createPyodideModuleFn, emscriptenSettings),
   );
 
   // Stage 6: Configure API and validate versions
-  configureAPI(pyodideModule, config);
+  profiler.stage("configureAPI", () => configureAPI(pyodideModule, config));
 
   // Stage 7: Bootstrap Python interpreter
-  const pyodide = bootstrapPyodide(pyodideModule, snapshot, config);
+  const pyodide = profiler.stage("bootstrapPyodide", () =>
+    bootstrapPyodide(pyodideModule, snapshot, config),
+  );
 
   // Stage 8: Finalize setup and initialize streams
-  return await finalizeSetup(pyodide, config);
+  await profiler.stage("finalizeSetup", () => finalizeSetup(pyodide, config));
+
+  if (profiler.enabled) {
+    const API = pyodideModule.API;
+    profiler.collectImports(API);
+    API.startupProfile = profiler.finish();
+  }
+  return { pyodide, config };
+}
+
+/**
+ * Start a new instance for a snapshot pool. Each instance gets its own copy of
+ * the mutable parts of the options.
+ * @private
+ */
+async function loadPoolInstance(
+  options: PyodideConfig,
+): Promise<{ pyodide: PyodideAPI; snapshotConfig?: SnapshotConfig }> {
+  const { pyodide, config } = await loadPyodideWithConfig({
+    ...options,
+    env: { ...options.env },
+  });
+  return { pyodide, snapshotConfig: config._snapshotConfig };
+}
+
+/**
+ * Start a new instance for a snapshot pool and only keep the instance.
+ * @private
+ */
+function loadPoolPyodide(options: PyodideConfig): Promise<PyodideAPI> {
+  return loadPoolInstance(options).then(({ pyodide }) => pyodide);
+}
+
+/**
+ * A pool of Pyodide instances restored from the same memory snapshot. Create
+ * one with :js:func:`~exports.createSnapshotPool`.
+ *
+ * All instances in the pool share the compiled WebAssembly module, the
+ * standard library, the lock file and the parsed snapshot metadata, so a new
+ * instance only has to copy the snapshot into its memory. Instances handed out
+ * by :js:func:`SnapshotPool.acquire` are never reused, since the state of an
+ * interpreter can't be rolled back. Instead, every acquire starts a fresh
+ * replacement in the background, so every checkout sees the untouched
+ * snapshot state.
+ * @experimental
+ */
+export class SnapshotPool {
+  #options: PyodideConfig;
+  #size: number;
+  #ready: Promise<PyodideAPI>[];
+  #checkedOut: WeakSet<PyodideAPI> = new WeakSet();
+
+  /** @private */
+  constructor(
+    options: PyodideConfig,
+    size: number,
+    ready: Promise<PyodideAPI>[],
+  ) {
+    this.#options = options;
+    this.#size = size;
+    this.#ready = ready;
+  }
+
+  /**
+   * The number of idle instances the pool tries to keep ready.
+   */
+  get size(): number {
+    return this.#size;
+  }
+
+  /**
+   * The number of instances that are ready or being prepared and have not
+   * been acquired yet.
+   */
+  get available(): number {
+    return this.#ready.length;
+  }
+
+  /**
+   * Check out an instance from the pool. If no instance is ready, a new one
+   * is created. Either way, a replacement is started in the background.
+   *
+   * @returns A Pyodide instance restored from the pool's snapshot.
+   */
+  async acquire(): Promise<PyodideAPI> {
+    const instance = this.#ready.shift() ?? loadPoolPyodide(this.#options);
+    this.#fill();
+    const pyodide = await instance;
+    this.#checkedOut.add(pyodide);
+    return pyodide;
+  }
+
+  /**
+   * Release an instance obtained from :js:func:`SnapshotPool.acquire`. Its
+   * pending asyncio tasks are cancelled and its output is flushed, so that it
+   * doesn't run any more Python code on its own. The instance must not be used
+   * afterwards. Its memory is freed once it is no longer referenced. It is not
+   * returned to the pool: the replacement started by ``acquire`` takes its
+   * place.
+   *
+   * @param pyodide The instance to release.
+   */
+  release(pyodide: PyodideAPI): void {
+    if (!this.#checkedOut.has(pyodide)) {
+      throw new Error("Instance was not acquired from this pool");
+    }
+    this.#checkedOut.delete(pyodide);
+    const globals = pyodide.toPy({});
+    try {
+      pyodide.runPython(
+        `
+        import asyncio
+        for task in asyncio.all_tasks(asyncio.get_event_loop()):
+            task.cancel()
+        `,
+        { globals },
+      );
+    } finally {
+      globals.destroy();
+    }
+    pyodide.setStdout();
+    pyodide.setStderr();
+  }
+
+  #fill(): void {
+    while (this.#ready.length < this.#size) {
+      const instance = loadPoolPyodide(this.#options);
+      // Errors are reported to whoever acquires this instance, don't report
+      // them as unhandled in the meantime.
+      instance.catch(() => {});
+      this.#ready.push(instance);
+    }
+  }
+}
+
+/**
+ * Create a :js:class:`SnapshotPool` of Pyodide instances restored from a
+ * memory snapshot made with :js:func:`pyodide.makeMemorySnapshot`.
+ *
+ * The WebAssembly module, standard library and lock file are only loaded
+ * once and shared by all instances in the pool, which makes starting an
+ * instance much cheaper than calling :js:func:`~exports.loadPyodide` directly.
+ *
+ * @param snapshot The memory snapshot to restore each instance from.
+ * @param size The number of idle instances to keep ready.
+ * @param options Options to pass to :js:func:`~exports.loadPyodide` for each
+ *    instance. These should match the options that were used to create the
+ *    snapshot.
+ * @returns A pool with ``size`` instances ready to be acquired.
+ * @experimental
+ * @example
+ * const pool = await createSnapshotPool(snapshot, 8);
+ * const pyodide = await pool.acquire();
+ * try {
+ *   pyodide.runPython("print('hello from a fresh interpreter')");
+ * } finally {
+ *   pool.release(pyodide);
+ * }
+ */
+export async function createSnapshotPool(
+  snapshot: Uint8Array | ArrayBuffer | PromiseLike<Uint8Array | ArrayBuffer>,
+  size: number,
+  options: PyodideConfig = {},
+): Promise<SnapshotPool> {
+  if (!Number.isInteger(size) || size < 1) {
+    throw new TypeError("Snapshot pool size must be a positive integer");
+  }
+  await initNodeModules();
+
+  if (options.lockFileContents && options.lockFileURL) {
+    throw new Error("Can't pass both lockFileContents and lockFileURL");
+  }
+
+  const shared: PyodideConfig = { ...options };
+  const indexURL = withTrailingSlash(
+    resolvePath(options.indexURL || (await calculateDirname())),
+  );
+  shared.indexURL = indexURL;
+
+  const snp = await snapshot;
+  shared._loadSnapshot = ArrayBuffer.isView(snp)
+    ? (snp as Uint8Array)
+    : new Uint8Array(snp);
+
+  if (!shared.lockFileContents) {
+    const lockFileURL = shared.lockFileURL ?? indexURL + "pyodide-lock.json";
+    shared.packageBaseUrl ??= calculateInstallBaseUrl(lockFileURL);
+    delete shared.lockFileURL;
+    // Each instance parses its own copy so that no lock file state is shared
+    // between instances.
+    shared.lockFileContents = loadLockFile(lockFileURL).then((lockfile) =>
+      JSON.stringify(lockfile),
+    );
+  }
+
+  shared._stdlib ??= loadBinaryFile(
+    shared.stdLibURL ?? indexURL + "python_stdlib.zip",
+  );
+
+  if (!shared._wasmModule && !shared.createPyodideModule) {
+    const { binary, response } = getBinaryResponse(
+      indexURL + "pyodide.asm.wasm",
+    );
+    shared._wasmModule = response
+      ? WebAssembly.compileStreaming(response)
+      : binary!.then((b) => WebAssembly.compile(b));
+  }
+
+  // Restore the first instance alone so that the rest of the pool can reuse
+  // the snapshot config it parsed.
+  const first = await loadPoolInstance(shared);
+  shared._snapshotConfig = first.snapshotConfig;
+
+  const ready = [Promise.resolve(first.pyodide)];
+  while (ready.length < size) {
+    ready.push(loadPoolPyodide(shared));
+  }
+  await Promise.all(ready);
+  return new SnapshotPool(shared, size, ready);
 }
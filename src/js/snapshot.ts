@@ -254,7 +254,10 @@ API.makeSnapshot = function (serializer?: (obj: any) => any): Uint8Array {
   return snapshot;
 };
 
-API.restoreSnapshot = function (snapshot: Uint8Array): SnapshotConfig {
+API.restoreSnapshot = function (
+  snapshot: Uint8Array,
+  snapshotConfig?: SnapshotConfig,
+): SnapshotConfig {
   const uint32View = new Uint32Array(
     snapshot.buffer,
     snapshot.byteOffset,
@@ -273,13 +276,17 @@ API.restoreSnapshot = function (snapshot: Uint8Array): SnapshotConfig {
         `got     : ${buildId}\n`,
     );
   }
-  const jsonBuf = snapshot.subarray(
-    HEADER_SIZE_IN_BYTES,
-    HEADER_SIZE_IN_BYTES + jsonLength,
-  );
+  // The caller may already have parsed the config for this snapshot (e.g. a
+  // snapshot pool restoring the same snapshot many times), skip decoding it.
+  if (!snapshotConfig) {
+    const jsonBuf = snapshot.subarray(
+      HEADER_SIZE_IN_BYTES,
+      HEADER_SIZE_IN_BYTES + jsonLength,
+    );
+    const jsonStr = new TextDecoder().decode(jsonBuf);
+    snapshotConfig = JSON.parse(jsonStr) as SnapshotConfig;
+  }
   snapshot = snapshot.subarray(snapshotOffset);
-  const jsonStr = new TextDecoder().decode(jsonBuf);
-  const snapshotConfig: SnapshotConfig = JSON.parse(jsonStr);
   // @ts-ignore
   Module.HEAP8.set(snapshot);
   return snapshotConfig;
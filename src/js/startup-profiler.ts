@@ -0,0 +1,128 @@
+/** @private */
+
+import type {
+  PreRunFunc,
+  StartupProfile,
+  StartupProfileEvent,
+  API,
+} from "./types";
+
+/**
+ * Collects the timings for ``loadPyodide({profileStartup: true})``. When
+ * profiling is disabled, all methods just call through.
+ * @private
+ */
+export class StartupProfiler {
+  readonly enabled: boolean;
+  #origin: number;
+  #events: StartupProfileEvent[] = [];
+
+  constructor(enabled: boolean) {
+    this.enabled = enabled;
+    this.#origin = performance.now();
+  }
+
+  #record(
+    name: string,
+    category: StartupProfileEvent["category"],
+    start: number,
+    end: number,
+  ): void {
+    this.#events.push({
+      name,
+      category,
+      start: start - this.#origin,
+      duration: end - start,
+    });
+  }
+
+  /**
+   * Run one stage of loadPyodide and record how long it took. The result of
+   * ``fn`` is returned as is, so synchronous stages stay synchronous. Async
+   * stages are timed until their promise settles.
+   */
+  stage<T>(name: string, fn: () => T): T {
+    if (!this.enabled) {
+      return fn();
+    }
+    const start = performance.now();
+    const done = () => this.#record(name, "stage", start, performance.now());
+    let result: any;
+    try {
+      result = fn();
+    } catch (e) {
+      done();
+      throw e;
+    }
+    if (typeof result?.then === "function") {
+      return result.finally(done);
+    }
+    done();
+    return result;
+  }
+
+  /**
+   * Wrap a preRun hook to record how long it took. Async hooks are timed until
+   * their promise settles.
+   */
+  wrapPreRun(name: string, fn: PreRunFunc): PreRunFunc {
+    if (!this.enabled) {
+      return fn;
+    }
+    return (Module) => {
+      const start = performance.now();
+      const done = () => this.#record(name, "preRun", start, performance.now());
+      const result: any = fn(Module);
+      if (typeof result?.then === "function") {
+        result.then(done, done);
+      } else {
+        done();
+      }
+      return result;
+    };
+  }
+
+  /**
+   * Stop recording Python imports and add them to the profile.
+   */
+  collectImports(API: API): void {
+    if (!this.enabled) {
+      return;
+    }
+    const importtime = API.importlib.import_module("_pyodide_importtime");
+    const records = importtime.stop();
+    importtime.destroy();
+    const imports: [string, number, number][] = records.toJs();
+    records.destroy();
+    for (const [name, start, duration] of imports) {
+      const absStart = API.importTimeOrigin + start;
+      this.#record(name, "import", absStart, absStart + duration);
+    }
+  }
+
+  /**
+   * The profile collected so far.
+   */
+  finish(): StartupProfile {
+    const events = this.#events.sort((a, b) => a.start - b.start);
+    const total = performance.now() - this.#origin;
+    return {
+      total,
+      events,
+      toChromeTrace() {
+        return {
+          traceEvents: events.map(({ name, category, start, duration }) => ({
+            name,
+            cat: category,
+            ph: "X",
+            ts: start * 1000,
+            dur: duration * 1000,
+            pid: 1,
+            tid: 1,
+          })),
+          displayTimeUnit: "ms",
+        };
+      },
+    };
+  }
+}
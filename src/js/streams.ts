@@ -1,5 +1,6 @@
 import { RUNTIME_ENV } from "./environments.js";
 import "./constants";
+import { scheduleCallback } from "./scheduler";
 
 import type { FSStream, FSStreamOpsGen, TtyOps } from "./types";
 const fs: typeof import("node:fs") = RUNTIME_ENV.IN_NODE
@@ -51,7 +52,8 @@ type Reader = {
  * `os.get_terminal_size()`. If absent, the terminal size is reported as 24 rows
  * by 80 columns.
  *
- * If provided, `fsync` is called when the stream is fsync'd.
+ * If provided, `fsync` is called when the stream is fsync'd and before the
+ * writer is replaced.
  */
 export interface Writer {
   isatty?: boolean;
@@ -99,11 +101,15 @@ function _setStdinOps(ops: Reader) {
   DEVOPS[DEVS.stdin] = ops as Reader & Writer;
 }
 
+// Flush the output that the previous handler still holds before replacing it.
+// refreshStreams only drops the file descriptors, which doesn't close them.
 function _setStdoutOps(ops: Writer) {
+  DEVOPS[DEVS.stdout]?.fsync?.();
   DEVOPS[DEVS.stdout] = ops as Reader & Writer;
 }
 
 function _setStderrOps(ops: Writer) {
+  DEVOPS[DEVS.stderr]?.fsync?.();
   DEVOPS[DEVS.stderr] = ops as Reader & Writer;
 }
 
@@ -437,6 +443,36 @@ export interface BatchedWriteHandler {
   batched: (output: string) => void;
 }
 
+/**
+ * A buffered handler to provide to :js:func:`~pyodide.setStdout` or
+ * :js:func:`~pyodide.setStderr`.
+ *
+ * Output is collected in a buffer and ``handler.buffered()`` is called with
+ * all of it at once, so printing many lines costs one call instead of one call
+ * per line. The received string may contain any number of lines, and it may
+ * end in the middle of a line. The buffer is flushed:
+ *
+ * - when it would grow beyond ``bufferSize`` bytes,
+ * - ``flushInterval`` milliseconds after the first write to an empty buffer,
+ *   which can only happen once Python returns control to the event loop, and
+ * - when the stream is flushed with ``sys.stdout.flush()`` or
+ *   ``print(..., flush=True)``, and
+ * - when the handler is replaced by calling :js:func:`~pyodide.setStdout`
+ *   again.
+ *
+ * Streams implemented with a buffered handler cannot be a tty.
+ */
+export interface BufferedWriteHandler {
+  buffered: (output: string) => void;
+  /** The maximum number of bytes to buffer. Defaults to 64 KiB. */
+  bufferSize?: number;
+  /**
+   * How long to wait before flushing buffered output, in milliseconds.
+   * Defaults to 0, which flushes on the next turn of the event loop.
+   */
+  flushInterval?: number;
+}
+
 /**
  * A raw handler to provide to :js:func:`~pyodide.setStdout` or
  * :js:func:`~pyodide.setStderr`.
@@ -458,30 +494,37 @@ export interface RawWriteHandler {
   getTerminalSize?: () => { rows: number; columns: number } | undefined;
 }
 
-type StdWriteOpts = BatchedWriteHandler | RawWriteHandler | Writer;
-type StdWriteOptsAll = Partial<BatchedWriteHandler & RawWriteHandler & Writer>;
+type StdWriteOpts =
+  | BatchedWriteHandler
+  | BufferedWriteHandler
+  | RawWriteHandler
+  | Writer;
+type StdWriteOptsAll = Partial<
+  BatchedWriteHandler & BufferedWriteHandler & RawWriteHandler & Writer
+>;
 
 function _setStdwrite(
+  name: "stdout" | "stderr",
   options: StdWriteOpts | {},
   setOps: (ops: Writer) => void,
   getDefaults: () => StdWriteOpts,
 ) {
   let opts = options as StdWriteOptsAll;
-  let { raw, isatty, batched, write } = opts;
+  let { raw, isatty, batched, buffered, write } = opts;
   if (!raw && !write && isatty) {
     throw new TypeError(
       "Cannot set 'isatty' to true unless 'raw' or 'write' is provided",
     );
   }
-  let nset = +!!raw + +!!batched + +!!write;
+  let nset = +!!raw + +!!batched + +!!buffered + +!!write;
   if (nset > 1) {
     throw new TypeError(
-      "At most one of 'raw', 'batched', and 'write' must be passed",
+      "At most one of 'raw', 'batched', 'buffered', and 'write' must be passed",
     );
   }
   if (nset === 0) {
     opts = getDefaults();
-    ({ raw, isatty, batched, write } = opts);
+    ({ raw, isatty, batched, buffered, write } = opts);
   }
   if (raw) {
     setOps(new CharacterCodeWriter(opts as RawWriteHandler));
@@ -489,10 +532,16 @@ function _setStdwrite(
   if (batched) {
     setOps(new StringWriter(batched.bind(opts)));
   }
+  if (buffered) {
+    setOps(new BufferedStringWriter(opts as BufferedWriteHandler));
+  }
   if (write) {
     setOps(opts as Writer);
   }
   refreshStreams();
+  // Only a buffered handler holds output back until it is fsync'd, so only
+  // then does flushing sys.stdout need to fsync it.
+  API._pyodide.set_flush_std_stream(name, !!buffered);
 }
 
 /**
@@ -523,10 +572,11 @@ function _getStderrDefaults(): StdWriteOpts {
 
 /**
  * Sets the standard out handler. A :js:class:`BatchedWriteHandler`, a
- * :js:class:`RawWriteHandler`, or a :js:class:`Writer` can be provided. See the
- * documentation for these types for more information about how each works. If
- * no handler is provided, we restore the default handler. Passing a `Writer`
- * provides the most flexibility and the best performance.
+ * :js:class:`BufferedWriteHandler`, a :js:class:`RawWriteHandler`, or a
+ * :js:class:`Writer` can be provided. See the documentation for these types
+ * for more information about how each works. If no handler is provided, we
+ * restore the default handler. Passing a `Writer` provides the most
+ * flexibility and the best performance.
  *
  * @example
  * async function main(){
@@ -544,18 +594,19 @@ function _getStderrDefaults(): StdWriteOpts {
  * main();
  */
 export function setStdout(options?: StdWriteOpts | {}) {
-  _setStdwrite(options ?? {}, _setStdoutOps, _getStdoutDefaults);
+  _setStdwrite("stdout", options ?? {}, _setStdoutOps, _getStdoutDefaults);
 }
 
 /**
  * Sets the standard error handler. A :js:typealias:`BatchedWriteHandler`, a
- * :js:typealias:`RawWriteHandler`, or a :js:typealias:`Writer` can be provided.
- * See the documentation for these types for more information about how each
- * works. If no handler is provided, we restore the default handler. Passing a
- * `Writer` provides the most flexibility and the best performance.
+ * :js:typealias:`BufferedWriteHandler`, a :js:typealias:`RawWriteHandler`, or a
+ * :js:typealias:`Writer` can be provided. See the documentation for these
+ * types for more information about how each works. If no handler is provided,
+ * we restore the default handler. Passing a `Writer` provides the most
+ * flexibility and the best performance.
  */
 export function setStderr(options?: StdWriteOpts | {}) {
-  _setStdwrite(options ?? {}, _setStderrOps, _getStderrDefaults);
+  _setStdwrite("stderr", options ?? {}, _setStderrOps, _getStderrDefaults);
 }
 
 const _TextEncoder = globalThis.TextEncoder ?? function () {};
@@ -754,6 +805,66 @@ class StringWriter implements Writer {
   }
 }
 
+class BufferedStringWriter implements Writer {
+  out: (a: string) => void;
+  isatty: boolean = false;
+  bufferSize: number;
+  flushInterval: number;
+  buffer: Uint8Array;
+  length: number = 0;
+  flushScheduled: boolean = false;
+
+  constructor(options: BufferedWriteHandler) {
+    this.out = options.buffered.bind(options);
+    this.bufferSize = options.bufferSize ?? 65536;
+    this.flushInterval = options.flushInterval ?? 0;
+    this.buffer = new Uint8Array(Math.min(this.bufferSize, 4096));
+  }
+
+  write(data: Uint8Array) {
+    const nbytes = data.length;
+    if (data.includes(0)) {
+      // A 0 would cut text output off in the middle.
+      data = data.filter((val) => val !== 0);
+    }
+    if (this.length + data.length > this.bufferSize) {
+      this.fsync();
+    }
+    if (data.length >= this.bufferSize) {
+      this.out(UTF8ArrayToString(data));
+      return nbytes;
+    }
+    if (this.length + data.length > this.buffer.length) {
+      const newBuffer = new Uint8Array(
+        Math.min(
+          this.bufferSize,
+          Math.max(2 * this.buffer.length, this.length + data.length),
+        ),
+      );
+      newBuffer.set(this.buffer.subarray(0, this.length));
+      this.buffer = newBuffer;
+    }
+    this.buffer.set(data, this.length);
+    this.length += data.length;
+    if (!this.flushScheduled) {
+      this.flushScheduled = true;
+      scheduleCallback(() => {
+        this.flushScheduled = false;
+        this.fsync();
+      }, this.flushInterval);
+    }
+    return nbytes;
+  }
+
+  fsync() {
+    if (this.length > 0) {
+      const output = UTF8ArrayToString(this.buffer.subarray(0, this.length));
+      this.length = 0;
+      this.out(output);
+    }
+  }
+}
+
 type NodeWriteStream = NodeJS.WriteStream & { fd: number };
 
 class NodeWriter implements Writer {
@@ -0,0 +1,47 @@
+import assert from "node:assert/strict";
+import { describe, it } from "node:test";
+import { mapConcurrent } from "../../../common/concurrency";
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+describe("mapConcurrent", () => {
+  it("should return the results in order", async () => {
+    const result = await mapConcurrent([30, 10, 20], 3, async (ms, index) => {
+      await sleep(ms);
+      return index;
+    });
+    assert.deepEqual(result, [0, 1, 2]);
+  });
+
+  it("should limit the number of concurrent calls", async () => {
+    let running = 0;
+    let maxRunning = 0;
+    await mapConcurrent(
+      Array.from({ length: 20 }, (_, i) => i),
+      4,
+      async () => {
+        running++;
+        maxRunning = Math.max(maxRunning, running);
+        await sleep(1);
+        running--;
+      },
+    );
+    assert.equal(maxRunning, 4);
+  });
+
+  it("should handle an empty list", async () => {
+    assert.deepEqual(await mapConcurrent([], 4, async () => 1), []);
+  });
+
+  it("should reject if a call fails", async () => {
+    await assert.rejects(
+      mapConcurrent([1, 2, 3], 2, async (item) => {
+        if (item === 2) {
+          throw new Error("failed");
+        }
+        return item;
+      }),
+      /failed/,
+    );
+  });
+});
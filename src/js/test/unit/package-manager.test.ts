@@ -233,3 +233,109 @@ describe("loadPackage", () => {
     );
   });
 });
+
+describe("prefetchPackage", () => {
+  const lockfilePackage = (name: string, depends: string[] = []) => ({
+    name,
+    version: "1.0.0",
+    file_name: `${name}-1.0.0-py3-none-any.whl`,
+    install_dir: "site" as const,
+    sha256: "",
+    package_type: "package" as const,
+    imports: [name],
+    depends,
+  });
+
+  it("Should download the dependency closure once", async (t) => {
+    const mockApi = genMockAPI();
+    mockApi.lockfile_packages = {
+      a: lockfilePackage("a", ["b"]),
+      b: lockfilePackage("b"),
+      c: lockfilePackage("c"),
+    };
+    const pm = new PackageManager(mockApi, genMockModule());
+    pm.loadedPackages = { c: "default channel" };
+    const download = t.mock.method(pm as any, "downloadPackage", async () =>
+      Promise.resolve(new Uint8Array()),
+    );
+
+    await pm.prefetchPackage(["a", "c"]);
+    assert.deepEqual(
+      download.mock.calls.map((call) => call.arguments[0].name).sort(),
+      ["a", "b"],
+    );
+
+    await pm.prefetchPackage("a");
+    assert.equal(download.mock.callCount(), 2);
+  });
+
+  it("Should retry a failed download", async (t) => {
+    const mockApi = genMockAPI();
+    mockApi.lockfile_packages = { a: lockfilePackage("a") };
+    const pm = new PackageManager(mockApi, genMockModule());
+    const download = t.mock.method(pm as any, "downloadPackage", async () => {
+      throw new Error("network error");
+    });
+
+    await pm.prefetchPackage("a");
+    await pm.prefetchPackage("a");
+    assert.equal(download.mock.callCount(), 2);
+  });
+
+  const bundle = {
+    file_name: "a.bundle",
+    sha256: "",
+    packages: [
+      { name: "a", size: 2 },
+      { name: "b", size: 3 },
+    ],
+  };
+
+  it("Should download a bundle instead of its members", async (t) => {
+    const mockApi = genMockAPI();
+    mockApi.lockfile_packages = {
+      a: lockfilePackage("a", ["b"]),
+      b: lockfilePackage("b"),
+      c: lockfilePackage("c"),
+    };
+    mockApi.lockfile_bundles = { a: bundle };
+    const pm = new PackageManager(mockApi, genMockModule());
+    const downloadBundle = t.mock.method(pm as any, "downloadBundle", async () =>
+      Promise.resolve(new Uint8Array([1, 1, 2, 2, 2])),
+    );
+    const download = t.mock.method(pm as any, "downloadPackage", async () =>
+      Promise.resolve(new Uint8Array()),
+    );
+
+    await pm.prefetchPackage(["a", "c"]);
+    assert.equal(downloadBundle.mock.callCount(), 1);
+    assert.deepEqual(
+      download.mock.calls.map((call) => call.arguments[0].name),
+      ["c"],
+    );
+    const b = (pm as any).takePrefetched(
+      { normalizedName: "b", channel: "default channel" },
+      true,
+    );
+    assert.deepEqual(await b, new Uint8Array([2, 2, 2]));
+  });
+
+  it("Should not download a bundle with unneeded packages", async (t) => {
+    const mockApi = genMockAPI();
+    mockApi.lockfile_packages = {
+      a: lockfilePackage("a", ["b"]),
+      b: lockfilePackage("b"),
+    };
+    mockApi.lockfile_bundles = { a: bundle };
+    const pm = new PackageManager(mockApi, genMockModule());
+    const downloadBundle = t.mock.method(pm as any, "downloadBundle", async () =>
+      Promise.resolve(new Uint8Array([1, 1, 2, 2, 2])),
+    );
+    t.mock.method(pm as any, "downloadPackage", async () =>
+      Promise.resolve(new Uint8Array()),
+    );
+
+    await pm.prefetchPackage("b");
+    assert.equal(downloadBundle.mock.callCount(), 0);
+  });
+});
@@ -17,6 +17,7 @@ export const genMockAPI = (): PackageManagerAPI => {
       packageCacheDir: "",
     },
     lockfile_packages: {},
+    lockfile_bundles: {},
     bootstrapFinalizedPromise: Promise.resolve(),
     sitepackages: "",
     defaultLdLibraryPath: [],
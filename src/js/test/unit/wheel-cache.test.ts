@@ -0,0 +1,74 @@
+import * as fs from "fs";
+import assert from "node:assert/strict";
+import { createHash } from "node:crypto";
+import { describe, it } from "node:test";
+import * as os from "os";
+import * as path from "path";
+
+import { initNodeModules } from "../../compat";
+import { WheelCache } from "../../wheel-cache";
+
+function sha256(data: Uint8Array) {
+  return createHash("sha256").update(data).digest("hex");
+}
+
+async function makeCache(maxSize?: number) {
+  await initNodeModules();
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), "wheel-cache-"));
+  return { dir, cache: new WheelCache(dir, maxSize) };
+}
+
+describe("WheelCache", () => {
+  it("Should store wheels by their sha256", async () => {
+    const { dir, cache } = await makeCache();
+    const wheel = new Uint8Array([1, 2, 3]);
+
+    const hash = await cache.put("https://example.com/a.whl", wheel);
+
+    assert.equal(hash, sha256(wheel));
+    assert.deepEqual(
+      fs.readFileSync(path.join(dir, "sha256", `${hash}.whl`)),
+      Buffer.from(wheel),
+    );
+    assert.deepEqual(await cache.get("https://example.com/b.whl", hash), wheel);
+  });
+
+  it("Should find wheels by url", async () => {
+    const { cache } = await makeCache();
+    const url = "https://example.com/a-1.0-py3-none-any.whl";
+    const wheel = new Uint8Array([1, 2, 3]);
+
+    assert.equal(await cache.get(url), undefined);
+    await cache.put(url, wheel);
+    assert.deepEqual(await cache.get(url), wheel);
+    assert.equal(await cache.get("https://example.com/other.whl"), undefined);
+  });
+
+  it("Should not leave temporary files behind", async () => {
+    const { dir, cache } = await makeCache();
+
+    await cache.put("https://example.com/a.whl", new Uint8Array([1]));
+    await cache.put("https://example.com/a.whl", new Uint8Array([1]));
+
+    assert.equal(fs.readdirSync(path.join(dir, "sha256")).length, 1);
+    assert.equal(fs.readdirSync(path.join(dir, "urls")).length, 1);
+  });
+
+  it("Should evict the least recently used wheels", async () => {
+    const { dir, cache } = await makeCache(10);
+    const a = new Uint8Array(4).fill(1);
+    const b = new Uint8Array(4).fill(2);
+    const c = new Uint8Array(4).fill(3);
+
+    await cache.put("https://example.com/a.whl", a);
+    await cache.put("https://example.com/b.whl", b);
+    // b is the least recently used wheel.
+    const old = new Date(Date.now() - 10000);
+    fs.utimesSync(path.join(dir, "sha256", `${sha256(b)}.whl`), old, old);
+    await cache.put("https://example.com/c.whl", c);
+
+    assert.deepEqual(await cache.get("https://example.com/a.whl"), a);
+    assert.equal(await cache.get("https://example.com/b.whl"), undefined);
+    assert.deepEqual(await cache.get("https://example.com/c.whl"), c);
+  });
+});
@@ -326,6 +326,8 @@ export interface EmscriptenModule {
 export interface PythonModule extends EmscriptenModule {
   _Py_EMSCRIPTEN_SIGNAL_HANDLING: number;
   Py_EmscriptenSignalBuffer: TypedArray;
+  __Py_emscripten_signal_interval: number;
+  __Py_emscripten_signal_clock: number;
   _Py_Version: number;
 }
 
@@ -433,14 +435,124 @@ export interface LockfilePackage {
    * The set of dependencies of this package.
    */
   depends: string[];
+  /**
+   * Compressed copies of the wheel, keyed by their encoding. If the browser
+   * can decode one of them, it is downloaded instead of ``file_name`` and
+   * decompressed while it is downloaded. ``sha256`` is the hash of the
+   * compressed file. Produced by ``tools/compress_wheels.py``.
+   */
+  compressed_files?: {
+    [encoding in WheelCompression]?: { file_name: string; sha256: string };
+  };
 }
 
+/**
+ * The encodings of compressed wheels.
+ * @hidden
+ */
+export type WheelCompression = "br" | "zstd";
+
 /**
  * The type of a package lockfile.
  */
 export interface Lockfile {
   info: LockfileInfo;
   packages: Record<string, LockfilePackage>;
+  /**
+   * Archives holding the wheels of several packages, so that they can be
+   * downloaded with a single request. Produced by
+   * ``tools/create_package_bundles.py``.
+   */
+  bundles?: Record<string, LockfileBundle>;
+}
+
+/**
+ * An archive holding the wheels of several packages, one after the other.
+ */
+export interface LockfileBundle {
+  /**
+   * The file name or url of the bundle, resolved like
+   * :js:attr:`~pyodide.LockfilePackage.file_name`.
+   */
+  file_name: string;
+  /**
+   * Integrity of the whole bundle.
+   */
+  sha256: string;
+  /**
+   * The packages in the bundle, in the order of their wheels. ``name`` is the
+   * key of the package in :js:attr:`~pyodide.Lockfile.packages` and ``size``
+   * the size of its wheel in bytes.
+   */
+  packages: { name: string; size: number }[];
+}
+
+/**
+ * One timed step in a :js:class:`StartupProfile`.
+ */
+export interface StartupProfileEvent {
+  /**
+   * The name of the stage or preRun hook, or the name of the imported module.
+   */
+  name: string;
+  /**
+   * ``stage`` for the stages of ``loadPyodide``, ``preRun`` for the file
+   * system setup that runs while the WebAssembly module is instantiated and
+   * ``import`` for Python imports done while bootstrapping.
+   */
+  category: "stage" | "preRun" | "import";
+  /**
+   * When the event started in milliseconds since ``loadPyodide`` was called.
+   */
+  start: number;
+  /**
+   * How long the event took in milliseconds. The duration of an import
+   * includes the imports it triggered.
+   */
+  duration: number;
+}
+
+/**
+ * The result of ``loadPyodide({profileStartup: true})``, available as
+ * :js:attr:`pyodide.startupProfile`.
+ */
+export interface StartupProfile {
+  /**
+   * The total time ``loadPyodide`` took in milliseconds.
+   */
+  total: number;
+  /**
+   * The recorded events, sorted by their start time.
+   */
+  events: StartupProfileEvent[];
+  /**
+   * Convert the profile to the Chrome trace event format, which can be loaded
+   * in ``chrome://tracing`` or https://ui.perfetto.dev.
+   */
+  toChromeTrace(): { traceEvents: object[]; displayTimeUnit: string };
+}
+
+/**
+ * The result of a run of the Python sampling profiler, returned by
+ * :js:func:`pyodide.profile.stop`.
+ */
+export interface PythonProfile {
+  /** The number of samples that were taken. */
+  sampleCount: number;
+  /** How long the profiler ran for, in milliseconds. */
+  duration: number;
+  /**
+   * The samples in the `speedscope file format
+   * <https://github.com/jlfwong/speedscope/wiki/Importing-from-custom-sources>`_.
+   * Save it with :js:func:`JSON.stringify` and open it in speedscope.
+   */
+  toSpeedscope(): object;
+  /**
+   * The samples in the Chrome trace event format. Save it with
+   * :js:func:`JSON.stringify` and load it in the performance panel of the
+   * browser devtools.
+   */
+  toChromeTrace(): { traceEvents: object[]; displayTimeUnit: string };
 }
 
 /** @hidden */
@@ -476,6 +588,22 @@ export type PackageLoadMetadata = {
   packageData: LockfilePackage;
 };
 
+/**
+ * How long the steps of loading a package took, in milliseconds.
+ * @hidden
+ */
+export type PackageLoadTiming = {
+  name: string;
+  /** The size of the wheel in bytes. */
+  size: number;
+  /** Fetching the wheel, including the integrity check in browsers. */
+  download: number;
+  /** Extracting the wheel into the file system. */
+  unpack: number;
+  /** Loading the shared libraries in the wheel. */
+  dynlibs: number;
+};
+
 /** @hidden */
 export interface API {
   runtimeEnv: RuntimeEnv;
@@ -514,6 +642,7 @@ export interface API {
   pyodide_code: any;
   pyodide_ffi: any;
   pyodide_base: any;
+  pyodide_profile?: any;
   globals: PyProxy;
   rawRun: (code: string) => [number, string];
   runPythonInternal: (code: string) => any;
@@ -531,6 +660,7 @@ export interface API {
   lockfile: Lockfile;
   lockfile_info: LockfileInfo;
   lockfile_packages: Record<string, LockfilePackage>;
+  lockfile_bundles: Record<string, LockfileBundle>;
   packageManager: PackageManager;
   flushPackageManagerBuffers: () => void;
   defaultLdLibraryPath: string[];
@@ -550,6 +680,7 @@ export interface API {
     filename: string,
     installDir: string,
     metadata?: ReadonlyMap<string, string>,
+    timing?: Partial<PackageLoadTiming>,
   ) => Promise<void>;
   _Comlink: any;
 
@@ -557,7 +688,10 @@ export interface API {
   sys: PyProxy;
   os: PyProxy;
 
-  restoreSnapshot(snapshot: Uint8Array): SnapshotConfig;
+  restoreSnapshot(
+    snapshot: Uint8Array,
+    snapshotConfig?: SnapshotConfig,
+  ): SnapshotConfig;
   serializeHiwireState(serializer?: (obj: any) => any): SnapshotConfig;
   makeSnapshot(serializer?: (obj: any) => any): Uint8Array;
   saveSnapshot(): Uint8Array;
@@ -568,11 +702,17 @@ export interface API {
   ) => PyodideAPI;
   syncUpSnapshotLoad3(conf: SnapshotConfig): void;
   abortSignalAny: (signals: AbortSignal[]) => AbortSignal;
+  getJsFunction: (code: string) => Function | undefined;
   version: string;
   abiVersion: string;
   pyVersionTuple: [number, number, number];
   LiteralMap: any;
   sitePackages: string;
+  stdlibRemainderPending?: Promise<void>;
+  startupProfile?: StartupProfile;
+  importTimeOrigin: number;
+  startSampling: (interval: number, signum: number) => void;
+  stopSampling: () => void;
   initializeNodeSockFS: typeof initializeNodeSockFS;
 
   _nodeSock: {
@@ -592,6 +732,7 @@ export type PackageManagerAPI = Pick<
   | "importlib"
   | "package_loader"
   | "lockfile_packages"
+  | "lockfile_bundles"
   | "bootstrapFinalizedPromise"
   | "sitepackages"
   | "defaultLdLibraryPath"
@@ -599,7 +740,11 @@ export type PackageManagerAPI = Pick<
 > & {
   config: Pick<
     PyodideConfigWithDefaults,
-    "packageCacheDir" | "packageBaseUrl" | "cdnUrl"
+    | "packageCacheDir"
+    | "packageBaseUrl"
+    | "cdnUrl"
+    | "wheelCacheDir"
+    | "wheelCacheSize"
   >;
 };
 /**
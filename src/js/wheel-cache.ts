@@ -0,0 +1,165 @@
+import { ensureDirNode, nodeCryptoMod, nodeFsPromisesMod } from "./compat";
+
+/**
+ * The default maximum size of the wheel cache, 1 GiB.
+ * @private
+ */
+export const DEFAULT_WHEEL_CACHE_SIZE = 1024 * 1024 * 1024;
+
+const SHA256_PATTERN = /^[0-9a-f]{64}$/;
+
+function sha256Hex(data: Uint8Array | string): string {
+  return nodeCryptoMod.createHash("sha256").update(data).digest("hex");
+}
+
+/**
+ * A content addressed cache of wheels on the local file system (Node.js only).
+ *
+ * Each wheel is stored once as ``sha256/<hash>.whl``, named after the sha256
+ * of its contents, so the cache can be shared by any number of Pyodide
+ * instances and processes. Wheels that aren't in the lock file are found
+ * through ``urls/<hash of the url>``, which holds the sha256 of the wheel that
+ * was downloaded from that url.
+ *
+ * Files are written to a temporary file and then renamed, so readers never
+ * see a partially written wheel. When the cache grows beyond ``maxSize``, the
+ * least recently used wheels are removed.
+ *
+ * @private
+ */
+export class WheelCache {
+  readonly dir: string;
+  readonly maxSize: number;
+
+  constructor(dir: string, maxSize: number = DEFAULT_WHEEL_CACHE_SIZE) {
+    this.dir = dir.endsWith("/") ? dir : dir + "/";
+    this.maxSize = maxSize;
+  }
+
+  private get wheelDir() {
+    return this.dir + "sha256/";
+  }
+
+  private get urlDir() {
+    return this.dir + "urls/";
+  }
+
+  private wheelPath(sha256: string) {
+    return this.wheelDir + sha256 + ".whl";
+  }
+
+  private urlPath(url: string) {
+    return this.urlDir + sha256Hex(url);
+  }
+
+  /**
+   * Look up a wheel in the cache.
+   *
+   * @param url The url the wheel would be downloaded from.
+   * @param sha256 The expected sha256 of the wheel, if it is known from the
+   * lock file.
+   * @returns The contents of the wheel, or ``undefined`` if it isn't cached.
+   */
+  async get(url: string, sha256?: string): Promise<Uint8Array | undefined> {
+    if (!sha256) {
+      try {
+        sha256 = (
+          await nodeFsPromisesMod.readFile(this.urlPath(url), "utf8")
+        ).trim();
+      } catch {
+        return undefined;
+      }
+    }
+    if (!SHA256_PATTERN.test(sha256)) {
+      return undefined;
+    }
+    const path = this.wheelPath(sha256);
+    let data: Buffer;
+    try {
+      // Wheels are never modified after they are written, so a single read
+      // of the whole file is enough and the OS can share its pages between
+      // all the processes using the cache.
+      data = await nodeFsPromisesMod.readFile(path);
+    } catch {
+      return undefined;
+    }
+    // Mark the wheel as recently used, eviction removes the oldest ones first.
+    const now = new Date();
+    nodeFsPromisesMod.utimes(path, now, now).catch(() => {});
+    return new Uint8Array(data.buffer, data.byteOffset, data.byteLength);
+  }
+
+  /**
+   * Store a wheel in the cache.
+   *
+   * @param url The url the wheel was downloaded from.
+   * @param data The contents of the wheel.
+   * @returns The sha256 of the wheel.
+   */
+  async put(url: string, data: Uint8Array): Promise<string> {
+    const sha256 = sha256Hex(data);
+    await ensureDirNode(this.wheelDir);
+    await ensureDirNode(this.urlDir);
+    const path = this.wheelPath(sha256);
+    try {
+      await nodeFsPromisesMod.stat(path);
+    } catch {
+      await writeFileAtomic(path, data);
+    }
+    await writeFileAtomic(this.urlPath(url), sha256);
+    await this.evict(sha256);
+    return sha256;
+  }
+
+  /**
+   * Remove the least recently used wheels until the cache is no larger than
+   * ``maxSize``.
+   *
+   * @param keep The sha256 of a wheel that must not be removed.
+   */
+  async evict(keep?: string) {
+    const entries = [];
+    let total = 0;
+    for (const name of await nodeFsPromisesMod.readdir(this.wheelDir)) {
+      // Skip temporary files of writes that are in progress.
+      if (!name.endsWith(".whl")) {
+        continue;
+      }
+      try {
+        const stat = await nodeFsPromisesMod.stat(this.wheelDir + name);
+        entries.push({ name, size: stat.size, mtime: stat.mtimeMs });
+        total += stat.size;
+      } catch {
+        // Removed by another process in the meantime.
+      }
+    }
+    entries.sort((a, b) => a.mtime - b.mtime);
+    for (const { name, size } of entries) {
+      if (total <= this.maxSize) {
+        break;
+      }
+      if (name === keep + ".whl") {
+        continue;
+      }
+      // Processes that are reading the wheel can finish, the data is only
+      // freed when it is closed. Url entries pointing to it become misses.
+      await nodeFsPromisesMod.rm(this.wheelDir + name, { force: true });
+      total -= size;
+    }
+  }
+}
+
+/**
+ * Write a file by writing a temporary file in the same directory and then
+ * renaming it, so that the file is either missing or complete.
+ */
+async function writeFileAtomic(path: string, data: Uint8Array | string) {
+  const tmp = `${path}.${nodeCryptoMod.randomUUID()}.tmp`;
+  try {
+    await nodeFsPromisesMod.writeFile(tmp, data);
+    await nodeFsPromisesMod.rename(tmp, path);
+  } catch (e) {
+    await nodeFsPromisesMod.rm(tmp, { force: true });
+    throw e;
+  }
+}
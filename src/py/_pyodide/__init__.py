@@ -7,6 +7,8 @@
 # All pure Python code that doesn't require imports from js, pyodide_js, or
 # _pyodide_core belongs in _pyodide. Code that requires such imports belongs in
 # pyodide.
+import os
+
 from . import _base, _importhook
 
 __all__ = ["_base", "_importhook"]
@@ -28,3 +30,41 @@ def set_excepthook():
     # Python 3.13 seems to have switched to using `traceback.print_exception` as
     # the default excepthook.
     sys.excepthook = traceback.print_exception
+
+
+class _FlushingStream:
+    """Stands in for sys.stdout or sys.stderr while a buffered handler is set.
+
+    Flushing the stream only writes what it buffered to the file descriptor,
+    while a buffered handler holds the output until the device is fsync'd.
+    Everything is forwarded to the wrapped stream, and flush() also fsyncs it.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def flush(self) -> None:
+        self._stream.flush()
+        try:
+            os.fsync(self._stream.fileno())
+        except OSError:
+            pass
+
+
+def set_flush_std_stream(name: str, enable: bool) -> None:
+    """Make ``flush()`` of ``sys.stdout`` or ``sys.stderr`` also flush the
+    JavaScript handler, or undo it.
+
+    Called by setStdout and setStderr, which only enable it for buffered
+    handlers. A stream that was replaced from Python is left alone.
+    """
+    import sys
+
+    stream = getattr(sys, name)
+    if enable and stream is not None and stream is getattr(sys, f"__{name}__"):
+        setattr(sys, name, _FlushingStream(stream))
+    elif not enable and isinstance(stream, _FlushingStream):
+        setattr(sys, name, stream._stream)
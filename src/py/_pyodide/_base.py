@@ -8,14 +8,19 @@ A library of helper utilities for connecting Python to the browser environment.
 import ast
 import builtins
 import linecache
+import marshal
 import tokenize
-from collections.abc import Generator
+from collections import OrderedDict
+from collections.abc import Generator, Iterator
 from copy import deepcopy
+from functools import lru_cache
 from importlib import import_module
+from importlib.util import MAGIC_NUMBER
 from io import StringIO
+from pathlib import Path
 from textwrap import dedent
 from types import CodeType
-from typing import Any, Literal
+from typing import Any, Literal, NamedTuple
 
 
 def should_quiet(source: str, /) -> bool:
@@ -284,6 +289,15 @@ class CodeRunner:
         )
         self.ast = next(self._gen)
 
+    @classmethod
+    def _from_code(cls, source: str, code: CodeType | None) -> "CodeRunner":
+        """Make an already compiled CodeRunner from a cached code object."""
+        self = cls.__new__(cls)
+        self._compiled = True
+        self._source = source
+        self.code = code
+        return self
+
     def compile(self) -> "CodeRunner":
         """Compile the current value of ``self.ast`` and store the result in ``self.code``.
 
@@ -415,6 +429,158 @@ class CodeRunner:
             return e.value
 
 
+class CodeCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+CodeCacheKey = tuple[str, str, bool, str, int, bool, int]
+
+
+class CodeCache:
+    """A least recently used cache of the code objects compiled by
+    :py:func:`eval_code` and :py:func:`eval_code_async`.
+
+    Code that is run repeatedly, e.g., by calling
+    :js:func:`pyodide.runPython` with the same snippet, is only parsed,
+    transformed and compiled the first time. The cache is keyed by the source
+    and every argument that affects compilation. :py:class:`CodeRunner` does not
+    use the cache since callers may transform its AST.
+
+    Parameters
+    ----------
+    maxsize :
+
+        The maximum number of code objects to keep. ``0`` disables the cache.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self._cache: OrderedDict[CodeCacheKey, CodeType | None] = OrderedDict()
+        self._maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        """The maximum number of code objects to keep. ``0`` disables the cache."""
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative")
+        self._maxsize = maxsize
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._cache) > self._maxsize:
+            self._cache.popitem(last=False)
+
+    def get(self, key: CodeCacheKey) -> tuple[bool, CodeType | None]:
+        """Look up a code object, returning whether it was found and the code."""
+        try:
+            code = self._cache[key]
+        except KeyError:
+            self._misses += 1
+            return False, None
+        self._cache.move_to_end(key)
+        self._hits += 1
+        return True, code
+
+    def put(self, key: CodeCacheKey, code: CodeType | None) -> None:
+        """Add a code object to the cache, evicting the least recently used one
+        if the cache is full."""
+        if self._maxsize == 0:
+            return
+        self._cache[key] = code
+        self._cache.move_to_end(key)
+        self._evict()
+
+    def cache_info(self) -> CodeCacheInfo:
+        """Report the hits, misses, maximum size and current size of the cache,
+        like :py:meth:`functools.lru_cache.cache_info`."""
+        return CodeCacheInfo(self._hits, self._misses, self._maxsize, len(self._cache))
+
+    def cache_clear(self) -> None:
+        """Remove all cached code objects and reset the statistics."""
+        self._cache.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def save(self, path: str | Path) -> int:
+        """Write the cached code objects to ``path`` with :py:mod:`marshal`.
+
+        Use a path in a persistent file system (e.g., IDBFS or NativeFS) to
+        reuse the compiled code in the next session.
+
+        Returns
+        -------
+            The number of code objects written.
+        """
+        entries = list(self._cache.items())
+        Path(path).write_bytes(MAGIC_NUMBER + marshal.dumps(entries))
+        return len(entries)
+
+    def load(self, path: str | Path) -> int:
+        """Add the code objects saved by :py:meth:`save` to the cache.
+
+        Files written by a different Python version are ignored, since
+        :py:mod:`marshal` data is not portable between versions.
+
+        Returns
+        -------
+            The number of code objects read.
+        """
+        data = Path(path).read_bytes()
+        if not data.startswith(MAGIC_NUMBER):
+            return 0
+        entries = marshal.loads(data[len(MAGIC_NUMBER) :])
+        for key, code in entries:
+            self.put(key, code)
+        return len(entries)
+
+
+code_cache = CodeCache()
+"""The cache used by :py:func:`eval_code` and :py:func:`eval_code_async`."""
+
+
+def _cached_code_runner(
+    source: str,
+    *,
+    return_mode: ReturnMode,
+    quiet_trailing_semicolon: bool,
+    filename: str,
+    flags: int,
+    dont_inherit: bool,
+    optimize: int,
+) -> CodeRunner:
+    key = (
+        source,
+        return_mode,
+        quiet_trailing_semicolon,
+        filename,
+        flags,
+        dont_inherit,
+        optimize,
+    )
+    found, code = code_cache.get(key)
+    if found:
+        return CodeRunner._from_code(source, code)
+    runner = CodeRunner(
+        source,
+        return_mode=return_mode,
+        quiet_trailing_semicolon=quiet_trailing_semicolon,
+        filename=filename,
+        flags=flags,
+        dont_inherit=dont_inherit,
+        optimize=optimize,
+    ).compile()
+    code_cache.put(key, runner.code)
+    return runner
+
+
 def eval_code(
     source: str,
     globals: dict[str, Any] | None = None,
@@ -509,19 +675,15 @@ def eval_code(
                   ^^^^^^^
     NameError: name 'pyodide' is not defined
     """
-    return (
-        CodeRunner(
-            source,
-            return_mode=return_mode,
-            quiet_trailing_semicolon=quiet_trailing_semicolon,
-            filename=filename,
-            flags=flags,
-            dont_inherit=dont_inherit,
-            optimize=optimize,
-        )
-        .compile()
-        .run(globals, locals)
-    )
+    return _cached_code_runner(
+        source,
+        return_mode=return_mode,
+        quiet_trailing_semicolon=quiet_trailing_semicolon,
+        filename=filename,
+        flags=flags,
+        dont_inherit=dont_inherit,
+        optimize=optimize,
+    ).run(globals, locals)
 
 
 async def eval_code_async(
@@ -593,19 +755,15 @@ async def eval_code_async(
         parameters to modify this default behavior.
     """
     flags = flags or ast.PyCF_ALLOW_TOP_LEVEL_AWAIT
-    return (
-        await CodeRunner(
-            source,
-            return_mode=return_mode,
-            quiet_trailing_semicolon=quiet_trailing_semicolon,
-            filename=filename,
-            flags=flags,
-            dont_inherit=dont_inherit,
-            optimize=optimize,
-        )
-        .compile()
-        .run_async(globals, locals)
-    )
+    return await _cached_code_runner(
+        source,
+        return_mode=return_mode,
+        quiet_trailing_semicolon=quiet_trailing_semicolon,
+        filename=filename,
+        flags=flags,
+        dont_inherit=dont_inherit,
+        optimize=optimize,
+    ).run_async(globals, locals)
 
 
 def _add_prefixes(s: set[str], mod: str) -> None:
@@ -616,6 +774,46 @@ def _add_prefixes(s: set[str], mod: str) -> None:
         s.add(current)
 
 
+def _iter_import_nodes(mod: ast.Module) -> Iterator[ast.Import | ast.ImportFrom]:
+    # Imports are statements, so only visit statement bodies rather than every
+    # expression node like ast.walk does.
+    stack: list[ast.AST] = list(mod.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Import | ast.ImportFrom):
+            yield node
+            continue
+        for field in ("body", "orelse", "finalbody", "handlers", "cases"):
+            stack.extend(getattr(node, field, ()))
+
+
+@lru_cache(maxsize=128)
+def _find_imports_cached(source: str) -> tuple[str, ...]:
+    # Fast path: without the keyword there is nothing to parse for.
+    if "import" not in source:
+        return ()
+
+    # handle mis-indented input from multi-line strings
+    source = dedent(source)
+
+    try:
+        mod = ast.parse(source)
+    except SyntaxError:
+        return ()
+    imports: set[str] = set()
+    for node in _iter_import_nodes(mod):
+        if isinstance(node, ast.Import):
+            for name in node.names:
+                node_name = name.name
+                _add_prefixes(imports, node_name)
+        else:
+            module_name = node.module
+            if module_name is None:
+                continue
+            _add_prefixes(imports, module_name)
+    return tuple(sorted(imports))
+
+
 def find_imports(source: str) -> list[str]:
     """
     Finds the imports in a Python source code string
@@ -640,25 +838,9 @@ def find_imports(source: str) -> list[str]:
     >>> find_imports(source)
     ['numpy', 'scipy', 'scipy.stats']
     """
-    # handle mis-indented input from multi-line strings
-    source = dedent(source)
-
-    try:
-        mod = ast.parse(source)
-    except SyntaxError:
-        return []
-    imports: set[str] = set()
-    for node in ast.walk(mod):
-        if isinstance(node, ast.Import):
-            for name in node.names:
-                node_name = name.name
-                _add_prefixes(imports, node_name)
-        elif isinstance(node, ast.ImportFrom):
-            module_name = node.module
-            if module_name is None:
-                continue
-            _add_prefixes(imports, module_name)
-    return sorted(imports)
+    # The result for recently inspected sources is cached since editors tend to
+    # call this repeatedly with the same code.
+    return list(_find_imports_cached(source))
 
 
 def pyimport_impl(path: str) -> Any:
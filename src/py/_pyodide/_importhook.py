@@ -1,3 +1,4 @@
+import os
 import re
 import sys
 from collections.abc import Callable, Sequence
@@ -155,6 +156,79 @@ class WindowsToLinuxPathFinder:
         return PathFinder.find_spec(fullname, converted_paths, target)
 
 
+STDLIB_REMAINDER_PATH = (
+    f"/lib/python{sys.version_info.major}{sys.version_info.minor}_remainder.zip"
+)
+
+
+class StdlibRemainderFinder:
+    """
+    A MetaPathFinder that mounts the standard library remainder on demand.
+
+    A standard library zip pruned with ``tools/create_zipfile.py --import-trace``
+    only contains the modules a workload actually imported. The rest of the
+    standard library is downloaded in the background to
+    ``STDLIB_REMAINDER_PATH`` if ``stdLibRemainderURL`` is passed to
+    ``loadPyodide``. The first import of a standard library module that misses
+    adds it to ``sys.path``. If the download hasn't finished yet, the import
+    waits for it. Other imports are left to the remaining finders.
+    """
+
+    @classmethod
+    def find_spec(
+        cls,
+        fullname: str,
+        path: Sequence[str] | None = None,
+        target: ModuleType | None = None,
+    ) -> ModuleSpec | None:
+        if fullname.partition(".")[0] not in sys.stdlib_module_names:
+            return None
+        if not os.path.exists(STDLIB_REMAINDER_PATH) and not _wait_for_remainder(
+            fullname
+        ):
+            return None
+
+        parent, _, _ = fullname.rpartition(".")
+        if not parent:
+            if STDLIB_REMAINDER_PATH not in sys.path:
+                sys.path.append(STDLIB_REMAINDER_PATH)
+            return PathFinder.find_spec(fullname, [STDLIB_REMAINDER_PATH], target)
+
+        # The parent package was found in the pruned zip, so its __path__
+        # doesn't include the remainder yet.
+        subdir = f"{STDLIB_REMAINDER_PATH}/{parent.replace('.', '/')}"
+        spec = PathFinder.find_spec(fullname, [subdir], target)
+        parent_path = getattr(sys.modules.get(parent), "__path__", None)
+        if spec is not None and isinstance(parent_path, list):
+            if subdir not in parent_path:
+                parent_path.append(subdir)
+        return spec
+
+
+def _wait_for_remainder(fullname: str) -> bool:
+    """Block until the download of the standard library remainder finished, if
+    it is in progress. Returns whether the remainder is installed."""
+    try:
+        from pyodide_js._api import stdlibRemainderPending
+    except ImportError:
+        return False
+    if not stdlibRemainderPending:
+        return False
+
+    from pyodide.ffi import can_run_sync, run_sync
+
+    if not can_run_sync():
+        raise ModuleNotFoundError(
+            f"No module named '{fullname}' in the pruned standard library. It may "
+            "be in the standard library remainder, which is still being "
+            "downloaded. Import it from code run with runPythonAsync to wait for "
+            "the download.",
+            name=fullname,
+        )
+    run_sync(stdlibRemainderPending)
+    return os.path.exists(STDLIB_REMAINDER_PATH)
+
+
 jsfinder: JsFinder = JsFinder()
 register_js_module = jsfinder.register_js_module
 unregister_js_module = jsfinder.unregister_js_module
@@ -193,6 +267,18 @@ def register_windows_finder() -> None:
     sys.meta_path.append(WindowsToLinuxPathFinder)
 
 
+def register_stdlib_remainder_finder() -> None:
+    """A bootstrap function to register StdlibRemainderFinder in sys.meta_path.
+
+    This is called in `loadPyodide` in `pyodide.js`. The finder does nothing
+    unless the standard library remainder has been installed.
+    """
+    for importer in sys.meta_path:
+        if importer is StdlibRemainderFinder:
+            raise RuntimeError("StdlibRemainderFinder already registered")
+    sys.meta_path.append(StdlibRemainderFinder)
+
+
 STDLIBS = sys.stdlib_module_names | {"test"}
 
 REPODATA_PACKAGES_IMPORT_TO_PACKAGE_NAME: dict[str, str] = {}
@@ -0,0 +1,171 @@
+"""
+A sampling profiler for Python code.
+
+:py:class:`Sampler` records the Python stack each time :py:meth:`Sampler.sample`
+is called. In Pyodide it is called from a signal handler that the interpreter
+runs when JavaScript decides that a sample is due, see :py:mod:`pyodide.profile`.
+Sampling the stack is cheap compared to :py:mod:`cProfile` which has to run a
+callback for every call and return.
+"""
+
+from collections.abc import Iterator
+from time import perf_counter
+from types import FrameType
+from typing import Any
+
+# (function name, file name, first line number)
+FrameInfo = tuple[str, str, int]
+
+
+class Profile:
+    """The Python stacks recorded by a run of the sampling profiler.
+
+    Use :py:meth:`to_speedscope` or :py:meth:`to_chrome_trace` to look at the
+    profile in `speedscope <https://www.speedscope.app/>`_ or in the
+    performance panel of the browser devtools.
+    """
+
+    def __init__(
+        self,
+        frames: list[FrameInfo],
+        samples: list[tuple[int, ...]],
+        timestamps: list[float],
+        duration: float,
+    ):
+        #: The distinct frames that were seen, stacks refer to them by index.
+        self.frames = frames
+        #: The sampled stacks as tuples of indices into :py:attr:`frames`, the
+        #: outermost frame comes first.
+        self.samples = samples
+        #: When each sample was taken, in milliseconds since the profiler started.
+        self.timestamps = timestamps
+        #: How long the profiler ran for, in milliseconds.
+        self.duration = duration
+
+    def _weights(self) -> Iterator[float]:
+        """The time attributed to each sample, up to the next sample."""
+        ends = [*self.timestamps[1:], self.duration]
+        for start, end in zip(self.timestamps, ends, strict=True):
+            yield end - start
+
+    def aggregate(self) -> dict[tuple[FrameInfo, ...], float]:
+        """Sum up the time spent in each distinct stack.
+
+        Returns
+        -------
+            A dictionary mapping stacks, outermost frame first, to the number of
+            milliseconds they were sampled for.
+        """
+        result: dict[tuple[FrameInfo, ...], float] = {}
+        for stack, weight in zip(self.samples, self._weights(), strict=True):
+            key = tuple(self.frames[idx] for idx in stack)
+            result[key] = result.get(key, 0) + weight
+        return result
+
+    def to_speedscope(self, name: str = "Python") -> dict[str, Any]:
+        """Export the profile in the `speedscope file format
+        <https://github.com/jlfwong/speedscope/wiki/Importing-from-custom-sources>`_.
+
+        The result can be saved with :py:func:`json.dump` and opened in
+        speedscope.
+        """
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "pyodide",
+            "name": name,
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": func, "file": file, "line": line}
+                    for func, file, line in self.frames
+                ]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": self.duration,
+                    "samples": [list(stack) for stack in self.samples],
+                    "weights": list(self._weights()),
+                }
+            ],
+        }
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Export the profile in the `Chrome trace event format
+        <https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU>`_.
+
+        Consecutive samples that share the same frames are merged, so each call
+        becomes one event. The result can be saved with :py:func:`json.dump`
+        and loaded in the performance panel of the browser devtools or in
+        https://ui.perfetto.dev.
+        """
+        events: list[dict[str, Any]] = []
+        # (frame index, start time) of the frames on the current stack
+        open_frames: list[tuple[int, float]] = []
+
+        def close(depth: int, end: float) -> None:
+            for idx, start in reversed(open_frames[depth:]):
+                func, file, line = self.frames[idx]
+                events.append(
+                    {
+                        "name": func,
+                        "cat": "python",
+                        "ph": "X",
+                        "ts": start * 1000,
+                        "dur": (end - start) * 1000,
+                        "pid": 1,
+                        "tid": 1,
+                        "args": {"file": file, "line": line},
+                    }
+                )
+            del open_frames[depth:]
+
+        for stack, timestamp in zip(self.samples, self.timestamps, strict=True):
+            depth = 0
+            for (open_idx, _), idx in zip(open_frames, stack, strict=False):
+                if open_idx != idx:
+                    break
+                depth += 1
+            close(depth, timestamp)
+            open_frames.extend((idx, timestamp) for idx in stack[depth:])
+        close(0, self.duration)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+class Sampler:
+    """Collect samples of the Python stack into a :py:class:`Profile`."""
+
+    def __init__(self) -> None:
+        self._frame_ids: dict[FrameInfo, int] = {}
+        self._samples: list[tuple[int, ...]] = []
+        self._timestamps: list[float] = []
+        self._start = perf_counter()
+
+    def sample(self, frame: FrameType | None) -> None:
+        """Record the stack that ``frame`` is the innermost frame of."""
+        timestamp = (perf_counter() - self._start) * 1000
+        frame_ids = self._frame_ids
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            info = (code.co_qualname, code.co_filename, code.co_firstlineno)
+            idx = frame_ids.get(info)
+            if idx is None:
+                idx = frame_ids[info] = len(frame_ids)
+            stack.append(idx)
+            frame = frame.f_back
+        stack.reverse()
+        self._samples.append(tuple(stack))
+        self._timestamps.append(timestamp)
+
+    def profile(self) -> Profile:
+        """Get the samples that were recorded so far."""
+        return Profile(
+            list(self._frame_ids),
+            list(self._samples),
+            list(self._timestamps),
+            (perf_counter() - self._start) * 1000,
+        )
@@ -0,0 +1,67 @@
+"""
+Record how long imports take, similar to ``python -X importtime``.
+
+``loadPyodide({profileStartup: true})`` calls :py:func:`start` right after the
+interpreter is initialized and before ``_pyodide`` is imported, and
+:py:func:`stop` once Pyodide is ready. This module is outside of ``_pyodide``
+and only imports builtin modules, so that importing it doesn't import anything
+that should be recorded.
+
+CPython looks up ``_find_and_load`` on the ``_frozen_importlib`` module every
+time it imports a module that is not in ``sys.modules`` yet, so replacing it
+with a wrapper sees every import, including the ones done from C.
+"""
+
+import sys
+from time import perf_counter
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+_bootstrap: Any = sys.modules["_frozen_importlib"]
+
+_orig_find_and_load: Any = None
+_origin: float = 0.0
+_records: list[tuple[str, float, float]] = []
+
+
+def _timed_find_and_load(name: str, import_: Any) -> Any:
+    start = perf_counter()
+    try:
+        return _orig_find_and_load(name, import_)
+    finally:
+        _records.append((name, start, perf_counter()))
+
+
+def start() -> None:
+    """Start recording imports."""
+    global _orig_find_and_load, _origin  # noqa: PLW0603
+    if _orig_find_and_load is not None:
+        return
+    _records.clear()
+    _origin = perf_counter()
+    _orig_find_and_load = _bootstrap._find_and_load
+    _bootstrap._find_and_load = _timed_find_and_load
+
+
+def stop() -> list[tuple[str, float, float]]:
+    """Stop recording imports.
+
+    Returns
+    -------
+        A list of ``(module name, start, duration)`` tuples in the order the
+        imports finished. Times are in milliseconds, the start is relative to
+        the call to :py:func:`start`.
+    """
+    global _orig_find_and_load  # noqa: PLW0603
+    if _orig_find_and_load is None:
+        return []
+    _bootstrap._find_and_load = _orig_find_and_load
+    _orig_find_and_load = None
+    result = [
+        (name, (start - _origin) * 1000, (end - start) * 1000)
+        for name, start, end in _records
+    ]
+    _records.clear()
+    return result
@@ -12,7 +12,7 @@
 # importing from these.
 __version__ = "314.1.0.dev0"
 
-__all__ = ["__version__", "console", "code", "ffi", "http", "webloop"]
+__all__ = ["__version__", "console", "code", "ffi", "http", "profile", "webloop"]
 
 from . import _state  # noqa: F401
 from .webloop import _initialize_event_loop
@@ -1,10 +1,14 @@
 from collections.abc import Callable
-from functools import lru_cache, wraps
+from functools import wraps
 from inspect import Parameter, Signature, signature
+from types import MethodType
 from typing import Any, ParamSpec, TypeVar
+from weakref import WeakKeyDictionary
 
 from _pyodide._base import (
+    CodeCache,
     CodeRunner,
+    code_cache,
     eval_code,
     eval_code_async,
     find_imports,
@@ -12,27 +16,70 @@ from _pyodide._base import (
 )
 
 
-def run_js(code: str, /) -> Any:
+def run_js(code: str, /, *args: Any) -> Any:
     """
     A wrapper for the :js:func:`eval` function.
 
     Runs ``code`` as a Javascript code string and returns the result. Unlike
     :js:func:`eval`, if ``code`` is not a string we raise a :py:exc:`TypeError`.
+
+    If ``args`` are given, ``code`` must evaluate to a JavaScript function,
+    which is called with ``args`` and its result is returned. The function is
+    only compiled the first time, later calls with the same ``code`` reuse it.
+    Pass values as arguments rather than formatting them into ``code``, so that
+    they don't need to be escaped and the function can be reused. To call a
+    function without arguments, use :py:func:`run_js_function`.
+
+    Examples
+    --------
+    >>> from pyodide.code import run_js # doctest: +RUN_IN_PYODIDE
+    >>> run_js("(a, b) => a + b", 1, 2)
+    3
     """
+    _check_code_type(code)
+    if args:
+        return run_js_function(code)(*args)
+
     from js import eval as eval_
 
+    return eval_(code)
+
+
+def run_js_function(code: str, /) -> Any:
+    """
+    Evaluate ``code`` to a JavaScript function and return it.
+
+    The function is only compiled the first time, later calls with the same
+    ``code`` return the same function. Unlike :py:func:`run_js` without
+    arguments, this can be used to call a function with no arguments
+    repeatedly without evaluating ``code`` each time. Each call returns a new
+    proxy of the function, so it can be destroyed without affecting other
+    callers.
+
+    Examples
+    --------
+    >>> from pyodide.code import run_js_function # doctest: +RUN_IN_PYODIDE
+    >>> five = run_js_function("() => 5")
+    >>> five()
+    5
+    """
+    _check_code_type(code)
+    from pyodide_js._api import getJsFunction
+
+    func = getJsFunction(code)
+    if func is None:
+        raise TypeError("code should evaluate to a JavaScript function")
+    return func
+
+
+def _check_code_type(code: Any) -> None:
     if not isinstance(code, str):
         raise TypeError(
             f"argument should have type 'string' not type '{type(code).__name__}'"
         )
-    return eval_(code)
 
 
-def _relaxed_call_sig(func: Callable[..., Any]) -> Signature | None:
-    try:
-        sig = signature(func)
-    except (TypeError, ValueError):
-        return None
+def _relaxed_call_sig(sig: Signature) -> Signature:
     new_params = list(sig.parameters.values())
     idx: int | None = -1
     for idx, param in enumerate(new_params):
@@ -55,18 +102,119 @@ def _relaxed_call_sig(func: Callable[..., Any]) -> Signature | None:
     return new_sig
 
 
-@lru_cache
-def _relaxed_call_sig_cached(func: Callable[..., Any]) -> Signature | None:
-    return _relaxed_call_sig(func)
+class _RelaxedAdapter:
+    """Calls a function with the arguments it doesn't accept dropped.
+
+    The adapter is specialized to the signature: it slices the positional
+    arguments to the number the function accepts and filters the keyword
+    arguments against the accepted names, rather than binding the arguments to
+    the signature on every call. It doesn't reference the function so it can be
+    cached in a WeakKeyDictionary keyed by the function.
+    """
+
+    __slots__ = ("call", "_sig")
+
+    def __init__(self, sig: Signature) -> None:
+        self._sig = sig
+        nargs: int | None = 0
+        names: set[str] | None = set()
+        for param in sig.parameters.values():
+            match param.kind:
+                case Parameter.POSITIONAL_ONLY:
+                    if nargs is not None:
+                        nargs += 1
+                case Parameter.POSITIONAL_OR_KEYWORD:
+                    if nargs is not None:
+                        nargs += 1
+                    if names is not None:
+                        names.add(param.name)
+                case Parameter.VAR_POSITIONAL:
+                    nargs = None
+                case Parameter.KEYWORD_ONLY:
+                    if names is not None:
+                        names.add(param.name)
+                case Parameter.VAR_KEYWORD:
+                    names = None
+        self.call = self._make_call(nargs, None if names is None else frozenset(names))
 
+    @staticmethod
+    def _make_call(
+        nargs: int | None, names: frozenset[str] | None
+    ) -> Callable[[Callable[..., Any], tuple[Any, ...], dict[str, Any]], Any]:
+        if nargs is None and names is None:
 
-def _do_call(
-    func: Callable[..., Any], sig: Signature, args: Any, kwargs: dict[str, Any]
-) -> Any:
-    bound = sig.bind(*args, **kwargs)
-    bound.arguments.pop("__var_positional", None)
-    bound.arguments.pop("__var_keyword", None)
-    return func(*bound.args, **bound.kwargs)
+            def call(func: Callable[..., Any], args: Any, kwargs: Any) -> Any:
+                return func(*args, **kwargs)
+
+        elif names is None:
+
+            def call(func: Callable[..., Any], args: Any, kwargs: Any) -> Any:
+                return func(*args[:nargs], **kwargs)
+
+        else:
+            kwnames = names
+
+            def call(func: Callable[..., Any], args: Any, kwargs: Any) -> Any:
+                if kwargs and not kwargs.keys() <= kwnames:
+                    kwargs = {k: v for k, v in kwargs.items() if k in kwnames}
+                if nargs is not None:
+                    args = args[:nargs]
+                return func(*args, **kwargs)
+
+        return call
+
+    def raise_bind_error(self, args: Any, kwargs: Any) -> None:
+        """If the arguments don't fit the signature, raise the same TypeError as
+        :py:meth:`inspect.Signature.bind`. Used to report errors after a call
+        failed with a TypeError."""
+        try:
+            _relaxed_call_sig(self._sig).bind(*args, **kwargs)
+        except TypeError as e:
+            raise e from None
+
+
+def _make_relaxed_adapter(func: Callable[..., Any]) -> _RelaxedAdapter | None:
+    try:
+        sig = signature(func)
+    except (TypeError, ValueError):
+        return None
+    return _RelaxedAdapter(sig)
+
+
+_RELAXED_ADAPTER_CACHE_SIZE = 1024
+_relaxed_adapter_cache: WeakKeyDictionary[
+    Callable[..., Any], _RelaxedAdapter | None
+] = WeakKeyDictionary()
+# Adapters for bound methods, keyed by the underlying function. Each attribute
+# access creates a new bound method which dies right after the call, so keying
+# on the method would never hit. The methods bound from the same function all
+# have the same signature.
+_relaxed_method_adapter_cache: WeakKeyDictionary[
+    Callable[..., Any], _RelaxedAdapter | None
+] = WeakKeyDictionary()
+
+
+def _get_relaxed_adapter(func: Callable[..., Any]) -> _RelaxedAdapter | None:
+    if isinstance(func, MethodType):
+        cache = _relaxed_method_adapter_cache
+        key = func.__func__
+    else:
+        cache = _relaxed_adapter_cache
+        key = func
+    try:
+        return cache[key]
+    except KeyError:
+        pass
+    except TypeError:
+        # Can't be weakly referenced or isn't hashable
+        return _make_relaxed_adapter(func)
+    adapter = _make_relaxed_adapter(func)
+    if len(cache) >= _RELAXED_ADAPTER_CACHE_SIZE:
+        for old_key in cache:
+            del cache[old_key]
+            break
+    cache[key] = adapter
+    return adapter
 
 
 Param = ParamSpec("Param")
@@ -80,15 +228,18 @@ def relaxed_wrap(func: Callable[Param, RetType]) -> Callable[..., RetType]:
     If extra positional or keyword arguments are provided they will be
     discarded.
     """
-    sig = _relaxed_call_sig(func)
-    if sig is None:
+    adapter = _make_relaxed_adapter(func)
+    if adapter is None:
         raise TypeError("Cannot wrap function")
-    else:
-        sig2 = sig
+    call = adapter.call
 
     @wraps(func)
     def wrapper(*args: Param.args, **kwargs: Param.kwargs) -> RetType:
-        return _do_call(func, sig2, args, kwargs)
+        try:
+            return call(func, args, kwargs)
+        except TypeError:
+            adapter.raise_bind_error(args, kwargs)
+            raise
 
     return wrapper
 
@@ -99,19 +250,26 @@ def relaxed_call(func: Callable[..., RetType], *args: Any, **kwargs: Any) -> Ret
     If extra positional or keyword arguments are provided they will be
     discarded.
     """
-    sig = _relaxed_call_sig_cached(func)
-    if sig is None:
+    adapter = _get_relaxed_adapter(func)
+    if adapter is None:
         return func(*args, **kwargs)
-    return _do_call(func, sig, args, kwargs)
+    try:
+        return adapter.call(func, args, kwargs)
+    except TypeError:
+        adapter.raise_bind_error(args, kwargs)
+        raise
 
 
 __all__ = [
+    "CodeCache",
     "CodeRunner",
+    "code_cache",
     "eval_code",
     "eval_code_async",
     "find_imports",
     "should_quiet",
     "run_js",
+    "run_js_function",
     "relaxed_wrap",
     "relaxed_call",
 ]
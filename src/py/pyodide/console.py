@@ -1,9 +1,12 @@
 import ast
 import asyncio
+import re
 import rlcompleter
 import sys
 import traceback
+import weakref
 from asyncio import Future, ensure_future
+from bisect import bisect_left
 from codeop import (  # type: ignore[attr-defined]
     CommandCompiler,
     Compile,
@@ -21,6 +24,7 @@ from contextlib import (
 )
 from io import TextIOBase
 from platform import python_build, python_version
+from textwrap import dedent
 from tokenize import TokenError
 from types import TracebackType
 from typing import Any, Literal
@@ -198,6 +202,39 @@ class _Compile(Compile):
                 self.flags |= feature.compiler_flag
         return code_runner
 
+    def parse(self, source: str, filename: str, symbol: str, flags: int = 0x0) -> None:
+        """Parse ``source`` without transforming or compiling it. Raises the
+        same ``SyntaxError`` as ``__call__`` if the source is incomplete."""
+        flags |= self.flags | ast.PyCF_ONLY_AST
+        compile(dedent(source), filename, symbol, flags)
+
+
+class _CheckingCompile(_Compile):
+    """A :py:class:`_Compile` that only parses the source while checking
+    whether it is complete.
+
+    ``CommandCompiler`` first calls its compiler to check whether the source is
+    complete and only compiles it, with ``incomplete_input=False``, once it is.
+    The checks only need the parser, so lines that are pushed while a block is
+    incomplete are never compiled.
+    """
+
+    def __call__(  # type: ignore[override]
+        self,
+        source: str,
+        filename: str,
+        symbol: str,
+        *,
+        incomplete_input: bool = True,
+        flags: int = 0x0,
+    ) -> CodeRunner | None:
+        if incomplete_input:
+            self.parse(source, filename, symbol, flags)
+            return None
+        return super().__call__(
+            source, filename, symbol, incomplete_input=False, flags=flags
+        )
+
 
 class _CommandCompiler(CommandCompiler):
     """Compile code with CodeRunner, and remember future imports, return None if
@@ -221,7 +258,7 @@ class _CommandCompiler(CommandCompiler):
         dont_inherit: bool = False,
         optimize: int = -1,
     ) -> None:
-        self.compiler = _Compile(
+        self.compiler: _Compile = _CheckingCompile(
             return_mode=return_mode,
             quiet_trailing_semicolon=quiet_trailing_semicolon,
             flags=flags,
@@ -391,6 +428,15 @@ class Console:
         if persistent_stream_redirection:
             self.persistent_redirect_streams()
         self._completer = rlcompleter.Completer(self.globals)
+        # Map from expressions to a weak reference to the object they resolved
+        # to and the completions of its attributes by prefix. They are valid
+        # for one _attr_completions_version.
+        self._attr_completions: dict[
+            str, tuple[weakref.ref[Any], dict[str, list[str]]]
+        ] = {}
+        self._attr_completions_version: tuple[int, int] = (0, 0)
+        # Bumped before and after running code, which may change any object.
+        self._code_version = 0
         # all nonalphanums except '.'
         # see https://github.com/python/cpython/blob/a4258e8cd776ba655cc54ba54eaeffeddb0a267c/Modules/readline.c#L1211
         self.completer_word_break_characters = (
@@ -490,7 +536,11 @@ class Console:
 
     async def _runcode_with_lock(self, source: str, code: CodeRunner) -> Any:
         async with self._lock:
-            return await self.runcode(source, code)
+            self._code_version += 1
+            try:
+                return await self.runcode(source, code)
+            finally:
+                self._code_version += 1
 
     async def runcode(self, source: str, code: CodeRunner) -> Any:
         """Execute a code object and return the result."""
@@ -590,11 +640,62 @@ class Console:
         start = max(map(source.rfind, self.completer_word_break_characters)) + 1
         source = source[start:]
         if "." in source:
-            completions = self._completer.attr_matches(source)
+            completions = self._attr_matches(source)
         else:
             completions = self._completer.global_matches(source)
         return completions, start
 
+    def _attr_matches(self, text: str) -> list[str]:
+        """Cached version of :py:meth:`rlcompleter.Completer.attr_matches`.
+
+        Completing the attributes of a large module or object walks all of its
+        attributes, which is slow to do on every key press. The results are
+        kept as long as the expression resolves to the same object, until code
+        is run in the console or a module is imported. Changes made to the
+        object from elsewhere in the meantime aren't noticed.
+        """
+        expr, _, attr = text.rpartition(".")
+        # Only evaluate what rlcompleter would evaluate.
+        if not re.fullmatch(r"\w+(\.\w+)*", expr) or not re.fullmatch(r"\w*", attr):
+            return self._completer.attr_matches(text)
+        try:
+            obj = eval(expr, self.globals)
+            ref = weakref.ref(obj)
+        except Exception:
+            return self._completer.attr_matches(text)
+        version = (self._code_version, len(sys.modules))
+        if version != self._attr_completions_version:
+            self._attr_completions.clear()
+            self._attr_completions_version = version
+        entry = self._attr_completions.get(expr)
+        if entry is None or entry[0]() is not obj:
+            if len(self._attr_completions) > 64:
+                self._attr_completions.clear()
+            entry = (ref, {})
+            self._attr_completions[expr] = entry
+        cache = entry[1]
+        if (matches := cache.get(attr)) is not None:
+            return list(matches)
+
+        # The matches for a longer attribute prefix are a subset of the matches
+        # for a shorter one. This doesn't hold for "" and "_", for which
+        # rlcompleter hides private names.
+        for end in range(len(attr) - 1, 0, -1):
+            prefix = attr[:end]
+            if prefix == "_" or (shorter := cache.get(prefix)) is None:
+                continue
+            idx = bisect_left(shorter, text)
+            matches = []
+            for match in shorter[idx:]:
+                if not match.startswith(text):
+                    break
+                matches.append(match)
+            break
+        else:
+            matches = self._completer.attr_matches(text)
+        cache[attr] = matches
+        return list(matches)
+
 
 class PyodideConsole(Console):
     # TODO: Figure out proper SKIPIF syntax for Firefox and Safari
@@ -0,0 +1,93 @@
+"""
+A sampling profiler for Python code running in Pyodide.
+
+While the profiler is running, the interpreter records the Python stack every
+``interval`` milliseconds. This has much lower overhead than :py:mod:`cProfile`
+and, unlike the browser devtools, shows Python functions rather than WebAssembly
+functions.
+
+.. code-block:: python
+
+    import json
+    from pyodide import profile
+
+    profile.start()
+    run_my_code()
+    result = profile.stop()
+    with open("/profile.speedscope.json", "w") as f:
+        json.dump(result.to_speedscope(), f)
+
+The samples are taken by the same mechanism that handles keyboard interrupts
+(see :ref:`interrupting_execution`), so only code that runs Python bytecode or
+calls :c:func:`PyErr_CheckSignals` can be sampled. Time spent in a long running
+call into C or JavaScript is attributed to the Python frame that made it. The
+profiler uses the :py:data:`~signal.SIGPROF` signal and replaces any handler for
+it while it runs.
+"""
+
+import signal
+from types import FrameType
+from typing import Any
+
+from _pyodide._profile import Profile, Sampler
+
+from .ffi import IN_PYODIDE
+
+if IN_PYODIDE:
+    from pyodide_js._api import startSampling, stopSampling
+
+__all__ = ["Profile", "is_running", "start", "stop"]
+
+_sampler: Sampler | None = None
+_previous_handler: Any = None
+
+
+def _handle_sample(signum: int, frame: FrameType | None) -> None:
+    if _sampler is not None:
+        _sampler.sample(frame)
+
+
+def is_running() -> bool:
+    """Whether the profiler is currently running."""
+    return _sampler is not None
+
+
+def start(interval: float = 10) -> None:
+    """Start the sampling profiler.
+
+    Parameters
+    ----------
+    interval :
+        The time between samples in milliseconds. The interpreter only looks
+        for a pending sample every so often (see the ``checkInterval`` option
+        of :js:func:`pyodide.setInterruptBuffer`), so very short intervals are
+        not accurate.
+    """
+    global _sampler, _previous_handler  # noqa: PLW0603
+    if _sampler is not None:
+        raise RuntimeError("The profiler is already running")
+    if interval <= 0:
+        raise ValueError(f"interval should be positive, got {interval}")
+    _previous_handler = signal.signal(signal.SIGPROF, _handle_sample)
+    _sampler = Sampler()
+    if IN_PYODIDE:
+        startSampling(interval, signal.SIGPROF)
+
+
+def stop() -> Profile:
+    """Stop the sampling profiler.
+
+    Returns
+    -------
+        The samples recorded since :py:func:`start` was called.
+    """
+    global _sampler, _previous_handler  # noqa: PLW0603
+    if _sampler is None:
+        raise RuntimeError("The profiler is not running")
+    if IN_PYODIDE:
+        stopSampling()
+    signal.signal(signal.SIGPROF, _previous_handler)
+    result = _sampler.profile()
+    _sampler = None
+    _previous_handler = None
+    return result
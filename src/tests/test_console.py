@@ -124,6 +124,77 @@ def test_completion_with_word_break():
     assert "os" in completions
 
 
+def test_completion_cache():
+    import rlcompleter
+    import types
+
+    module = types.ModuleType("module")
+    module.alpha = 1  # type: ignore[attr-defined]
+    module.alphabet = lambda x: x  # type: ignore[attr-defined]
+    module._alpine = 2  # type: ignore[attr-defined]
+    shell = Console({"module": module})
+    reference = rlcompleter.Completer(shell.globals)
+    for text in ["module.", "module._", "module.a", "module.al", "module.alpha"]:
+        assert shell.complete(text)[0] == reference.attr_matches(text)
+    assert shell.complete("module.alp") == (["module.alpha", "module.alphabet("], 0)
+
+    # Results are cached for the object the expression resolves to
+    calls = []
+    attr_matches = shell._completer.attr_matches
+
+    def counting_attr_matches(text):
+        calls.append(text)
+        return attr_matches(text)
+
+    shell._completer.attr_matches = counting_attr_matches  # type: ignore[method-assign]
+    assert shell.complete("module.alp")[0] == ["module.alpha", "module.alphabet("]
+    assert shell.complete("module.alph")[0] == ["module.alpha", "module.alphabet("]
+    assert calls == []
+
+    # A different object bound to the same name gets fresh results
+    shell.globals["module"] = types.SimpleNamespace(alpaca=3)
+    assert shell.complete("module.alp")[0] == ["module.alpaca"]
+
+    # and so does an object changed by code run in the console
+    shell.globals["module"] = module
+    assert shell.complete("module.alp")[0] == ["module.alpha", "module.alphabet("]
+
+    async def run(line):
+        return await shell.push(line)
+
+    asyncio.run(run("del module.alpha; module.alpaca = 3"))
+    assert shell.complete("module.alp")[0] == ["module.alpaca", "module.alphabet("]
+    asyncio.run(run("module.alpaca = len"))
+    assert shell.complete("module.alp")[0] == ["module.alpaca(", "module.alphabet("]
+
+    # or by importing a module
+    shell.globals["module"] = types.ModuleType("module")
+    assert shell.complete("module.x")[0] == []
+    shell.globals["module"].xyz = 1
+    sys.modules["_test_completion_cache"] = module
+    try:
+        assert shell.complete("module.x")[0] == ["module.xyz"]
+    finally:
+        del sys.modules["_test_completion_cache"]
+
+
+def test_command_compiler_incomplete_not_compiled(monkeypatch):
+    c = _CommandCompiler()
+    compiled = []
+    orig_call = _Compile.__call__
+
+    def call(self, source, *args, **kwargs):
+        compiled.append(source)
+        return orig_call(self, source, *args, **kwargs)
+
+    monkeypatch.setattr(_Compile, "__call__", call)
+    lines = ["def f():", "    x = 1", "    return x", ""]
+    for end in range(1, len(lines)):
+        assert c("\n".join(lines[:end])) is None
+    assert isinstance(c("\n".join(lines)), CodeRunner)
+    assert compiled == ["\n".join(lines)]
+
+
 def test_interactive_console():
     shell = Console()
 
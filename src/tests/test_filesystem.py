@@ -6,7 +6,7 @@ for a basic nodejs-based test, see src/js/test/filesystem.test.js
 import pytest
 from pytest_pyodide import run_in_pyodide
 
-from conftest import only_chrome, only_node
+from conftest import only_chrome, only_node, requires_jspi
 
 
 @pytest.mark.skip_refcount_check
@@ -257,6 +257,209 @@ def test_nativefs_dir(request, selenium_standalone_refresh):
     )
 
 
+@pytest.mark.requires_dynamic_linking
+@only_chrome
+def test_nativefs_incremental_sync(request, selenium_standalone_refresh):
+    if request.config.option.runner == "playwright":
+        pytest.xfail("Playwright doesn't support file system access APIs")
+
+    selenium = selenium_standalone_refresh
+
+    selenium.run_js(
+        """
+        const root = await navigator.storage.getDirectory();
+        await root.removeEntry("incremental", { recursive: true }).catch(() => {});
+        self.dirHandle = await root.getDirectoryHandle("incremental", { create: true });
+        const untouched = await dirHandle.getFileHandle("untouched", { create: true });
+        let writable = await untouched.createWritable();
+        await writable.write("remote");
+        await writable.close();
+        self.fs = await pyodide.mountNativeFS("/mnt/incremental", dirHandle);
+
+        self.readRemote = async function (...path) {
+            let handle = dirHandle;
+            for (const name of path.slice(0, -1)) {
+                handle = await handle.getDirectoryHandle(name);
+            }
+            const file = await (await handle.getFileHandle(path.at(-1))).getFile();
+            return await file.text();
+        };
+        self.listRemote = async function (handle = dirHandle, prefix = "") {
+            const result = [];
+            for await (const [name, entry] of handle.entries()) {
+                result.push(prefix + name);
+                if (entry.kind === "directory") {
+                    result.push(...(await listRemote(entry, prefix + name + "/")));
+                }
+            }
+            return result.sort();
+        };
+
+        // Change the remote file behind Pyodide's back. It isn't dirty
+        // locally, so syncing must not overwrite it.
+        writable = await untouched.createWritable();
+        await writable.write("changed remotely");
+        await writable.close();
+        """
+    )
+
+    selenium.run(
+        """
+        import os
+        from pathlib import Path
+        root = Path("/mnt/incremental")
+        (root / "a/b").mkdir(parents=True)
+        (root / "a/b/c.txt").write_text("c")
+        (root / "a/d.txt").write_text("d")
+        (root / "e.txt").write_text("e")
+        """
+    )
+    result = selenium.run_js(
+        """
+        await fs.syncfs();
+        return [await listRemote(), await readRemote("a", "b", "c.txt"), await readRemote("untouched")];
+        """
+    )
+    assert result == [
+        ["a", "a/b", "a/b/c.txt", "a/d.txt", "e.txt", "untouched"],
+        "c",
+        "changed remotely",
+    ]
+
+    selenium.run(
+        """
+        with open(root / "e.txt", "a") as f:
+            f.write("e")
+        os.rename(root / "a", root / "renamed")
+        os.remove(root / "renamed/d.txt")
+        """
+    )
+    result = selenium.run_js(
+        """
+        await fs.syncfs();
+        return [await listRemote(), await readRemote("e.txt"), await readRemote("renamed", "b", "c.txt")];
+        """
+    )
+    assert result == [
+        ["e.txt", "renamed", "renamed/b", "renamed/b/c.txt", "untouched"],
+        "ee",
+        "c",
+    ]
+
+    selenium.run_js(
+        """
+        pyodide.FS.unmount("/mnt/incremental");
+        """
+    )
+
+
+@pytest.mark.requires_dynamic_linking
+@only_chrome
+@requires_jspi
+def test_nativefs_lazy(request, selenium_standalone_refresh):
+    if request.config.option.runner == "playwright":
+        pytest.xfail("Playwright doesn't support file system access APIs")
+
+    selenium = selenium_standalone_refresh
+
+    result = selenium.run_js(
+        """
+        const root = await navigator.storage.getDirectory();
+        await root.removeEntry("lazy", { recursive: true }).catch(() => {});
+        self.dirHandle = await root.getDirectoryHandle("lazy", { create: true });
+        for (const name of ["a", "b", "c"]) {
+            const handle = await dirHandle.getFileHandle(name, { create: true });
+            const writable = await handle.createWritable();
+            await writable.write(name.repeat(100));
+            await writable.close();
+        }
+        self.fs = await pyodide.mountNativeFS("/mnt/lazy", dirHandle, {
+            lazy: true,
+            cacheSize: 250,
+        });
+        const loaded = () =>
+            ["a", "b", "c"].map(
+                (name) => pyodide.FS.lookupPath("/mnt/lazy/" + name).node.contents !== null
+            );
+
+        const result = [loaded()];
+        pyodide.runPython(`
+            import errno
+            import os
+            from pathlib import Path
+            root = Path("/mnt/lazy")
+            sizes = [os.path.getsize(root / name) for name in "abc"]
+        `);
+        result.push(pyodide.globals.get("sizes").toJs());
+        await pyodide.runPythonAsync(`
+            contents = [(root / name).read_text() for name in "abc"]
+        `);
+        result.push(pyodide.globals.get("contents").toJs(), loaded());
+        // "a" was evicted and can't be fetched again without stack switching.
+        result.push(pyodide.runPython(`
+            try:
+                (root / "a").read_text()
+            except OSError as e:
+                result = e.errno == errno.EIO
+            result
+        `));
+        // Truncating doesn't need the old contents.
+        pyodide.runPython(`(root / "a").write_text("new")`);
+        await fs.syncfs();
+        const file = await (await dirHandle.getFileHandle("a")).getFile();
+        result.push(await file.text());
+        pyodide.FS.unmount("/mnt/lazy");
+        return result;
+        """
+    )
+    assert result == [
+        [False, False, False],
+        [100, 100, 100],
+        ["a" * 100, "b" * 100, "c" * 100],
+        [False, True, True],
+        True,
+        "new",
+    ]
+
+
+@pytest.mark.requires_dynamic_linking
+@only_chrome
+@requires_jspi
+def test_nativefs_lazy_rename(request, selenium_standalone_refresh):
+    if request.config.option.runner == "playwright":
+        pytest.xfail("Playwright doesn't support file system access APIs")
+
+    selenium = selenium_standalone_refresh
+
+    result = selenium.run_js(
+        """
+        const root = await navigator.storage.getDirectory();
+        await root.removeEntry("lazy-rename", { recursive: true }).catch(() => {});
+        const dirHandle = await root.getDirectoryHandle("lazy-rename", { create: true });
+        const handle = await dirHandle.getFileHandle("a", { create: true });
+        const writable = await handle.createWritable();
+        await writable.write("a".repeat(100));
+        await writable.close();
+        const fs = await pyodide.mountNativeFS("/mnt/lazy-rename", dirHandle, {
+            lazy: true,
+        });
+        // Rename the file before it was ever loaded. The sync removes the
+        // remote file it would have been loaded from.
+        pyodide.FS.mkdir("/mnt/lazy-rename/dir");
+        pyodide.FS.rename("/mnt/lazy-rename/a", "/mnt/lazy-rename/dir/b");
+        await fs.syncfs();
+        await pyodide.runPythonAsync(`
+            from pathlib import Path
+            contents = Path("/mnt/lazy-rename/dir/b").read_text()
+        `);
+        const result = pyodide.globals.get("contents");
+        pyodide.FS.unmount("/mnt/lazy-rename");
+        return result;
+        """
+    )
+    assert result == "a" * 100
+
+
 @only_chrome
 def test_nativefs_errors(selenium):
     selenium.run_js(
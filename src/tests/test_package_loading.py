@@ -196,6 +196,22 @@ def test_load_packages_sequential(selenium_standalone_refresh, packages):
         )
 
 
+@pytest.mark.skip_refcount_check
+def test_prefetch_packages_from_imports(selenium_standalone_refresh):
+    selenium = selenium_standalone_refresh
+    selenium.run_js(
+        """
+        await pyodide.prefetchPackagesFromImports("import pytest");
+        assert(() => !("pytest" in pyodide.loadedPackages));
+        assert(() => !("pluggy" in pyodide.loadedPackages));
+        await pyodide.loadPackagesFromImports("import pytest");
+        assert(() => "pytest" in pyodide.loadedPackages);
+        assert(() => "pluggy" in pyodide.loadedPackages);
+        """
+    )
+    selenium.run("import pytest")
+
+
 @pytest.mark.skip_refcount_check
 def test_load_handle_failure(selenium_standalone_refresh):
     selenium = selenium_standalone_refresh
@@ -0,0 +1,163 @@
+import json
+import sys
+
+from pytest_pyodide import run_in_pyodide
+
+from _pyodide._profile import Profile, Sampler
+
+
+def test_sampler():
+    sampler = Sampler()
+
+    def inner():
+        sampler.sample(sys._getframe())
+
+    def outer():
+        inner()
+        inner()
+
+    outer()
+    sampler.sample(sys._getframe())
+    profile = sampler.profile()
+
+    assert len(profile.samples) == 3
+    assert profile.samples[0] == profile.samples[1]
+    [*_, test, outer_frame, inner_frame] = [
+        profile.frames[idx] for idx in profile.samples[0]
+    ]
+    assert test[0] == "test_sampler"
+    assert outer_frame[0] == "test_sampler.<locals>.outer"
+    assert inner_frame[0] == "test_sampler.<locals>.inner"
+    assert inner_frame[1] == __file__
+    assert profile.samples[2] == profile.samples[0][:-2]
+    assert profile.timestamps == sorted(profile.timestamps)
+    assert profile.duration >= profile.timestamps[-1]
+
+
+def test_profile_export():
+    frames = [("main", "a.py", 1), ("f", "a.py", 5), ("g", "b.py", 10)]
+    profile = Profile(
+        frames,
+        samples=[(0, 1), (0, 1), (0, 1, 2), (0, 2)],
+        timestamps=[0.0, 1.0, 2.0, 4.0],
+        duration=5.0,
+    )
+
+    assert profile.aggregate() == {
+        (frames[0], frames[1]): 2.0,
+        (frames[0], frames[1], frames[2]): 2.0,
+        (frames[0], frames[2]): 1.0,
+    }
+
+    speedscope = profile.to_speedscope()
+    json.dumps(speedscope)
+    assert speedscope["shared"]["frames"][2] == {
+        "name": "g",
+        "file": "b.py",
+        "line": 10,
+    }
+    [sampled] = speedscope["profiles"]
+    assert sampled["type"] == "sampled"
+    assert sampled["samples"] == [[0, 1], [0, 1], [0, 1, 2], [0, 2]]
+    assert sampled["weights"] == [1.0, 1.0, 2.0, 1.0]
+    assert sampled["endValue"] == 5.0
+
+    trace = profile.to_chrome_trace()
+    json.dumps(trace)
+    events = sorted(
+        (e["name"], e["ts"], e["dur"]) for e in trace["traceEvents"] if e["ph"] == "X"
+    )
+    assert events == [
+        ("f", 0.0, 4000.0),
+        ("g", 2000.0, 2000.0),
+        ("g", 4000.0, 1000.0),
+        ("main", 0.0, 5000.0),
+    ]
+
+
+@run_in_pyodide
+def test_profile_python(selenium):
+    import pytest
+
+    from pyodide import profile
+
+    def busy():
+        x = 0
+        for i in range(200_000):
+            x += i
+        return x
+
+    def work():
+        for _ in range(20):
+            busy()
+
+    assert not profile.is_running()
+    profile.start(interval=1)
+    assert profile.is_running()
+    with pytest.raises(RuntimeError, match="already running"):
+        profile.start()
+    work()
+    result = profile.stop()
+    assert not profile.is_running()
+    with pytest.raises(RuntimeError, match="not running"):
+        profile.stop()
+
+    assert result.samples
+    stacks = result.aggregate()
+    in_busy = sum(
+        weight for stack, weight in stacks.items() if stack[-1][0].endswith("busy")
+    )
+    assert in_busy > 0.5 * sum(stacks.values())
+
+
+def test_profile_js(selenium):
+    result = selenium.run_js(
+        """
+        pyodide.profile.start({ interval: 1 });
+        pyodide.runPython(`
+            def busy():
+                x = 0
+                for i in range(500_000):
+                    x += i
+            busy()
+        `);
+        const result = pyodide.profile.stop();
+        const names = result.toSpeedscope().shared.frames.map((f) => f.name);
+        return [
+            pyodide.profile.isRunning(),
+            result.sampleCount,
+            names,
+            result.toChromeTrace().traceEvents.length,
+        ];
+        """
+    )
+    [running, sample_count, names, num_events] = result
+    assert not running
+    assert sample_count > 0
+    assert "busy" in names
+    assert num_events > 0
+
+
+def test_profile_keyboard_interrupt(selenium):
+    x = selenium.run_js(
+        """
+        let x = new Int8Array(1);
+        pyodide.setInterruptBuffer(x);
+        self.triggerKeyboardInterrupt = function(){
+            x[0] = 2;
+        }
+        pyodide.profile.start({ interval: 1 });
+        try {
+            pyodide.runPython(`
+                from js import triggerKeyboardInterrupt
+                for x in range(100000):
+                    if x == 2000:
+                        triggerKeyboardInterrupt()
+            `);
+        } catch(e){}
+        pyodide.profile.stop();
+        pyodide.setInterruptBuffer(undefined);
+        return pyodide.globals.get('x');
+        """
+    )
+    assert 2000 < x < 2500
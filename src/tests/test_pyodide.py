@@ -10,7 +10,7 @@ from typing import Any
 import pytest
 from pytest_pyodide import run_in_pyodide
 
-from conftest import DIST_PATH, PYODIDE_ROOT, strip_assertions_stderr
+from conftest import DIST_PATH, PYODIDE_ROOT, requires_jspi, strip_assertions_stderr
 from pyodide.code import CodeRunner, eval_code, find_imports, should_quiet  # noqa: E402
 
 
@@ -36,6 +36,21 @@ def test_find_imports():
     )
     assert res == []
 
+    # Imports nested in statements are found, and results are cached
+    source = """
+        def f():
+            try:
+                import a.b
+            except ImportError:
+                from c import d
+        """
+    assert find_imports(source) == ["a", "a.b", "c"]
+    res = find_imports(source)
+    assert res == ["a", "a.b", "c"]
+    res.append("e")
+    assert find_imports(source) == ["a", "a.b", "c"]
+    assert find_imports("x = 1") == []
+
 
 def test_ffi_import_star():
     exec("from pyodide.ffi import *", {})
@@ -202,6 +217,47 @@ def test_eval_code():
     assert eval_code("2**1;\n\n", ns, quiet_trailing_semicolon=False) == 2
 
 
+def test_eval_code_cache(tmp_path):
+    from pyodide.code import CodeCache, code_cache
+
+    old_maxsize = code_cache.maxsize
+    code_cache.cache_clear()
+    try:
+        ns: dict[str, Any] = {}
+        assert eval_code("x = 1; x + 1", ns) == 2
+        assert eval_code("x = 1; x + 1", ns) == 2
+        assert code_cache.cache_info() == (1, 1, old_maxsize, 1)
+
+        # Arguments that change the compiled code are part of the key
+        assert eval_code("x = 1; x + 1;", ns) is None
+        assert eval_code("x = 1; x + 1;", ns, quiet_trailing_semicolon=False) == 2
+        assert eval_code("x = 1; x + 1", ns, return_mode="none") is None
+        assert code_cache.cache_info().currsize == 4
+
+        with pytest.raises(NameError, match="y"):
+            eval_code("y", ns, filename="cached.py")
+        with pytest.raises(NameError, match="y"):
+            eval_code("y", ns, filename="cached.py")
+
+        code_cache.maxsize = 2
+        assert code_cache.cache_info().currsize == 2
+
+        path = tmp_path / "code_cache"
+        assert code_cache.save(path) == 2
+        cache = CodeCache()
+        assert cache.load(path) == 2
+        assert cache.cache_info() == (0, 0, 256, 2)
+        path.write_bytes(b"not a code cache")
+        assert cache.load(path) == 0
+
+        code_cache.maxsize = 0
+        assert eval_code("x + 1", ns) == 2
+        assert code_cache.cache_info().currsize == 0
+    finally:
+        code_cache.maxsize = old_maxsize
+        code_cache.cache_clear()
+
+
 def test_eval_code_locals():
     globals: dict[str, Any] = {}
     eval_code("x=2", globals, {})
@@ -292,6 +348,59 @@ def test_relaxed_call():
 
     assert relaxed_call(f5, 1, 2, 3, 4, b=7, c=9) == [1, (2, 3, 4), 7, {"c": 9}]
 
+    # A TypeError raised by the function itself is not replaced
+    def f6(a):
+        raise TypeError("from f6")
+
+    with pytest.raises(TypeError, match="from f6"):
+        relaxed_call(f6, 1, 2)
+
+
+def test_relaxed_call_cache():
+    import gc
+
+    from pyodide.code import _relaxed_adapter_cache, relaxed_call
+
+    def f(a):
+        return a
+
+    assert relaxed_call(f, 1, 2) == 1
+    assert f in _relaxed_adapter_cache
+    del f
+    gc.collect()
+    assert not any(
+        getattr(func, "__name__", None) == "f" for func in _relaxed_adapter_cache
+    )
+
+    # Callables that can't be cached still work
+    class Unhashable:
+        __hash__ = None  # type: ignore[assignment]
+
+        def __call__(self, a):
+            return a
+
+    assert relaxed_call(Unhashable(), 1, 2) == 1
+
+
+def test_relaxed_call_cache_bound_method():
+    from pyodide.code import _relaxed_method_adapter_cache, relaxed_call
+
+    class A:
+        def __init__(self, x):
+            self.x = x
+
+        def f(self, a):
+            return self.x + a
+
+    a1 = A(1)
+    a2 = A(10)
+    assert relaxed_call(a1.f, 1, 2) == 2
+    assert A.f in _relaxed_method_adapter_cache
+    adapter = _relaxed_method_adapter_cache[A.f]
+    # Methods bound to other instances share the adapter
+    assert relaxed_call(a2.f, 1, extra=2) == 11
+    assert _relaxed_method_adapter_cache[A.f] is adapter
+
 
 def test_relaxed_wrap():
     from pyodide.code import relaxed_wrap
@@ -533,6 +642,37 @@ def test_keyboard_interrupt(selenium):
     assert 2000 < x < 2500
 
 
+def test_keyboard_interrupt_check_interval(selenium):
+    x = selenium.run_js(
+        """
+        let x = new Int8Array(1);
+        pyodide.setInterruptBuffer(x, { checkInterval: 5000 });
+        self.triggerKeyboardInterrupt = function(){
+            x[0] = 2;
+        }
+        try {
+            pyodide.runPython(`
+                from js import triggerKeyboardInterrupt
+                for x in range(100000):
+                    if x == 2000:
+                        triggerKeyboardInterrupt()
+            `);
+        } catch(e){}
+        pyodide.setInterruptBuffer(undefined);
+        return pyodide.globals.get('x');
+        """
+    )
+    # The interrupt is noticed later than with the default interval, but it
+    # is still noticed.
+    assert 2000 < x < 100000 - 1
+
+    msg = "checkInterval should be a positive integer"
+    with pytest.raises(selenium.JavascriptException, match=msg):
+        selenium.run_js(
+            "pyodide.setInterruptBuffer(new Int8Array(1), { checkInterval: 0 });"
+        )
+
+
 def test_run_python_async_toplevel_await(selenium):
     selenium.run_js(
         """
@@ -1440,6 +1580,38 @@ def test_run_js(selenium):
 
     assert x == 77
 
+    assert run_js("(a, b) => a + b", 1, 2) == 3
+    assert run_js("(a, b) => a + b", "x", "y") == "xy"
+    # The argument is passed as a value and not spliced into the code
+    assert run_js("(s) => s.length", "'); throw 1; ('") == 15
+    with raises(TypeError, msg="should evaluate to a JavaScript function"):
+        run_js("1 + 1", 2)
+
+
+@run_in_pyodide
+def test_run_js_function_cache(selenium):
+    from unittest import TestCase
+
+    from pyodide.code import run_js, run_js_function
+
+    raises = TestCase().assertRaises
+
+    for i in range(3):
+        assert run_js("(x) => x * 2", i) == 2 * i
+
+    f = run_js_function("() => 5")
+    assert f() == 5
+    g = run_js_function("() => 5")
+    # The function is compiled once but each caller gets its own proxy
+    assert g is not f
+    assert g.js_id == f.js_id
+    f.destroy()
+    assert g() == 5
+    assert run_js("() => 5", None) == 5
+
+    with raises(TypeError, msg="argument should have type 'string' not type 'list'"):
+        run_js([1], 2)  # type: ignore[arg-type]
+
 
 @run_in_pyodide
 def test_pickle_jsexception(selenium):
@@ -1673,6 +1845,46 @@ def test_args_OO(selenium_standalone_noload):
     assert not doc
 
 
+def test_profile_startup(selenium_standalone_noload):
+    selenium = selenium_standalone_noload
+    result = selenium.run_js(
+        """
+        let pyodide = await loadPyodide({ profileStartup: true });
+        const profile = pyodide.startupProfile;
+        const trace = profile.toChromeTrace();
+        return {
+            total: profile.total,
+            names: profile.events.map((e) => e.name),
+            categories: Array.from(new Set(profile.events.map((e) => e.category))),
+            sorted: profile.events.every(
+                (e, i, a) => i === 0 || a[i - 1].start <= e.start
+            ),
+            traceLength: trace.traceEvents.length,
+            eventsLength: profile.events.length,
+        };
+        """
+    )
+    assert result["total"] > 0
+    assert sorted(result["categories"]) == ["import", "preRun", "stage"]
+    for name in ["loadWasmScript", "bootstrapPyodide", "installStdlib", "pyodide"]:
+        assert name in result["names"]
+    # Imports are recorded from before _pyodide_core imports _pyodide
+    for name in ["_pyodide", "_pyodide._base"]:
+        assert name in result["names"]
+    assert result["sorted"]
+    assert result["traceLength"] == result["eventsLength"]
+
+    assert (
+        selenium.run_js(
+            """
+            let pyodide = await loadPyodide();
+            return pyodide.startupProfile === undefined;
+            """
+        )
+        is True
+    )
+
+
 @pytest.mark.xfail_browsers(chrome="Node only", firefox="Node only", safari="Node only")
 def test_relative_index_url(selenium, tmp_path):
     tmp_dir = Path(tmp_path)
@@ -1944,6 +2156,71 @@ def test_custom_python_stdlib_URL(selenium_standalone_noload, runtime):
         stdlib_target_path.unlink()
 
 
+@pytest.mark.skip_refcount_check
+@pytest.mark.skip_pyproxy_check
+@requires_jspi
+def test_stdlib_remainder_import_before_download(selenium_standalone_noload):
+    import io
+    import zipfile
+
+    selenium = selenium_standalone_noload
+    remainder = io.BytesIO()
+    with zipfile.ZipFile(remainder, "w") as zf:
+        # turtle is excluded from the standard library zip
+        zf.writestr("turtle.py", "x = 7\n")
+
+    result = selenium.run_js(
+        """
+        const remainder = new Uint8Array(REMAINDER);
+        let release;
+        const released = new Promise((resolve) => (release = resolve));
+        // Hold back the download of the remainder until we release it.
+        const origFetch = globalThis.fetch;
+        globalThis.fetch = async (url, ...args) => {
+            if (String(url).endsWith("_remainder.zip")) {
+                await released;
+                return new Response(remainder);
+            }
+            return origFetch(url, ...args);
+        };
+        let pyodide;
+        try {
+            pyodide = await loadPyodide({
+                stdLibRemainderURL: "https://example.com/python_stdlib_remainder.zip",
+            });
+        } finally {
+            globalThis.fetch = origFetch;
+        }
+        // runPython can't wait for the download
+        let error;
+        try {
+            pyodide.runPython("import turtle");
+        } catch (e) {
+            error = e.message;
+        }
+        // Modules outside of the standard library don't wait for it
+        let otherError;
+        try {
+            await pyodide.runPythonAsync("import not_a_stdlib_module");
+        } catch (e) {
+            otherError = e.message;
+        }
+        setTimeout(release, 100);
+        const x = await pyodide.runPythonAsync(`
+            import turtle
+            turtle.x
+        `);
+        return [error, otherError, x];
+        """.replace("REMAINDER", str(list(remainder.getvalue())))
+    )
+    [error, other_error, x] = result
+    assert "ModuleNotFoundError" in error
+    assert "still being downloaded" in error
+    assert "No module named 'not_a_stdlib_module'" in other_error
+    assert "still being downloaded" not in other_error
+    assert x == 7
+
+
 def test_pickle_internal_error(selenium):
     @run_in_pyodide
     def helper(selenium):
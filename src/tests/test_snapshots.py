@@ -1,6 +1,8 @@
+import subprocess
+
 import pytest
 
-from conftest import requires_jspi
+from conftest import DIST_PATH, only_node, requires_jspi
 
 
 def test_make_snapshot_requires_arg(selenium):
@@ -310,3 +312,46 @@ def test_snapshot_pyfetch(selenium_standalone_noload):
         const py2 = await loadPyodide({_loadSnapshot: snapshot});
         """
     )
+
+
+@only_node
+def test_snapshot_pool(selenium_standalone_noload, tmp_path):
+    (tmp_path / "pool.mjs").write_text(
+        f"""
+        import assert from "node:assert";
+        import {{ loadPyodide, createSnapshotPool }} from "{DIST_PATH}/pyodide.mjs";
+
+        const py = await loadPyodide({{ _makeSnapshot: true }});
+        py.runPython("x = 7");
+        const pool = await createSnapshotPool(py.makeMemorySnapshot(), 2);
+        assert.strictEqual(pool.available, 2);
+
+        const a = await pool.acquire();
+        const b = await pool.acquire();
+        assert.notStrictEqual(a, b);
+        a.runPython("x += 1");
+        assert.strictEqual(a.globals.get("x"), 8);
+        assert.strictEqual(b.globals.get("x"), 7);
+        assert.strictEqual(pool.available, 2);
+
+        a.runPython("import asyncio; task = asyncio.ensure_future(asyncio.sleep(100))");
+        const task = a.globals.get("task");
+        pool.release(a);
+        assert.throws(() => pool.release(a), /not acquired from this pool/);
+        assert.strictEqual(pool.available, 2);
+        await new Promise((resolve) => setTimeout(resolve, 10));
+        assert.ok(task.cancelled());
+        task.destroy();
+        const c = await pool.acquire();
+        assert.strictEqual(c.globals.get("x"), 7);
+        console.log("pool ok");
+        """
+    )
+    result = subprocess.run(
+        ["node", "pool.mjs"],
+        capture_output=True,
+        encoding="utf8",
+        cwd=tmp_path,
+        check=False,
+    )
+    assert "pool ok" in result.stdout, result.stderr
@@ -452,6 +452,70 @@ def test_custom_stdio_write(selenium):
     ]
 
 
+def test_custom_stdout_buffered(selenium):
+    result = selenium.run_js(
+        r"""
+        const chunks = [];
+        pyodide.setStdout({ buffered: (s) => chunks.push(s), bufferSize: 64 });
+        pyodide.runPython(`
+            for i in range(5):
+                print(i)
+        `);
+        const beforeTick = chunks.slice();
+        await new Promise((resolve) => setTimeout(resolve, 10));
+        const afterTick = chunks.slice();
+        pyodide.runPython(`
+            import sys
+            print("x" * 100)
+            print("partial", end="")
+            sys.stdout.flush()
+        `);
+        const afterFlush = chunks.slice();
+        pyodide.runPython(`print("flush=True", flush=True)`);
+        const afterPrintFlush = chunks.slice();
+        // Replacing the handler flushes it synchronously, without waiting for
+        // the scheduled flush.
+        pyodide.runPython(`print("on replace")`);
+        pyodide.setStdout();
+        return [beforeTick, afterTick, afterFlush, afterPrintFlush, chunks];
+        """
+    )
+    [before_tick, after_tick, after_flush, after_print_flush, on_replace] = result
+    assert before_tick == []
+    assert after_tick == ["0\n1\n2\n3\n4\n"]
+    assert after_flush == [*after_tick, "x" * 100, "\npartial"]
+    assert after_print_flush == [*after_flush, "flush=True\n"]
+    assert on_replace == [*after_print_flush, "on replace\n"]
+    assert selenium.run_js(
+        "return pyodide.runPython('import sys; sys.stdout is sys.__stdout__')"
+    )
+
+    msg = "At most one of 'raw', 'batched', 'buffered', and 'write' must be passed"
+    with pytest.raises(selenium.JavascriptException, match=msg):
+        selenium.run_js(
+            "pyodide.setStdout({ batched: console.log, buffered: console.log });"
+        )
+
+
+def test_custom_stdout_batched_flush(selenium):
+    result = selenium.run_js(
+        r"""
+        const lines = [];
+        pyodide.setStdout({ batched: (s) => lines.push(s) });
+        pyodide.runPython(`
+            import sys
+            print("Loading...", end="", flush=True)
+            print(" done")
+            flushes_device = sys.stdout is not sys.__stdout__
+        `);
+        pyodide.setStdout();
+        return [lines, pyodide.globals.get("flushes_device")];
+        """
+    )
+    # Flushing doesn't cut the line of a batched handler
+    assert result == [["Loading... done"], False]
+
+
 @run_in_pyodide
 def test_custom_stdin_read1(selenium):
     from pyodide.code import run_js
@@ -9,11 +9,17 @@
 # A short script to check the size of files when compressed.
 # Usage:
 #   check_compressed_size.py pyodide.asm.mjs pyodide.asm.wasm
+#
+# With --wheels, report for each wheel how much smaller the compressed copies
+# written by compress_wheels.py would be:
+#   check_compressed_size.py --wheels dist/*.whl
 
 import gzip
 import sys
 from pathlib import Path
 
+from compress_wheels import compressors, repack_stored
+
 try:
     import brotli
 except ImportError:
@@ -50,12 +56,40 @@ def check_size(file: str | Path) -> None:
         print(f"    Brotli compressed size: {fmt(len(compress_data_brotli))}")
 
 
+def check_wheel_sizes(files: list[str]) -> None:
+    encodings = list(compressors())
+    header = ["wheel", "size", "stored", *encodings]
+    print("".join(f"{h:>14}" for h in header))
+    totals = dict.fromkeys(header[1:], 0)
+    for file in files:
+        wheel = Path(file)
+        data = wheel.read_bytes()
+        stored = repack_stored(data)
+        sizes = {"size": len(data), "stored": len(stored)}
+        for encoding, compress in compressors().items():
+            sizes[encoding] = len(compress(stored))
+        for key, size in sizes.items():
+            totals[key] += size
+        name = wheel.name.split("-")[0]
+        print(f"{name:>14}" + "".join(f"{size:>14,}" for size in sizes.values()))
+
+    print(f"{'total':>14}" + "".join(f"{size:>14,}" for size in totals.values()))
+    for encoding in encodings:
+        saved = 1 - totals[encoding] / totals["size"]
+        print(f"{encoding}: {saved:.1%} smaller than the wheels")
+
+
 def main():
-    files = sys.argv[1:]
-    if not files:
-        print(f"Usage: {sys.argv[0]} <file> ...")
+    args = sys.argv[1:]
+    if not args or args == ["--wheels"]:
+        print(f"Usage: {sys.argv[0]} [--wheels] <file> ...")
+        return
 
-    for file in files:
+    if args[0] == "--wheels":
+        check_wheel_sizes(args[1:])
+        return
+
+    for file in args:
         check_size(file)
 
 
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+# /// script
+# dependencies = [
+#   "brotli",
+#   "zstandard",
+# ]
+# ///
+
+"""Write compressed copies of the wheels in a lock file.
+
+The members of a wheel are already deflated, so compressing the wheel as a
+whole gains little. Each wheel is first rewritten with its members stored
+uncompressed, which also makes it faster to unpack, and then compressed with
+Brotli and, if ``zstandard`` is installed, Zstandard. The compressed files are
+written next to the wheels and listed in the ``compressed_files`` field of the
+lock file entries, together with their sha256.
+
+``pyodide_lock`` doesn't know about ``compressed_files``, so the lock file with
+the compressed files is written to a separate path, for instance:
+
+    compress_wheels.py dist/pyodide-lock.json -o dist/pyodide-lock-compressed.json
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import sys
+import zipfile
+from collections.abc import Callable
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def repack_stored(wheel: bytes) -> bytes:
+    """Rewrite a wheel with all its members stored uncompressed."""
+    output = io.BytesIO()
+    with (
+        zipfile.ZipFile(io.BytesIO(wheel)) as src,
+        zipfile.ZipFile(output, "w", zipfile.ZIP_STORED) as dst,
+    ):
+        for info in src.infolist():
+            data = src.read(info)
+            info.compress_type = zipfile.ZIP_STORED
+            dst.writestr(info, data)
+    return output.getvalue()
+
+
+def compressors() -> dict[str, Callable[[bytes], bytes]]:
+    """The available compressors, keyed by the encoding used in the lock file."""
+    result = {}
+    if brotli:
+        result["br"] = lambda data: brotli.compress(data, quality=11)
+    if zstandard:
+        result["zstd"] = zstandard.ZstdCompressor(level=19).compress
+    return result
+
+
+def compress_wheel(wheel: Path) -> dict[str, dict[str, str]]:
+    """Write the compressed copies of a wheel and return their lock file entries."""
+    stored = repack_stored(wheel.read_bytes())
+    compressed_files = {}
+    for encoding, compress in compressors().items():
+        path = wheel.with_name(f"{wheel.name}.{encoding}")
+        data = compress(stored)
+        path.write_bytes(data)
+        compressed_files[encoding] = {
+            "file_name": path.name,
+            "sha256": hashlib.sha256(data).hexdigest(),
+        }
+    return compressed_files
+
+
+def compress_wheels(lockfile: Path, output: Path) -> None:
+    lock = json.loads(lockfile.read_text())
+    for package in lock["packages"].values():
+        file_name = package["file_name"]
+        if "://" in file_name or not file_name.endswith(".whl"):
+            continue
+        wheel = lockfile.parent / file_name
+        if not wheel.is_file():
+            print(f"WARNING: {wheel} not found, skipping")
+            continue
+        compressed_files = compress_wheel(wheel)
+        # The files are relative to the lock file like the wheel itself.
+        for entry in compressed_files.values():
+            entry["file_name"] = str(Path(file_name).with_name(entry["file_name"]))
+        package["compressed_files"] = compressed_files
+    output.write_text(json.dumps(lock, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        "Write compressed copies of the wheels in a lock file",
+    )
+    parser.add_argument("lockfile", help="path to pyodide-lock.json")
+    parser.add_argument(
+        "-o",
+        "--output",
+        required=True,
+        help="path to write the lock file listing the compressed files to",
+    )
+    args = parser.parse_args()
+    if not brotli:
+        print("ERROR: Brotli not installed")
+        sys.exit(1)
+    compress_wheels(Path(args.lockfile), Path(args.output))
+
+
+if __name__ == "__main__":
+    main()
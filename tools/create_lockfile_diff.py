@@ -1,8 +1,10 @@
 import argparse
+import re
 import subprocess
 import sys
 import tempfile
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -25,6 +27,16 @@ def parse_args():
         nargs="?",
         help="Path to the new lockfile. If not provided, will use current branch's lockfile.",
     )
+    parser.add_argument(
+        "--sizes",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help=(
+            "Report wheel size, dependency closure size and shared library "
+            "changes. Wheels next to a local lockfile are measured on disk, "
+            "otherwise with HEAD requests."
+        ),
+    )
     return parser.parse_args()
 
 
@@ -35,6 +47,19 @@ class PackageDiff:
     new_version: str | None
 
 
+@dataclass
+class ValueDiff:
+    name: str
+    old_value: int | None
+    new_value: int | None
+
+    @property
+    def delta(self) -> int | None:
+        if self.old_value is None or self.new_value is None:
+            return None
+        return self.new_value - self.old_value
+
+
 def is_normal_python_package(pkg: PackageSpec) -> bool:
     return pkg.package_type == "package" and pkg.file_name.endswith(".whl")
 
@@ -128,7 +153,9 @@ def download_lockfile(url: str, temp_dir: Path) -> Path:
     return filename
 
 
-def get_lockfile_path(path_or_url: str | None, is_old: bool, temp_dir: Path) -> Path:
+def get_lockfile_path(
+    path_or_url: str | None, is_old: bool, temp_dir: Path
+) -> tuple[Path, str]:
     """
     Get the path to a lockfile, downloading it if necessary.
 
@@ -138,7 +165,8 @@ def get_lockfile_path(path_or_url: str | None, is_old: bool, temp_dir: Path) ->
         temp_dir: Temporary directory for downloads.
 
     Returns:
-        Path to the lockfile.
+        Path to the lockfile, and the directory or URL that relative wheel
+        file names in it are relative to.
     """
     if path_or_url is None:
         # Auto-detect based on whether it's old or new
@@ -151,13 +179,83 @@ def get_lockfile_path(path_or_url: str | None, is_old: bool, temp_dir: Path) ->
         else:
             print("Auto-detecting new lockfile from current branch...", file=sys.stderr)
             url = get_lockfile_url_from_makefile(None)
-        return download_lockfile(url, temp_dir / ("old" if is_old else "new"))
+        path = download_lockfile(url, temp_dir / ("old" if is_old else "new"))
+        return path, url.rsplit("/", 1)[0] + "/"
     elif path_or_url.startswith("http://") or path_or_url.startswith("https://"):
         # It's a URL, download it
-        return download_lockfile(path_or_url, temp_dir / ("old" if is_old else "new"))
+        path = download_lockfile(path_or_url, temp_dir / ("old" if is_old else "new"))
+        return path, path_or_url.rsplit("/", 1)[0] + "/"
     else:
         # It's a local path
-        return Path(path_or_url)
+        path = Path(path_or_url)
+        return path, str(path.resolve().parent) + "/"
+
+
+def get_wheel_size(base: str, file_name: str) -> int | None:
+    """
+    Get the size of a wheel, on disk or from the Content-Length of a HEAD request.
+
+    Args:
+        base: The directory or URL relative file names are relative to.
+        file_name: The file name or URL of the wheel from the lockfile.
+
+    Returns:
+        The size in bytes, or None if it couldn't be determined.
+    """
+    location = file_name if "://" in file_name else base + file_name
+    try:
+        if "://" not in location:
+            return Path(location).stat().st_size
+        request = urllib.request.Request(location, method="HEAD")
+        with urllib.request.urlopen(request, timeout=30) as response:
+            length = response.headers.get("Content-Length")
+            return int(length) if length is not None else None
+    except (OSError, ValueError):
+        return None
+
+
+def get_wheel_sizes(lockfile: PyodideLockSpec, base: str) -> dict[str, int | None]:
+    """
+    Get the sizes of all the wheels in a lockfile.
+
+    Args:
+        lockfile: The lockfile.
+        base: The directory or URL relative file names are relative to.
+
+    Returns:
+        The size of each package's wheel, keyed like lockfile.packages.
+    """
+    names = list(lockfile.packages)
+    file_names = [lockfile.packages[name].file_name for name in names]
+    with ThreadPoolExecutor(16) as executor:
+        sizes = executor.map(lambda f: get_wheel_size(base, f), file_names)
+        return dict(zip(names, sizes, strict=True))
+
+
+def canonicalize_name(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def dependency_closure(lockfile: PyodideLockSpec, name: str) -> set[str]:
+    """
+    Get a package and all its dependencies, i.e. what loadPackage downloads.
+
+    Args:
+        lockfile: The lockfile.
+        name: The key of the package in lockfile.packages.
+
+    Returns:
+        The keys of the packages in the closure.
+    """
+    closure: set[str] = set()
+    stack = [name]
+    while stack:
+        key = canonicalize_name(stack.pop())
+        if key in closure or key not in lockfile.packages:
+            continue
+        closure.add(key)
+        stack.extend(lockfile.packages[key].depends)
+    return closure
 
 
 def calculate_diff(
@@ -210,6 +308,129 @@ def calculate_diff(
     return added, removed, changed
 
 
+def _sum_sizes(keys: set[str], sizes: dict[str, int | None]) -> int | None:
+    values = [sizes.get(key) for key in keys]
+    if any(value is None for value in values):
+        return None
+    return sum(values)  # type: ignore[arg-type]
+
+
+def count_shared_libraries(lockfile: PyodideLockSpec, keys: set[str]) -> int:
+    return sum(lockfile.packages[key].package_type == "shared_library" for key in keys)
+
+
+def _changed(diffs: list[ValueDiff]) -> list[ValueDiff]:
+    """Keep the diffs that changed, the largest change first."""
+    changed = [diff for diff in diffs if diff.old_value != diff.new_value]
+    return sorted(changed, key=lambda diff: -abs(diff.delta or 0))
+
+
+@dataclass
+class SizeDiff:
+    total_size: ValueDiff
+    wheel_sizes: list[ValueDiff]
+    closure_sizes: list[ValueDiff]
+    total_shared_libraries: ValueDiff
+    shared_libraries: list[ValueDiff]
+
+
+def calculate_size_diff(
+    old_lockfile: PyodideLockSpec,
+    new_lockfile: PyodideLockSpec,
+    old_sizes: dict[str, int | None],
+    new_sizes: dict[str, int | None],
+) -> SizeDiff:
+    """
+    Calculate how the download size of the packages changed.
+
+    The dependency closure of a Python package is what loadPackage downloads
+    for it. Only the packages that changed are listed, the largest change
+    first. Sizes are None if a wheel size is unknown.
+    """
+    old_keys = set(old_lockfile.packages)
+    new_keys = set(new_lockfile.packages)
+    wheel_sizes = [
+        ValueDiff(name, old_sizes.get(name), new_sizes.get(name))
+        for name in sorted(old_keys | new_keys)
+    ]
+
+    closure_sizes = []
+    shared_libraries = []
+    for name in sorted(old_keys | new_keys):
+        old_pkg = old_lockfile.packages.get(name)
+        new_pkg = new_lockfile.packages.get(name)
+        if not any(pkg and is_normal_python_package(pkg) for pkg in [old_pkg, new_pkg]):
+            continue
+        old_size = old_count = new_size = new_count = None
+        if old_pkg:
+            closure = dependency_closure(old_lockfile, name)
+            old_size = _sum_sizes(closure, old_sizes)
+            old_count = count_shared_libraries(old_lockfile, closure)
+        if new_pkg:
+            closure = dependency_closure(new_lockfile, name)
+            new_size = _sum_sizes(closure, new_sizes)
+            new_count = count_shared_libraries(new_lockfile, closure)
+        closure_sizes.append(ValueDiff(name, old_size, new_size))
+        # Added or removed packages without shared libraries aren't interesting.
+        if (old_count or 0) != (new_count or 0):
+            shared_libraries.append(ValueDiff(name, old_count, new_count))
+
+    return SizeDiff(
+        total_size=ValueDiff(
+            "total", _sum_sizes(old_keys, old_sizes), _sum_sizes(new_keys, new_sizes)
+        ),
+        wheel_sizes=_changed(wheel_sizes),
+        closure_sizes=_changed(closure_sizes),
+        total_shared_libraries=ValueDiff(
+            "total",
+            count_shared_libraries(old_lockfile, old_keys),
+            count_shared_libraries(new_lockfile, new_keys),
+        ),
+        shared_libraries=_changed(shared_libraries),
+    )
+
+
+def format_size(size: int | None) -> str:
+    if size is None:
+        return "?"
+    return f"{size / 1e6:.2f} MB"
+
+
+def format_size_diff(diff: ValueDiff) -> str:
+    line = (
+        f"{diff.name}: {format_size(diff.old_value)} -> {format_size(diff.new_value)}"
+    )
+    if diff.delta is not None:
+        line += f" ({diff.delta / 1e6:+.2f} MB"
+        if diff.old_value:
+            line += f", {diff.delta / diff.old_value:+.1%}"
+        line += ")"
+    return line
+
+
+def print_size_diff(size_diff: SizeDiff) -> None:
+    print("\nWheel sizes:")
+    print(f"  {format_size_diff(size_diff.total_size)}")
+    if size_diff.total_size.delta is None:
+        print("  (the sizes of some wheels are unknown)")
+    for diff in size_diff.wheel_sizes:
+        print(f"  - {format_size_diff(diff)}")
+
+    print("\nDependency closure sizes (what loadPackage downloads):")
+    for diff in size_diff.closure_sizes:
+        print(f"  - {format_size_diff(diff)}")
+
+    total = size_diff.total_shared_libraries
+    print("\nShared libraries:")
+    print(f"  total: {total.old_value} -> {total.new_value}")
+    for diff in size_diff.shared_libraries:
+        old, new = (
+            "-" if count is None else count
+            for count in [diff.old_value, diff.new_value]
+        )
+        print(f"  - {diff.name}: {old} -> {new}")
+
+
 def main():
     args = parse_args()
 
@@ -217,15 +438,26 @@ def main():
         temp_path = Path(temp_dir)
 
         # Get lockfile paths, downloading if necessary
-        old_lockfile_path = get_lockfile_path(
+        old_lockfile_path, old_base = get_lockfile_path(
             args.old_lockfile, is_old=True, temp_dir=temp_path
         )
-        new_lockfile_path = get_lockfile_path(
+        new_lockfile_path, new_base = get_lockfile_path(
             args.new_lockfile, is_old=False, temp_dir=temp_path
         )
 
         added, removed, changed = calculate_diff(old_lockfile_path, new_lockfile_path)
 
+        size_diff = None
+        if args.sizes:
+            old_lockfile = PyodideLockSpec.from_json(old_lockfile_path)
+            new_lockfile = PyodideLockSpec.from_json(new_lockfile_path)
+            size_diff = calculate_size_diff(
+                old_lockfile,
+                new_lockfile,
+                get_wheel_sizes(old_lockfile, old_base),
+                get_wheel_sizes(new_lockfile, new_base),
+            )
+
     print("Added packages:")
     for pkg in added:
         print(f"  - {pkg.name} ({pkg.new_version})")
@@ -238,6 +470,9 @@ def main():
     for pkg in changed:
         print(f"  - {pkg.name}: {pkg.old_version} -> {pkg.new_version}")
 
+    if size_diff:
+        print_size_diff(size_diff)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+"""Write bundles holding the wheels of the dependency closure of packages.
+
+Loading a package like scipy downloads about ten wheels, one request each. A
+bundle holds all of them one after the other, so that ``loadPackage`` can
+download them with a single request. The bundles are written next to the lock
+file and listed in its ``bundles`` field, which says where each wheel starts.
+
+``pyodide_lock`` doesn't know about ``bundles``, so the lock file listing the
+bundles is written to a separate path, for instance:
+
+    create_package_bundles.py dist/pyodide-lock.json scipy matplotlib \\
+        -o dist/pyodide-lock-bundles.json
+"""
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+
+def dependency_closure(packages: dict[str, Any], name: str) -> list[str]:
+    """Return a package and all its dependencies, dependencies first."""
+    closure: list[str] = []
+
+    def add(name: str) -> None:
+        if name in closure:
+            return
+        for dependency in packages[name]["depends"]:
+            add(dependency)
+        closure.append(name)
+
+    add(name)
+    return closure
+
+
+def create_bundle(
+    lockfile: Path, packages: dict[str, Any], name: str
+) -> dict[str, Any]:
+    """Write the bundle of a package and return its lock file entry."""
+    members = []
+    data = bytearray()
+    for member in dependency_closure(packages, name):
+        wheel = (lockfile.parent / packages[member]["file_name"]).read_bytes()
+        members.append({"name": member, "size": len(wheel)})
+        data += wheel
+
+    file_name = f"{name}.bundle"
+    (lockfile.parent / file_name).write_bytes(data)
+    return {
+        "file_name": file_name,
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "packages": members,
+    }
+
+
+def create_package_bundles(lockfile: Path, names: list[str], output: Path) -> None:
+    lock = json.loads(lockfile.read_text())
+    packages = lock["packages"]
+    bundles = lock.setdefault("bundles", {})
+    for name in names:
+        if name not in packages:
+            raise SystemExit(f"ERROR: {name} is not in {lockfile}")
+        for member in dependency_closure(packages, name):
+            if "://" in packages[member]["file_name"]:
+                raise SystemExit(
+                    f"ERROR: {member} is not a local wheel, can't bundle {name}"
+                )
+        bundles[name] = create_bundle(lockfile, packages, name)
+    output.write_text(json.dumps(lock, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        "Write bundles of the dependency closures of packages",
+    )
+    parser.add_argument("lockfile", help="path to pyodide-lock.json")
+    parser.add_argument(
+        "packages", nargs="+", help="packages to bundle with their dependencies"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        required=True,
+        help="path to write the lock file listing the bundles to",
+    )
+    args = parser.parse_args()
+    create_package_bundles(Path(args.lockfile), args.packages, Path(args.output))
+
+
+if __name__ == "__main__":
+    main()
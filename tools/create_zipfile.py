@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
+import json
+import os
 import re
-import shutil
+import struct
 import zipfile
-from collections.abc import Callable
+import zlib
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
-from tempfile import TemporaryDirectory
 
 
 def default_filterfunc(
@@ -78,6 +82,8 @@ def create_zipfile(
     output: Path | str = "python",
     filterfunc: Callable[[str, list[str]], set[str]] | None = None,
     compression_level: int = 6,
+    alignment: int = 0,
+    jobs: int | None = None,
 ) -> None:
     """
     Bundle Python standard libraries into a zip file.
@@ -92,6 +98,11 @@ def create_zipfile(
 
     hence this function.
 
+    Files are read directly from ``libdirs``, members are sorted by name and
+    compressed in parallel. If ``output`` already exists and was built with the
+    same settings, members whose contents didn't change are copied from it
+    without compressing them again.
+
     Parameters
     ----------
     libdirs
@@ -108,45 +119,140 @@ def create_zipfile(
 
     filterfunc
         A function that filters the files to be included in the zip file.
-        This function will be passed to {ref}`shutil.copytree` 's ignore argument.
+        It is called like the ignore argument of {ref}`shutil.copytree`.
         By default, Pyodide's default filter function is used.
 
     compression_level
         Level of zip compression to apply. 0 means no compression. If a strictly
         positive integer is provided, ZIP_DEFLATED option is used.
 
-    Returns
-    -------
-    BytesIO
-        A BytesIO object containing the zip file.
+    alignment
+        Align the data of every member to a multiple of this many bytes. Only
+        used when compression_level is 0.
+
+    jobs
+        Number of processes used to compress members. Defaults to the number of
+        CPUs.
     """
 
-    archive = Path(output)
     excludes = excludes or []
     stubs = stubs or []
 
-    with TemporaryDirectory() as temp_dir_str:
-        temp_dir = Path(temp_dir_str)
+    members: dict[str, Path] = {}
+    for libdir in libdirs:
+        libdir = Path(libdir)
+        _filterfunc = filterfunc or default_filterfunc(libdir, excludes, stubs)
+        # Later libdirs override files of earlier ones.
+        members.update(_collect_members(libdir, _filterfunc))
+
+    _write_zip_archive(
+        Path(output),
+        members,
+        compression_level=compression_level,
+        alignment=alignment,
+        jobs=jobs,
+    )
 
-        for libdir in libdirs:
-            libdir = Path(libdir)
 
-            if filterfunc is None:
-                _filterfunc = default_filterfunc(libdir, excludes, stubs)
+def _collect_members(
+    root: Path, filterfunc: Callable[[str, list[str]], set[str]]
+) -> dict[str, Path]:
+    """Map the names of the members to the files and directories below root.
 
-            shutil.copytree(libdir, temp_dir, ignore=_filterfunc, dirs_exist_ok=True)
+    Like {ref}`shutil.copytree`, filterfunc is called with each directory and
+    the names in it, and returns the names to skip.
+    """
+    members: dict[str, Path] = {}
 
-        make_zip_archive(
-            archive,
-            temp_dir,
-            compression_level=compression_level,
-        )
+    def walk(directory: Path, prefix: str) -> None:
+        names = os.listdir(directory)
+        ignored = filterfunc(str(directory), names)
+        for name in names:
+            if name in ignored:
+                continue
+            path = directory / name
+            if path.is_dir():
+                members[f"{prefix}{name}/"] = path
+                walk(path, f"{prefix}{name}/")
+            else:
+                members[prefix + name] = path
+
+    walk(root, "")
+    return members
+
+
+# Extra field id used by Android's zipalign for padding. Zip readers skip
+# unknown extra fields. Like zipalign we store the alignment as the first two
+# bytes of the field so the padding can be recomputed when members are copied.
+ALIGNMENT_EXTRA_ID = 0xD935
+LOCAL_HEADER_SIZE = 30
+
+
+def _alignment_padding(header_offset: int, filename: str, alignment: int) -> bytes:
+    """Return an extra field that aligns the member's data to ``alignment``."""
+    data_offset = header_offset + LOCAL_HEADER_SIZE + len(filename.encode("utf-8")) + 6
+    padding = -data_offset % alignment
+    return struct.pack("<HHH", ALIGNMENT_EXTRA_ID, 2 + padding, alignment) + bytes(
+        padding
+    )
+
+
+def _realign(zinfo: zipfile.ZipInfo, zf: zipfile.ZipFile) -> None:
+    """Recompute the alignment padding of a member about to be written to zf."""
+    if len(zinfo.extra) < 6:
+        return
+    extra_id, _, alignment = struct.unpack_from("<HHH", zinfo.extra)
+    if extra_id == ALIGNMENT_EXTRA_ID:
+        assert zf.fp is not None
+        zinfo.extra = _alignment_padding(zf.fp.tell(), zinfo.filename, alignment)
+
+
+def align_zipfile(
+    archive: Path, alignment: int, compression_level: int | None = None
+) -> None:
+    """Rewrite a zip archive in place with its uncompressed members aligned.
+
+    ``pyodide py-compile`` rewrites the standard library zip without the
+    alignment padding and without the archive comment that lets the next
+    `create_zipfile` reuse its members, so both are added back afterwards.
+
+    Parameters
+    ----------
+    archive
+        Path to the zip file to rewrite.
+    alignment
+        align the data of every uncompressed member to a multiple of this many
+        bytes. The members are left as they are if it is 0.
+    compression_level
+        The compression level the members were written with. If given, it is
+        recorded in the archive comment. Otherwise the comment is kept.
+    """
+    archive = Path(archive)
+    if compression_level is not None:
+        with zipfile.ZipFile(archive, "a") as zf:
+            zf.comment = _archive_settings(compression_level)
+    if not alignment:
+        return
+    with zipfile.ZipFile(archive) as zf:
+        members = [(info, zf.read(info)) for info in zf.infolist()]
+        comment = zf.comment
+
+    tmp_path = archive.with_name(f"{archive.name}.tmp")
+    with zipfile.ZipFile(tmp_path, "w") as zf:
+        zf.comment = comment
+        for info, data in members:
+            if info.compress_type == zipfile.ZIP_STORED and not info.is_dir():
+                assert zf.fp is not None
+                info.extra = _alignment_padding(zf.fp.tell(), info.filename, alignment)
+            zf.writestr(info, data)
+    os.replace(tmp_path, archive)
 
 
 def make_zip_archive(
     archive_path: Path,
     input_dir: Path,
     compression_level: int = 6,
+    alignment: int = 0,
 ) -> None:
     """Create a zip archive out of a input folder
 
@@ -158,17 +264,265 @@ def make_zip_archive(
        input dir to compress
     compression_level
        compression level of the resulting zip file.
+    alignment
+       align the data of every member to a multiple of this many bytes. Only
+       used for uncompressed archives.
+    """
+    members = _collect_members(Path(input_dir), lambda path, names: set())
+    _write_zip_archive(
+        Path(archive_path),
+        members,
+        compression_level=compression_level,
+        alignment=alignment,
+    )
+
+
+# Below this many members to compress, starting worker processes costs more
+# than it saves.
+PARALLEL_THRESHOLD = 64
+
+
+def _compress_file(path: Path, compression_level: int) -> tuple[int, int, bytes]:
+    """Return the CRC-32, the size and the compressed data of a file.
+
+    The data is compressed like zipfile does, so it can be written as is.
+    """
+    data = path.read_bytes()
+    raw = data
+    if compression_level > 0:
+        compressor = zlib.compressobj(compression_level, zlib.DEFLATED, -15)
+        raw = compressor.compress(data) + compressor.flush()
+    return zlib.crc32(data), len(data), raw
+
+
+def _compress_files(
+    paths: list[Path], compression_level: int, jobs: int | None
+) -> list[tuple[int, int, bytes]]:
+    """Compress files with _compress_file, in parallel if there are many."""
+    levels = [compression_level] * len(paths)
+    if len(paths) < PARALLEL_THRESHOLD or jobs == 1:
+        return list(map(_compress_file, paths, levels))
+    with ProcessPoolExecutor(jobs) as executor:
+        return list(executor.map(_compress_file, paths, levels, chunksize=16))
+
+
+def _read_raw(fp, zinfo: zipfile.ZipInfo) -> bytes:
+    """Read the data of a member as it is stored, without decompressing it."""
+    fp.seek(zinfo.header_offset + 26)
+    name_len, extra_len = struct.unpack("<HH", fp.read(4))
+    fp.seek(name_len + extra_len, os.SEEK_CUR)
+    return fp.read(zinfo.compress_size)
+
+
+def _decompress(raw: bytes, compress_type: int) -> bytes | None:
+    """Return the uncompressed data of a member, or None if it can't be read."""
+    if compress_type == zipfile.ZIP_STORED:
+        return raw
+    if compress_type == zipfile.ZIP_DEFLATED:
+        try:
+            return zlib.decompress(raw, -15)
+        except zlib.error:
+            return None
+    return None
+
+
+def _write_raw(zf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, raw: bytes) -> None:
+    """Write a member whose CRC, sizes and compressed data are already known."""
+    assert zf.fp is not None
+    zinfo.header_offset = zf.fp.tell()
+    zf.fp.write(zinfo.FileHeader())
+    zf.fp.write(raw)
+    zf.filelist.append(zinfo)
+    zf.NameToInfo[zinfo.filename] = zinfo
+    zf.start_dir = zf.fp.tell()
+
+
+def _archive_settings(compression_level: int) -> bytes:
+    """The archive comment recording the settings its members were built with."""
+    return f"pyodide compression_level={compression_level}".encode()
+
+
+def _previous_members(
+    archive_path: Path, settings: bytes
+) -> dict[tuple[int, int], zipfile.ZipInfo]:
+    """Index the members of a previous build of the archive by their content.
+
+    Members are keyed by the CRC-32 and the size of their uncompressed data.
+    These can collide, so a match has to be verified against the data. An
+    archive built with other settings can't be reused.
+    """
+    try:
+        with zipfile.ZipFile(archive_path) as zf:
+            if zf.comment != settings:
+                return {}
+            return {
+                (info.CRC, info.file_size): info
+                for info in zf.infolist()
+                if not info.is_dir()
+            }
+    except (OSError, zipfile.BadZipFile):
+        return {}
+
+
+def _write_zip_archive(
+    archive_path: Path,
+    members: dict[str, Path],
+    compression_level: int = 6,
+    alignment: int = 0,
+    jobs: int | None = None,
+) -> None:
+    """Write the members to archive_path, reusing its previous contents.
+
+    The archive is written to a temporary file which then replaces
+    archive_path, so the previous archive can be read while writing.
     """
     if compression_level > 0:
         compression = zipfile.ZIP_DEFLATED
     else:
         compression = zipfile.ZIP_STORED
 
-    with zipfile.ZipFile(
-        archive_path, "w", compression=compression, compresslevel=compression_level
-    ) as zf:
-        for file in input_dir.rglob("*"):
-            zf.write(file, file.relative_to(input_dir))
+    align = alignment > 0 and compression == zipfile.ZIP_STORED
+    settings = _archive_settings(compression_level)
+    previous = _previous_members(archive_path, settings) if not align else {}
+    names = sorted(members)
+
+    # Find the members whose contents changed since the previous build.
+    # Decompressing is much cheaper than compressing, so a member is only
+    # reused once its old data was checked to be the same.
+    reused: dict[str, tuple[zipfile.ZipInfo, bytes]] = {}
+    to_compress: list[str] = []
+    with ExitStack() as stack:
+        old_fp = stack.enter_context(open(archive_path, "rb")) if previous else None
+        for name in names:
+            if name.endswith("/"):
+                continue
+            if old_fp is not None:
+                data = members[name].read_bytes()
+                old = previous.get((zlib.crc32(data), len(data)))
+                if old is not None:
+                    raw = _read_raw(old_fp, old)
+                    if _decompress(raw, old.compress_type) == data:
+                        reused[name] = (old, raw)
+                        continue
+            to_compress.append(name)
+
+    paths = [members[name] for name in to_compress]
+    compressed = _compress_files(paths, compression_level, jobs)
+    results = dict(zip(to_compress, compressed, strict=True))
+
+    tmp_path = archive_path.with_name(archive_path.name + ".tmp")
+    with zipfile.ZipFile(tmp_path, "w", compression=compression) as zf:
+        zf.comment = settings
+        for name in names:
+            path = members[name]
+            if name.endswith("/"):
+                zf.write(path, name)
+                continue
+            zinfo = zipfile.ZipInfo.from_file(path, name)
+            zinfo.compress_type = compression
+            if name in reused:
+                old, raw = reused[name]
+                zinfo.CRC, zinfo.file_size = old.CRC, old.file_size
+                zinfo.compress_size = old.compress_size
+            else:
+                zinfo.CRC, zinfo.file_size, raw = results[name]
+                zinfo.compress_size = len(raw)
+            if align:
+                assert zf.fp is not None
+                zinfo.extra = _alignment_padding(
+                    zf.fp.tell(), zinfo.filename, alignment
+                )
+            _write_raw(zf, zinfo, raw)
+    os.replace(tmp_path, archive_path)
+
+
+def read_import_trace(path: Path) -> set[str]:
+    """Read the module names of an import trace.
+
+    The trace is either a JSON list or a text file with one module name per
+    line, e.g. the output of ``print("\\n".join(sys.modules))`` after running a
+    representative workload in Pyodide.
+    """
+    text = Path(path).read_text()
+    if text.lstrip().startswith("["):
+        names = json.loads(text)
+    else:
+        names = text.splitlines()
+    return {name.strip() for name in names if name.strip()}
+
+
+def _member_module(name: str) -> str:
+    """Return the dotted name of the module a zip member belongs to.
+
+    Modules map to their own name, package directories to the package and data
+    files to the package containing them.
+    """
+    parts = name.rstrip("/").split("/")
+    if name.endswith("/"):
+        return ".".join(parts)
+    stem, dot, suffix = parts[-1].rpartition(".")
+    if dot and suffix in ("py", "pyc"):
+        if stem == "__init__":
+            return ".".join(parts[:-1])
+        return ".".join(parts[:-1] + [stem])
+    return ".".join(parts[:-1])
+
+
+def split_zipfile_by_import_trace(
+    archive: Path,
+    modules: Iterable[str],
+    remainder: Path,
+) -> tuple[int, int, int]:
+    """Split a zip archive into the modules of an import trace and the rest.
+
+    ``archive`` is rewritten in place to contain only the traced modules and
+    the data files of traced packages. Everything else is moved to
+    ``remainder``. Pyodide downloads the remainder in the background when it is
+    passed as ``stdLibRemainderURL`` to ``loadPyodide`` and mounts it on the
+    first failed import.
+
+    Parameters
+    ----------
+    archive
+        Path to the zip file created by `create_zipfile`.
+    modules
+        Names of the modules to keep in ``archive``.
+    remainder
+        Path to the zip file that receives the remaining members.
+
+    Returns
+    -------
+    tuple[int, int, int]
+        The size in bytes of the original archive, the pruned archive and the
+        remainder archive.
+    """
+    archive = Path(archive)
+    remainder = Path(remainder)
+    modules = set(modules)
+    # Importing a.b.c imports a and a.b as well, but make sure they are kept
+    # even if the trace was filtered.
+    for name in list(modules):
+        parts = name.split(".")
+        modules.update(".".join(parts[:i]) for i in range(1, len(parts)))
+    modules.add("")  # top level data files
+
+    original_size = archive.stat().st_size
+    with zipfile.ZipFile(archive) as zf:
+        members = [(info, zf.read(info)) for info in zf.infolist()]
+        comment = zf.comment
+
+    with (
+        zipfile.ZipFile(archive, "w") as kept,
+        zipfile.ZipFile(remainder, "w") as rest,
+    ):
+        # Keep the settings, so that the next build can reuse the members.
+        kept.comment = comment
+        for info, data in members:
+            target = kept if _member_module(info.filename) in modules else rest
+            _realign(info, target)
+            target.writestr(info, data)
+
+    return original_size, archive.stat().st_size, remainder.stat().st_size
 
 
 if __name__ == "__main__":
@@ -179,7 +533,7 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         "libdirs",
-        nargs="+",
+        nargs="*",
         help="List of paths to the directory containing the Python standard library or extra packages.",
     )
     parser.add_argument(
@@ -204,8 +558,56 @@ if __name__ == "__main__":
         help="Level of zip compression to apply. 0 means no compression. Defaults to 6.",
     )
 
+    parser.add_argument(
+        "--align",
+        type=int,
+        default=0,
+        help=(
+            "Align the data of every member to a multiple of this many bytes, "
+            "e.g. 4096 for page alignment. Requires --compression-level 0. "
+            "Defaults to 0 (no alignment)."
+        ),
+    )
+    parser.add_argument(
+        "--realign",
+        default=None,
+        metavar="ZIPFILE",
+        help=(
+            "Instead of creating a zip file, rewrite ZIPFILE in place with its "
+            "uncompressed members aligned to --align bytes, and record "
+            "--compression-level, the level its members were compressed "
+            "with, in its comment."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of processes used to compress files. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--import-trace",
+        default=None,
+        help=(
+            "File listing the modules imported by a representative workload. "
+            "If given, only these modules are kept in the output and the rest "
+            "of the standard library is written to --remainder-output."
+        ),
+    )
+    parser.add_argument(
+        "--remainder-output",
+        default=None,
+        help="Path to the zip file with the modules not in --import-trace. Defaults to <output>_remainder.zip.",
+    )
+
     args = parser.parse_args()
 
+    if args.realign:
+        align_zipfile(Path(args.realign), args.align, args.compression_level)
+        raise SystemExit(0)
+    if not args.libdirs:
+        parser.error("the following arguments are required: libdirs")
+
     # Convert the comma / space separated strings to lists
     excludes = [
         item.strip() for item in re.split(r",|\s", args.exclude) if item.strip() != ""
@@ -220,4 +622,23 @@ if __name__ == "__main__":
         stubs=stubs,
         output=Path(args.output),
         compression_level=args.compression_level,
+        alignment=args.align,
+        jobs=args.jobs,
     )
+
+    if args.import_trace:
+        output = Path(args.output)
+        remainder_output = Path(
+            args.remainder_output
+            or output.with_name(f"{output.stem}_remainder{output.suffix}")
+        )
+        full, pruned, rest = split_zipfile_by_import_trace(
+            output,
+            read_import_trace(Path(args.import_trace)),
+            remainder_output,
+        )
+        print(
+            f"{output}: {full} -> {pruned} bytes "
+            f"({100 * (full - pruned) / full:.1f}% smaller), "
+            f"{remainder_output}: {rest} bytes"
+        )
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Generate a C file with frozen Python modules for the Pyodide runtime.
+
+Frozen modules are compiled into pyodide.asm.wasm and imported by CPython's
+FrozenImporter, so importing them never touches the standard library zip. The
+generated file defines ``_PyodideFrozenModules``, which ``main.c`` installs as
+``PyImport_FrozenModules`` before the interpreter is initialized.
+
+This script must be run with the same Python version as the Pyodide runtime,
+since it writes marshalled code objects.
+"""
+
+import argparse
+import marshal
+import re
+import sys
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from create_zipfile import read_import_trace
+
+HEADER = """\
+// Generated by tools/freeze_modules.py, do not edit.
+#include "Python.h"
+"""
+
+SKIP_DIRS = {"__pycache__", "test", "tests", "idle_test"}
+
+
+def find_module(name: str, libdirs: list[Path]) -> Path | None:
+    """Find the source of a module or the directory of a package."""
+    relpath = Path(*name.split("."))
+    for libdir in libdirs:
+        if (libdir / relpath / "__init__.py").is_file():
+            return libdir / relpath
+        if (libdir / relpath).with_suffix(".py").is_file():
+            return (libdir / relpath).with_suffix(".py")
+    return None
+
+
+def _is_excluded(path: Path, libdirs: list[Path], excludes: list[str]) -> bool:
+    """Check a source against excludes in the format of PYZIP_EXCLUDE_FILES."""
+    for libdir in libdirs:
+        if not path.is_relative_to(libdir):
+            continue
+        relpath = path.relative_to(libdir).as_posix()
+        return any(
+            relpath == exclude
+            or (exclude.endswith("/") and relpath.startswith(exclude))
+            for exclude in excludes
+        )
+    return False
+
+
+def iter_sources(
+    names: Iterable[str], libdirs: list[Path], excludes: list[str] | None = None
+) -> Iterator[tuple[str, Path, bool]]:
+    """Yield ``(module name, source path, is package)`` for each module to freeze.
+
+    Packages are frozen with all of their submodules. Names that can't be found
+    in ``libdirs`` (builtin or extension modules, modules that aren't shipped)
+    and excluded files are skipped.
+    """
+    excludes = excludes or []
+    seen: set[str] = set()
+    for name in sorted(set(names)):
+        path = find_module(name, libdirs)
+        if path is None:
+            continue
+        if path.is_file():
+            if name not in seen and not _is_excluded(path, libdirs, excludes):
+                seen.add(name)
+                yield name, path, False
+            continue
+        for source in sorted(path.rglob("*.py")):
+            relparts = source.relative_to(path).parts
+            if SKIP_DIRS.intersection(relparts[:-1]):
+                continue
+            if _is_excluded(source, libdirs, excludes):
+                continue
+            parts = [*name.split("."), *relparts[:-1]]
+            is_package = source.name == "__init__.py"
+            if not is_package:
+                parts.append(source.stem)
+            modname = ".".join(parts)
+            if modname not in seen:
+                seen.add(modname)
+                yield modname, source, is_package
+
+
+def _c_identifier(name: str) -> str:
+    return "_Py_M__" + re.sub(r"\W", "_", name)
+
+
+def _c_array(data: bytes) -> str:
+    return "\n".join(
+        "  " + ",".join(str(b) for b in data[i : i + 16]) + ","
+        for i in range(0, len(data), 16)
+    )
+
+
+def freeze_modules(
+    names: Iterable[str],
+    libdirs: list[Path],
+    output: Path,
+    excludes: list[str] | None = None,
+) -> list[str]:
+    """
+    Write a C file with frozen versions of the given modules.
+
+    Parameters
+    ----------
+    names
+        Modules and packages to freeze. Packages are frozen recursively.
+    libdirs
+        Directories to look up the module sources in, in order of priority.
+    output
+        Path to the C file to generate.
+    excludes
+        Files and directories (ending in ``/``) relative to a libdir that are
+        never frozen.
+
+    Returns
+    -------
+    list[str]
+        The names of the frozen modules.
+    """
+    arrays = []
+    entries = []
+    frozen = []
+    for name, source, is_package in iter_sources(names, libdirs, excludes):
+        code = compile(
+            source.read_bytes(), f"<frozen {name}>", "exec", dont_inherit=True
+        )
+        data = marshal.dumps(code)
+        ident = _c_identifier(name)
+        arrays.append(
+            f"static const unsigned char {ident}[] = {{\n{_c_array(data)}\n}};\n"
+        )
+        entries.append(
+            f'  {{"{name}", {ident}, (int)sizeof({ident}), {int(is_package)}}},'
+        )
+        frozen.append(name)
+
+    table = "\n".join(
+        [
+            "const struct _frozen _PyodideFrozenModules[] = {",
+            *entries,
+            "  {0, 0, 0, 0} // sentinel",
+            "};",
+        ]
+    )
+    output.write_text("\n".join([HEADER, *arrays, table, ""]))
+    return frozen
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "libdirs",
+        nargs="+",
+        type=Path,
+        help="Directories containing the module sources, in order of priority.",
+    )
+    parser.add_argument(
+        "--modules",
+        default="",
+        help="Comma or space separated modules and packages to freeze.",
+    )
+    parser.add_argument(
+        "--import-trace",
+        default=None,
+        help="File with more modules to freeze, e.g. sys.modules after startup.",
+    )
+    parser.add_argument(
+        "--exclude",
+        default="",
+        help="List of files to never freeze, like create_zipfile.py --exclude.",
+    )
+    parser.add_argument("--output", required=True, type=Path)
+    args = parser.parse_args()
+
+    names = {item for item in re.split(r",|\s", args.modules) if item}
+    if args.import_trace:
+        names |= read_import_trace(Path(args.import_trace))
+
+    excludes = [item for item in re.split(r",|\s", args.exclude) if item]
+
+    frozen = freeze_modules(names, args.libdirs, args.output, excludes)
+    print(
+        f"Froze {len(frozen)} modules into {args.output} "
+        f"(Python {sys.version_info.major}.{sys.version_info.minor})"
+    )
+
+
+if __name__ == "__main__":
+    main()
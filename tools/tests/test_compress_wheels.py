@@ -0,0 +1,62 @@
+import io
+import json
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parents[1]))
+import compress_wheels
+from compress_wheels import compress_wheels as compress_lockfile_wheels
+from compress_wheels import repack_stored
+
+
+def make_wheel(path: Path) -> bytes:
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("pkg/__init__.py", "x = 1\n" * 100)
+        zf.writestr("pkg-1.0.dist-info/RECORD", "")
+    return path.read_bytes()
+
+
+def test_repack_stored(tmp_path):
+    wheel = make_wheel(tmp_path / "pkg-1.0-py3-none-any.whl")
+
+    stored = repack_stored(wheel)
+
+    with (
+        zipfile.ZipFile(io.BytesIO(wheel)) as src,
+        zipfile.ZipFile(io.BytesIO(stored)) as dst,
+    ):
+        assert dst.namelist() == src.namelist()
+        for info in dst.infolist():
+            assert info.compress_type == zipfile.ZIP_STORED
+            assert dst.read(info) == src.read(info.filename)
+
+
+def test_compress_wheels(tmp_path, monkeypatch):
+    brotli = pytest.importorskip("brotli")
+    monkeypatch.setattr(compress_wheels, "zstandard", None)
+    wheel = make_wheel(tmp_path / "pkg-1.0-py3-none-any.whl")
+    lockfile = tmp_path / "pyodide-lock.json"
+    lockfile.write_text(
+        json.dumps(
+            {
+                "info": {},
+                "packages": {
+                    "pkg": {"file_name": "pkg-1.0-py3-none-any.whl"},
+                    "remote": {"file_name": "https://example.com/r-1.0.whl"},
+                },
+            }
+        )
+    )
+    output = tmp_path / "pyodide-lock-compressed.json"
+
+    compress_lockfile_wheels(lockfile, output)
+
+    packages = json.loads(output.read_text())["packages"]
+    assert "compressed_files" not in packages["remote"]
+    entry = packages["pkg"]["compressed_files"]["br"]
+    assert entry["file_name"] == "pkg-1.0-py3-none-any.whl.br"
+    compressed = (tmp_path / entry["file_name"]).read_bytes()
+    assert brotli.decompress(compressed) == repack_stored(wheel)
@@ -2,7 +2,12 @@ import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parents[1]))
-from create_lockfile_diff import calculate_diff
+from create_lockfile_diff import (
+    calculate_diff,
+    calculate_size_diff,
+    dependency_closure,
+)
+from pyodide_lock import PyodideLockSpec
 
 
 def test_calculate_diff():
@@ -13,3 +18,29 @@ def test_calculate_diff():
     assert "platformdirs" in [pkg.name for pkg in added]
     assert "sharedlib-test-py" in [pkg.name for pkg in removed]
     assert "numpy" in [pkg.name for pkg in changed]
+
+
+def test_calculate_size_diff():
+    old_path = Path(__file__).parent / "testdata" / "pyodide-lock-0.27.7.json"
+    new_path = Path(__file__).parent / "testdata" / "pyodide-lock-0.28.0a3.json"
+    old = PyodideLockSpec.from_json(old_path)
+    new = PyodideLockSpec.from_json(new_path)
+    old_sizes: dict[str, int | None] = dict.fromkeys(old.packages, 100)
+    new_sizes: dict[str, int | None] = dict.fromkeys(new.packages, 100)
+    new_sizes["numpy"] = 300
+
+    diff = calculate_size_diff(old, new, old_sizes, new_sizes)
+
+    assert diff.total_size.old_value == 100 * len(old.packages)
+    wheels = {d.name: d for d in diff.wheel_sizes}
+    assert wheels["numpy"].delta == 200
+    assert wheels["platformdirs"].old_value is None
+    closures = {d.name: d for d in diff.closure_sizes}
+    assert closures["scipy"].delta == 200
+    assert diff.total_shared_libraries.new_value == 9
+
+
+def test_dependency_closure():
+    path = Path(__file__).parent / "testdata" / "pyodide-lock-0.28.0a3.json"
+    lockfile = PyodideLockSpec.from_json(path)
+    assert {"scipy", "numpy", "openblas"} <= dependency_closure(lockfile, "scipy")
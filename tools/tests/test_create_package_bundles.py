@@ -0,0 +1,37 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1]))
+from create_package_bundles import create_package_bundles, dependency_closure
+
+
+def test_dependency_closure():
+    packages = {
+        "a": {"depends": ["b", "c"]},
+        "b": {"depends": ["c"]},
+        "c": {"depends": []},
+    }
+    assert dependency_closure(packages, "a") == ["c", "b", "a"]
+    assert dependency_closure(packages, "c") == ["c"]
+
+
+def test_create_package_bundles(tmp_path):
+    packages = {}
+    for name, depends in [("a", ["b"]), ("b", []), ("c", [])]:
+        file_name = f"{name}-1.0-py3-none-any.whl"
+        (tmp_path / file_name).write_bytes(name.encode() * 3)
+        packages[name] = {"file_name": file_name, "depends": depends}
+    lockfile = tmp_path / "pyodide-lock.json"
+    lockfile.write_text(json.dumps({"info": {}, "packages": packages}))
+    output = tmp_path / "pyodide-lock-bundles.json"
+
+    create_package_bundles(lockfile, ["a"], output)
+
+    bundles = json.loads(output.read_text())["bundles"]
+    assert list(bundles) == ["a"]
+    assert bundles["a"]["packages"] == [
+        {"name": "b", "size": 3},
+        {"name": "a", "size": 3},
+    ]
+    assert (tmp_path / bundles["a"]["file_name"]).read_bytes() == b"bbbaaa"
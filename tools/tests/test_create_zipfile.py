@@ -1,10 +1,20 @@
+import struct
 import sys
+import zipfile
+import zlib
 from pathlib import Path
 
 import pytest
 
 sys.path.append(str(Path(__file__).parents[1]))
-from create_zipfile import create_zipfile, default_filterfunc
+import create_zipfile as create_zipfile_module
+from create_zipfile import (
+    align_zipfile,
+    create_zipfile,
+    default_filterfunc,
+    read_import_trace,
+    split_zipfile_by_import_trace,
+)
 
 
 @pytest.fixture(scope="module")
@@ -96,3 +106,227 @@ def test_import_from_zip(temp_python_lib, temp_python_lib2, tmp_path, monkeypatc
 
     assert bye_pyodide.__file__.startswith(str(output))
     assert bye_pyodide.bye() == "bye"
+
+
+def test_split_by_import_trace(tmp_path, monkeypatch):
+    from zipfile import ZipFile
+
+    libdir = tmp_path / "lib"
+    (libdir / "pkg" / "sub").mkdir(parents=True)
+    (libdir / "pkg" / "__init__.py").touch()
+    (libdir / "pkg" / "used.py").touch()
+    (libdir / "pkg" / "unused.py").touch()
+    (libdir / "pkg" / "data.txt").touch()
+    (libdir / "pkg" / "sub" / "__init__.py").touch()
+    (libdir / "pkg" / "sub" / "deep.py").touch()
+    (libdir / "other.py").touch()
+
+    trace = tmp_path / "trace.txt"
+    trace.write_text("sys\npkg.sub.deep\npkg.used\n")
+    modules = read_import_trace(trace)
+    assert modules == {"sys", "pkg.sub.deep", "pkg.used"}
+
+    output = tmp_path / "python.zip"
+    remainder = tmp_path / "python_remainder.zip"
+    create_zipfile([libdir], output=output)
+    full, pruned, rest = split_zipfile_by_import_trace(output, modules, remainder)
+    assert pruned < full
+
+    with ZipFile(output) as zf:
+        kept = set(zf.namelist())
+    with ZipFile(remainder) as zf:
+        moved = set(zf.namelist())
+
+    assert {
+        "pkg/__init__.py",
+        "pkg/used.py",
+        "pkg/data.txt",
+        "pkg/sub/__init__.py",
+        "pkg/sub/deep.py",
+    } <= kept
+    assert {"pkg/unused.py", "other.py"} <= moved
+    assert not kept & moved
+
+    # The next build can still reuse the members of the pruned archive
+    compressed = []
+    original = create_zipfile_module._compress_file
+
+    def compress_file(path, compression_level):
+        compressed.append(path.name)
+        return original(path, compression_level)
+
+    monkeypatch.setattr(create_zipfile_module, "_compress_file", compress_file)
+    (libdir / "other.py").write_text("x = 1\n")
+    create_zipfile([libdir], output=output)
+    assert "other.py" in compressed
+    assert not {"__init__.py", "used.py", "data.txt", "deep.py"} & set(compressed)
+
+
+def test_read_import_trace_json(tmp_path):
+    trace = tmp_path / "trace.json"
+    trace.write_text('["json", "json.decoder"]')
+    assert read_import_trace(trace) == {"json", "json.decoder"}
+
+
+def _data_offsets(archive):
+    from zipfile import ZipFile
+
+    with ZipFile(archive) as zf, open(archive, "rb") as fp:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            fp.seek(info.header_offset + 26)
+            name_len, extra_len = struct.unpack("<HH", fp.read(4))
+            yield info, info.header_offset + 30 + name_len + extra_len
+
+
+@pytest.mark.parametrize("alignment", [4, 4096])
+def test_create_zip_aligned(temp_python_lib, tmp_path, alignment):
+    from zipfile import ZIP_STORED
+    from zipimport import zipimporter
+
+    output = tmp_path / "python.zip"
+    create_zipfile(
+        [temp_python_lib], output=output, compression_level=0, alignment=alignment
+    )
+
+    offsets = list(_data_offsets(output))
+    assert offsets
+    for info, offset in offsets:
+        assert info.compress_type == ZIP_STORED
+        assert offset % alignment == 0
+
+    # alignment survives splitting the archive
+    remainder = tmp_path / "python_remainder.zip"
+    split_zipfile_by_import_trace(output, {"module1"}, remainder)
+    for archive in [output, remainder]:
+        for _, offset in _data_offsets(archive):
+            assert offset % alignment == 0
+
+    namespace: dict[str, object] = {}
+    exec(zipimporter(str(remainder)).get_code("hello_pyodide"), namespace)
+    assert namespace["hello"]() == "hello"  # type: ignore[operator]
+
+
+def test_align_zipfile(tmp_path):
+    from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+    archive = tmp_path / "python.zip"
+    with ZipFile(archive, "w", ZIP_STORED) as zf:
+        zf.writestr("a/", "")
+        zf.writestr("a/b.pyc", b"b" * 3)
+        zf.writestr("c.pyc", b"c" * 5)
+        zf.writestr("d.txt", b"d" * 100, compress_type=ZIP_DEFLATED)
+
+    align_zipfile(archive, 64)
+
+    for info, offset in _data_offsets(archive):
+        if info.compress_type == ZIP_STORED:
+            assert offset % 64 == 0
+    with ZipFile(archive) as zf:
+        assert zf.namelist() == ["a/", "a/b.pyc", "c.pyc", "d.txt"]
+        assert zf.read("c.pyc") == b"c" * 5
+        assert zf.read("d.txt") == b"d" * 100
+        assert zf.testzip() is None
+
+
+def test_align_zipfile_records_settings(tmp_path):
+    libdir = tmp_path / "lib"
+    libdir.mkdir()
+    (libdir / "a.py").write_text("x = 1\n")
+    archive = tmp_path / "python.zip"
+    create_zipfile([libdir], output=archive, compression_level=1)
+    with zipfile.ZipFile(archive) as zf:
+        settings = zf.comment
+    # Like pyodide py-compile, rewrite the archive without its comment
+    with zipfile.ZipFile(archive, "a") as zf:
+        zf.comment = b""
+
+    align_zipfile(archive, 0, compression_level=1)
+
+    with zipfile.ZipFile(archive) as zf:
+        assert zf.comment == settings
+        assert zf.read("a.py") == b"x = 1\n"
+
+
+def test_create_zip_is_sorted_and_reproducible(temp_python_lib, tmp_path):
+    first = tmp_path / "first.zip"
+    second = tmp_path / "second.zip"
+    create_zipfile([temp_python_lib], output=first)
+    create_zipfile([temp_python_lib], output=second, jobs=1)
+
+    with zipfile.ZipFile(first) as zf:
+        names = zf.namelist()
+    assert names == sorted(names)
+    assert first.read_bytes() == second.read_bytes()
+
+
+def test_create_zip_reuses_unchanged_members(tmp_path, monkeypatch):
+    libdir = tmp_path / "lib"
+    libdir.mkdir()
+    (libdir / "same.py").write_text("x = 1\n" * 100)
+    (libdir / "changed.py").write_text("y = 1\n")
+    output = tmp_path / "python.zip"
+    create_zipfile([libdir], output=output)
+
+    compressed = []
+    original = create_zipfile_module._compress_file
+
+    def compress_file(path, compression_level):
+        compressed.append(path.name)
+        return original(path, compression_level)
+
+    monkeypatch.setattr(create_zipfile_module, "_compress_file", compress_file)
+    (libdir / "changed.py").write_text("y = 2\n")
+    (libdir / "new.py").write_text("z = 1\n")
+    create_zipfile([libdir], output=output)
+
+    assert sorted(compressed) == ["changed.py", "new.py"]
+    with zipfile.ZipFile(output) as zf:
+        assert zf.testzip() is None
+        assert zf.read("same.py") == b"x = 1\n" * 100
+        assert zf.read("changed.py") == b"y = 2\n"
+
+    # A different compression level doesn't reuse the members.
+    compressed.clear()
+    create_zipfile([libdir], output=output, compression_level=1)
+    assert sorted(compressed) == ["changed.py", "new.py", "same.py"]
+
+
+def test_create_zip_verifies_reused_members(tmp_path, monkeypatch):
+    libdir = tmp_path / "lib"
+    libdir.mkdir()
+    (libdir / "changed.py").write_text("y = 1\n")
+    output = tmp_path / "python.zip"
+    create_zipfile([libdir], output=output)
+
+    # Make the old member look like a CRC collision with the new contents.
+    new_contents = b"y = 2\n"
+    original = create_zipfile_module._previous_members
+
+    def previous_members(archive_path, settings):
+        [info] = original(archive_path, settings).values()
+        return {(zlib.crc32(new_contents), len(new_contents)): info}
+
+    monkeypatch.setattr(create_zipfile_module, "_previous_members", previous_members)
+    (libdir / "changed.py").write_bytes(new_contents)
+    create_zipfile([libdir], output=output)
+
+    with zipfile.ZipFile(output) as zf:
+        assert zf.testzip() is None
+        assert zf.read("changed.py") == new_contents
+
+
+def test_create_zip_parallel(tmp_path, monkeypatch):
+    libdir = tmp_path / "lib"
+    libdir.mkdir()
+    for i in range(10):
+        (libdir / f"module{i}.py").write_text(f"x = {i}\n" * i)
+    monkeypatch.setattr(create_zipfile_module, "PARALLEL_THRESHOLD", 1)
+
+    output = tmp_path / "python.zip"
+    create_zipfile([libdir], output=output, jobs=2)
+
+    with zipfile.ZipFile(output) as zf:
+        assert zf.testzip() is None
+        assert zf.read("module3.py") == b"x = 3\n" * 3
@@ -0,0 +1,67 @@
+import marshal
+import re
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1]))
+from freeze_modules import freeze_modules, iter_sources
+
+
+def _frozen_code(c_source: str) -> dict[str, bytes]:
+    arrays = re.findall(
+        r"static const unsigned char (\w+)\[\] = \{(.*?)\};", c_source, re.S
+    )
+    data = {
+        ident: bytes(int(b) for b in body.replace("\n", "").split(",") if b.strip())
+        for ident, body in arrays
+    }
+    entries = re.findall(r'\{"([\w.]+)", (\w+), ', c_source)
+    return {name: data[ident] for name, ident in entries}
+
+
+def test_freeze_modules(tmp_path):
+    lib = tmp_path / "lib"
+    override = tmp_path / "override"
+    (lib / "pkg" / "sub").mkdir(parents=True)
+    (lib / "pkg" / "tests").mkdir()
+    (lib / "pkg" / "__init__.py").write_text("X = 1")
+    (lib / "pkg" / "mod.py").write_text("Y = 2")
+    (lib / "pkg" / "skipped.py").write_text("")
+    (lib / "pkg" / "sub" / "__init__.py").write_text("")
+    (lib / "pkg" / "tests" / "test_pkg.py").write_text("")
+    (lib / "single.py").write_text("Z = 3")
+    override.mkdir()
+    (override / "single.py").write_text("Z = 4")
+
+    sources = list(
+        iter_sources(
+            ["pkg", "single", "not_a_module"], [override, lib], ["pkg/skipped.py"]
+        )
+    )
+    assert [(name, is_package) for name, _, is_package in sources] == [
+        ("pkg", True),
+        ("pkg.mod", False),
+        ("pkg.sub", True),
+        ("single", False),
+    ]
+    assert sources[-1][1] == override / "single.py"
+
+    output = tmp_path / "frozen.c"
+    frozen = freeze_modules(["pkg", "single"], [override, lib], output)
+    assert frozen == ["pkg", "pkg.mod", "pkg.skipped", "pkg.sub", "single"]
+
+    c_source = output.read_text()
+    assert "const struct _frozen _PyodideFrozenModules[] = {" in c_source
+    code = _frozen_code(c_source)
+    assert set(code) == set(frozen)
+
+    namespace: dict[str, object] = {}
+    exec(marshal.loads(code["single"]), namespace)
+    assert namespace["Z"] == 4
+    assert marshal.loads(code["pkg.mod"]).co_filename == "<frozen pkg.mod>"
+
+
+def test_freeze_no_modules(tmp_path):
+    output = tmp_path / "frozen.c"
+    assert freeze_modules([], [tmp_path], output) == []
+    assert "{0, 0, 0, 0} // sentinel" in output.read_text()